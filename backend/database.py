@@ -1,6 +1,11 @@
 """
 database.py — SQLAlchemy engine, session factory, and declarative Base.
 All models must inherit from Base.
+
+With ASYNC_DB=true the product, sales and dashboard routers use an async
+engine (asyncpg; aiosqlite for SQLite) through get_async_db instead. The sync
+engine stays in use for everything else: auth, inventory, background
+reloads, exports, migrations and scripts.
 """
 import os
 from dotenv import load_dotenv
@@ -23,6 +28,42 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+# ── Async engine (ASYNC_DB) ───────────────────────────────────────────────────
+
+ASYNC_DB = os.getenv("ASYNC_DB", "false").lower() in ("1", "true", "yes")
+
+_ASYNC_DRIVERS = {
+    "postgresql://": "postgresql+asyncpg://",
+    "postgresql+psycopg2://": "postgresql+asyncpg://",
+    "sqlite://": "sqlite+aiosqlite://",
+}
+
+
+def _async_url(url: str) -> str:
+    for prefix, async_prefix in _ASYNC_DRIVERS.items():
+        if url.startswith(prefix):
+            return async_prefix + url[len(prefix):]
+    return url
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", _async_url(DATABASE_URL))
+
+async_engine = None
+AsyncSessionLocal = None
+if ASYNC_DB:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    # Connections, not threads, are now the limit: size the pool for the
+    # number of requests that should hit the database at once.
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        pool_pre_ping=True,
+        pool_size=int(os.getenv("ASYNC_POOL_SIZE", 20)),
+        max_overflow=int(os.getenv("ASYNC_MAX_OVERFLOW", 20)),
+    )
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False)
+
+
 def check_db_connection():
     """Verify database connection and print status."""
     try:
@@ -44,3 +85,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """FastAPI dependency for ASYNC_DB routers: yields an AsyncSession."""
+    async with AsyncSessionLocal() as db:
+        yield db
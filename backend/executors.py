@@ -0,0 +1,223 @@
+"""
+executors.py — Dedicated, size-bounded thread pools for blocking work.
+
+Sync FastAPI routes all share one Starlette threadpool. CPU-heavy work
+(bcrypt) or slow device I/O running there competes with every checkout
+request. A BoundedExecutor gives such work its own small pool with a hard cap
+on queued jobs: when the queue is full, new work is rejected immediately
+(ExecutorBusy) instead of piling up behind it, and the counters show how deep
+the queue got and how long jobs waited.
+
+BoundedLimiter applies the same limits to work that is already async (pooled
+HTTP calls to a device): no threads, just a cap on calls in flight and on
+callers waiting for a slot.
+
+Every executor and limiter registers itself; `all_stats()` reports them together.
+"""
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict, Optional, Union
+
+
+class ExecutorBusy(Exception):
+    """The executor's queue is full; the caller should shed the request."""
+
+
+class BoundedExecutor:
+
+    def __init__(self, name: str, workers: int, max_queue: int):
+        self.name = name
+        self.workers = workers
+        self.max_queue = max_queue
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._pending = 0          # queued + running
+        self._running = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.cancelled = 0
+        self.max_pending = 0
+        self._wait_total = 0.0
+        self._run_total = 0.0
+        _registry[name] = self
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """Queue `fn(*args, **kwargs)`; raises ExecutorBusy when the queue is full."""
+        with self._lock:
+            if self._pending - self._running >= self.max_queue:
+                self.rejected += 1
+                raise ExecutorBusy(f"{self.name} executor is busy")
+            self._pending += 1
+            self.submitted += 1
+            self.max_pending = max(self.max_pending, self._pending)
+        queued_at = time.perf_counter()
+
+        def _job():
+            started = time.perf_counter()
+            with self._lock:
+                self._running += 1
+                self._wait_total += started - queued_at
+            ok = False
+            try:
+                result = fn(*args, **kwargs)
+                ok = True
+                return result
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._pending -= 1
+                    self._run_total += time.perf_counter() - started
+                    if ok:
+                        self.completed += 1
+                    else:
+                        self.failed += 1
+
+        try:
+            future = self._pool.submit(_job)
+        except RuntimeError:
+            with self._lock:
+                self._pending -= 1
+            raise
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _on_done(self, future: Future):
+        # A job cancelled while still queued never runs _job's bookkeeping
+        if future.cancelled():
+            with self._lock:
+                self._pending -= 1
+                self.cancelled += 1
+
+    def call(self, fn: Callable, *args, **kwargs):
+        """Run on the executor and block the calling thread until it finishes."""
+        return self.submit(fn, *args, **kwargs).result()
+
+    async def run(self, fn: Callable, *args, timeout: Optional[float] = None, **kwargs):
+        """
+        Run on the executor without blocking the event loop. With `timeout`,
+        raises asyncio.TimeoutError and drops the job if it has not started;
+        a job already running cannot be interrupted and finishes in the background.
+        """
+        future = asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+        if timeout is None:
+            return await future
+        return await asyncio.wait_for(future, timeout)
+
+    def stats(self) -> dict:
+        with self._lock:
+            finished = self.completed + self.failed
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queued": self._pending - self._running,
+                "max_pending": self.max_pending,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "cancelled": self.cancelled,
+                "avg_wait_ms": round(self._wait_total / finished * 1000, 2) if finished else 0.0,
+                "avg_run_ms": round(self._run_total / finished * 1000, 2) if finished else 0.0,
+            }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+class BoundedLimiter:
+
+    def __init__(self, name: str, limit: int, max_queue: int):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self._slots = asyncio.Semaphore(limit)
+        self._running = 0
+        self._waiting = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.cancelled = 0
+        self.max_pending = 0
+        self._wait_total = 0.0
+        self._run_total = 0.0
+        _registry[name] = self
+
+    async def run(self, fn: Callable[..., Awaitable], *args, **kwargs):
+        """
+        Await `fn(*args, **kwargs)` once a slot is free; raises ExecutorBusy when
+        `max_queue` callers are already waiting. The call itself should carry its
+        own timeout (e.g. the HTTP client's), which also bounds the wait for a slot.
+        """
+        if self._slots.locked() and self._waiting >= self.max_queue:
+            self.rejected += 1
+            raise ExecutorBusy(f"{self.name} is busy")
+        self.submitted += 1
+        self._waiting += 1
+        self.max_pending = max(self.max_pending, self._waiting + self._running)
+        queued_at = time.perf_counter()
+        try:
+            await self._slots.acquire()
+        except BaseException:
+            self.cancelled += 1
+            raise
+        finally:
+            self._waiting -= 1
+
+        started = time.perf_counter()
+        self._wait_total += started - queued_at
+        self._running += 1
+        ok = False
+        try:
+            result = await fn(*args, **kwargs)
+            ok = True
+            return result
+        finally:
+            self._running -= 1
+            self._slots.release()
+            self._run_total += time.perf_counter() - started
+            if ok:
+                self.completed += 1
+            else:
+                self.failed += 1
+
+    def stats(self) -> dict:
+        finished = self.completed + self.failed
+        return {
+            "limit": self.limit,
+            "max_queue": self.max_queue,
+            "in_flight": self._running,
+            "waiting": self._waiting,
+            "max_pending": self.max_pending,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "cancelled": self.cancelled,
+            "avg_wait_ms": round(self._wait_total / finished * 1000, 2) if finished else 0.0,
+            "avg_run_ms": round(self._run_total / finished * 1000, 2) if finished else 0.0,
+        }
+
+
+_registry: Dict[str, Union[BoundedExecutor, BoundedLimiter]] = {}
+
+
+def all_stats() -> dict:
+    return {name: ex.stats() for name, ex in _registry.items()}
+
+
+# ── Shared executors ──────────────────────────────────────────────────────────
+
+# bcrypt is CPU-bound and holds the GIL only briefly; one or two threads per
+# core is enough, and the queue bound turns a login storm into fast 503s.
+hashing_executor = BoundedExecutor(
+    "password-hashing",
+    workers=int(os.getenv("HASH_WORKERS", min(4, os.cpu_count() or 1))),
+    max_queue=int(os.getenv("HASH_QUEUE", 64)),
+)
@@ -0,0 +1,81 @@
+"""
+hardware/fake_scale.py — Serial scale simulator on a pseudo-terminal (Linux / macOS).
+
+Answers every ENQ like a real RS-232 scale, walking through a list of weights
+and then holding the last one, e.g. an item being put down and settling:
+
+    python -m backend.hardware.fake_scale --weights 0,0.8,1.31,1.248,1.25
+    python -m backend.hardware.fake_scale --flags        # 'US,GS,' / 'ST,GS,' prefixes
+
+It prints the pty path; start the backend with SCALE_COM_PORT set to it.
+Type a weight (e.g. 0.5) and Enter to put something else on the platter.
+"""
+import argparse
+import os
+import select
+import sys
+import threading
+import tty
+
+
+class FakeScale:
+
+    def __init__(self, weights, flags: bool = False):
+        self.weights = list(weights)
+        self.flags = flags
+        self._lock = threading.Lock()
+        self._step = 0
+        self._closed = threading.Event()
+        self.master, self._slave = os.openpty()
+        tty.setraw(self._slave)          # no echo or newline translation
+        self.path = os.ttyname(self._slave)
+
+    def put(self, weights):
+        """Start a new settling sequence (thread-safe)."""
+        with self._lock:
+            self.weights, self._step = list(weights), 0
+
+    def _next_line(self) -> bytes:
+        with self._lock:
+            weight = self.weights[min(self._step, len(self.weights) - 1)]
+            stable = self._step >= len(self.weights) - 1
+            self._step += 1
+        prefix = ("ST,GS," if stable else "US,GS,") if self.flags else ""
+        return f"{prefix}{weight:8.3f} kg\r\n".encode("ascii")
+
+    def serve_forever(self):
+        while not self._closed.is_set():
+            ready, _, _ = select.select([self.master], [], [], 0.1)
+            if ready and b"\x05" in os.read(self.master, 64):
+                os.write(self.master, self._next_line())
+        os.close(self.master)
+        os.close(self._slave)
+
+    def close(self):
+        """Stop serving and remove the pty, like a scale being unplugged."""
+        self._closed.set()
+
+
+def _weights(text: str):
+    return [float(w) for w in text.split(",") if w.strip()]
+
+
+def _read_stdin(scale: FakeScale):
+    for line in sys.stdin:
+        try:
+            weight = float(line)
+        except ValueError:
+            continue
+        scale.put([weight * 0.6, weight * 1.04, weight])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a fake RS-232 scale on a pty.")
+    parser.add_argument("--weights", type=_weights, default=[0.0, 0.8, 1.31, 1.248, 1.25])
+    parser.add_argument("--flags", action="store_true", help="prefix readings with ST/US stability flags")
+    args = parser.parse_args()
+
+    scale = FakeScale(args.weights, args.flags)
+    print(f"Fake scale on {scale.path}  (SCALE_COM_PORT={scale.path})", flush=True)
+    threading.Thread(target=_read_stdin, args=(scale,), daemon=True).start()
+    scale.serve_forever()
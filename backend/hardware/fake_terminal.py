@@ -0,0 +1,92 @@
+"""
+hardware/fake_terminal.py — Pine Labs Plutus terminal simulator for local testing.
+
+Serves the two endpoints pos_machine.py calls. Each initiated transaction
+stays pending (empty ResponseCode) for --approve-after seconds, then reports
+approval ("00") or, with --decline, a decline ("05"):
+
+    python -m backend.hardware.fake_terminal --port 8080 --approve-after 4
+
+Point the backend at it with PINE_LABS_HOST=127.0.0.1 PINE_LABS_PORT=8080.
+Every request and new TCP connection is counted; GET /stats returns the counts.
+"""
+import argparse
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeTerminal(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port: int, approve_after: float = 4.0, decline: bool = False):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.approve_after = approve_after
+        self.decline = decline
+        self.transactions = {}                 # reference → initiated at (monotonic)
+        self.counts = {"connections": 0, "initiate": 0, "status": 0}
+        self.lock = threading.Lock()
+
+    def process_request(self, request, client_address):
+        with self.lock:
+            self.counts["connections"] += 1
+        super().process_request(request, client_address)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"              # keep-alive
+    disable_nagle_algorithm = True             # headers and body go out as separate writes
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, body: dict):
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.path != "/GetCloudBasedTxn":
+            return self.send_error(404)
+        reference = uuid.uuid4().hex[:12].upper()
+        with self.server.lock:
+            self.server.transactions[reference] = time.monotonic()
+            self.server.counts["initiate"] += 1
+        self._reply({"PlutusTransactionReferenceID": reference, "ResponseCode": "", "ResponseMessage": "TXN UPLOADED"})
+
+    def do_GET(self):
+        if self.path == "/stats":
+            with self.server.lock:
+                return self._reply(dict(self.server.counts))
+        if not self.path.startswith("/GetCloudBasedTxn/"):
+            return self.send_error(404)
+        reference = self.path.split("/")[2].split("?")[0]
+        with self.server.lock:
+            started = self.server.transactions.get(reference)
+            self.server.counts["status"] += 1
+        if started is None:
+            return self._reply({"ResponseCode": "91", "ResponseMessage": "TXN NOT FOUND"})
+        if time.monotonic() - started < self.server.approve_after:
+            return self._reply({"ResponseCode": "", "ResponseMessage": "TXN PENDING"})
+        if self.server.decline:
+            return self._reply({"ResponseCode": "05", "ResponseMessage": "DECLINED"})
+        return self._reply({"ResponseCode": "00", "ResponseMessage": "APPROVED",
+                            "CardType": "VISA", "ApprovalCode": "A1B2C3"})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a fake Pine Labs terminal.")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--approve-after", type=float, default=4.0, help="seconds a transaction stays pending")
+    parser.add_argument("--decline", action="store_true", help="decline instead of approving")
+    args = parser.parse_args()
+
+    server = FakeTerminal(args.port, args.approve_after, args.decline)
+    print(f"Fake Pine Labs terminal on http://127.0.0.1:{args.port}", flush=True)
+    server.serve_forever()
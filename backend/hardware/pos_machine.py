@@ -10,15 +10,33 @@ Configure via .env:
     PINE_LABS_MERCHANT_ID=your_merchant_id
     PINE_LABS_TERMINAL_ID=your_terminal_id
 
+    PAYMENT_WAIT_DEFAULT=60      # seconds wait_for_payment() waits by default
+    PAYMENT_WAIT_MAX=180
+    PAYMENT_CONCURRENCY=4        # terminal calls in flight at once
+    PAYMENT_QUEUE=16             # calls waiting for a slot before 503
+
 Reference: Pine Labs Plutus Smart Local API (PSDK)
     - POST /GetCloudBasedTxn to initiate
     - GET  /GetCloudBasedTxn/{reference} to poll status
+
+Calls go through one pooled keep-alive httpx.AsyncClient, so the terminal
+sees one long-lived connection instead of a new TCP handshake per request.
+Every call also goes through a BoundedLimiter (executors.py):
+at most PAYMENT_CONCURRENCY in flight, PAYMENT_QUEUE waiting, ExecutorBusy
+beyond that; stats() reports the counters for /hardware/stats. wait_for_payment() polls the terminal with backoff on the
+server until the transaction resolves or its deadline passes, so the POS
+page makes one request per payment instead of polling.
+
+Without a terminal, `python -m backend.hardware.fake_terminal` serves one locally.
 """
+import asyncio
 import os
 import time
 import logging
-import requests
+from typing import Optional
+import httpx
 from dotenv import load_dotenv
+from backend.executors import BoundedLimiter, ExecutorBusy
 
 load_dotenv()
 logger = logging.getLogger(__name__)
@@ -28,6 +46,19 @@ PORT = os.getenv("PINE_LABS_PORT", "8080")
 MERCHANT_ID = os.getenv("PINE_LABS_MERCHANT_ID", "")
 TERMINAL_ID = os.getenv("PINE_LABS_TERMINAL_ID", "")
 BASE_URL = f"http://{HOST}:{PORT}"
+REQUEST_TIMEOUT = 10
+WAIT_DEFAULT = float(os.getenv("PAYMENT_WAIT_DEFAULT", 60))
+WAIT_MAX = float(os.getenv("PAYMENT_WAIT_MAX", 180))
+POLL_FIRST = 0.5                # seconds before the first status poll
+POLL_MAX = 3.0                  # longest gap between polls
+CONCURRENCY = int(os.getenv("PAYMENT_CONCURRENCY", 4))
+QUEUE = int(os.getenv("PAYMENT_QUEUE", 16))
+
+_LIMITS = httpx.Limits(max_connections=CONCURRENCY, max_keepalive_connections=CONCURRENCY, keepalive_expiry=60)
+_async_client: Optional[httpx.AsyncClient] = None
+
+terminal_limiter = BoundedLimiter("payment-terminal", limit=CONCURRENCY, max_queue=QUEUE)
+_payment_waits = 0              # wait_for_payment() long-polls in progress
 
 # Payment type codes used by Pine Labs
 PAYMENT_TYPE_CODES = {
@@ -37,22 +68,27 @@ PAYMENT_TYPE_CODES = {
 }
 
 
-def initiate_payment(amount: float, payment_mode: str = "card", reference: str = None) -> dict:
-    """
-    Send a payment request to the Pine Labs Plutus terminal.
+def _aclient() -> httpx.AsyncClient:
+    global _async_client
+    if _async_client is None:
+        _async_client = httpx.AsyncClient(base_url=BASE_URL, timeout=REQUEST_TIMEOUT, limits=_LIMITS)
+    return _async_client
 
-    Args:
-        amount: Amount in INR (float, e.g. 149.50)
-        payment_mode: "card" | "upi"
-        reference: Optional bill reference string
 
-    Returns:
-        {"success": bool, "transaction_id": str, "status": str, "message": str}
-    """
+async def aclose():
+    """Close the pooled connections (app shutdown)."""
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+
+
+# ── Requests and responses ────────────────────────────────────────────────────
+
+def _initiate_payload(amount: float, payment_mode: str, reference: str = None) -> dict:
     amount_paise = int(round(amount * 100))  # Pine Labs expects paise (integer)
     txn_type_code = PAYMENT_TYPE_CODES.get(payment_mode, "4001")
-
-    payload = {
+    return {
         "MerchantID": MERCHANT_ID,
         "TerminalID": TERMINAL_ID,
         "TransactionType": int(txn_type_code),
@@ -61,72 +97,133 @@ def initiate_payment(amount: float, payment_mode: str = "card", reference: str =
         "MerchantName": os.getenv("STORE_NAME", "E26 Supermarket"),
     }
 
+
+def _initiated(data: dict) -> dict:
+    logger.info(f"Pine Labs initiate response: {data}")
+    return {
+        "success": True,
+        "transaction_id": data.get("PlutusTransactionReferenceID", ""),
+        "status": "initiated",
+        "message": "Payment request sent to POS terminal",
+        "raw": data,
+    }
+
+
+def _initiate_error(e: Exception) -> dict:
+    if isinstance(e, httpx.ConnectError):
+        logger.warning("Pine Labs terminal not reachable")
+        message = f"Cannot connect to POS terminal at {BASE_URL}"
+    else:
+        logger.error(f"Pine Labs error: {e}")
+        message = str(e)
+    return {"success": False, "transaction_id": None, "status": "error", "message": message}
+
+
+def _status(transaction_id: str, data: dict) -> dict:
+    logger.info(f"Pine Labs status response: {data}")
+    response_code = str(data.get("ResponseCode", ""))
+    if response_code == "00":
+        status = "success"
+    elif response_code in ("", "null", "None"):
+        status = "pending"
+    else:
+        status = "failed"
+
+    return {
+        "status": status,
+        "transaction_id": transaction_id,
+        "response_code": response_code,
+        "message": data.get("ResponseMessage", ""),
+        "card_type": data.get("CardType", ""),
+        "approval_code": data.get("ApprovalCode", ""),
+        "raw": data,
+    }
+
+
+def _status_params() -> dict:
+    return {"MerchantID": MERCHANT_ID, "TerminalID": TERMINAL_ID}
+
+
+# ── Terminal API (used by routers/hardware.py) ────────────────────────────────
+
+async def initiate_payment(amount: float, payment_mode: str = "card", reference: str = None) -> dict:
+    """
+    Send a payment request to the Pine Labs Plutus terminal.
+
+    Args:
+        amount: Amount in INR (float, e.g. 149.50)
+        payment_mode: "card" | "upi"
+        reference: Optional bill reference string
+
+    Returns:
+        {"success": bool, "transaction_id": str, "status": str, "message": str}
+
+    Raises ExecutorBusy when the terminal queue is full.
+    """
     try:
-        resp = requests.post(
-            f"{BASE_URL}/GetCloudBasedTxn",
-            json=payload,
-            timeout=10,
+        resp = await terminal_limiter.run(
+            _aclient().post, "/GetCloudBasedTxn", json=_initiate_payload(amount, payment_mode, reference)
         )
         resp.raise_for_status()
-        data = resp.json()
-        logger.info(f"Pine Labs initiate response: {data}")
-
-        return {
-            "success": True,
-            "transaction_id": data.get("PlutusTransactionReferenceID", ""),
-            "status": "initiated",
-            "message": "Payment request sent to POS terminal",
-            "raw": data,
-        }
-
-    except requests.exceptions.ConnectionError:
-        logger.warning("Pine Labs terminal not reachable")
-        return {
-            "success": False,
-            "transaction_id": None,
-            "status": "error",
-            "message": f"Cannot connect to POS terminal at {BASE_URL}",
-        }
+        return _initiated(resp.json())
+    except ExecutorBusy:
+        raise
     except Exception as e:
-        logger.error(f"Pine Labs error: {e}")
-        return {"success": False, "transaction_id": None, "status": "error", "message": str(e)}
+        return _initiate_error(e)
 
 
-def get_payment_status(transaction_id: str) -> dict:
+async def get_payment_status(transaction_id: str) -> dict:
     """
     Poll the Pine Labs terminal for the result of a transaction.
 
     Returns:
         {"status": "success"|"failed"|"pending", "transaction_id": str, "message": str}
+
+    Raises ExecutorBusy when the terminal queue is full.
     """
     try:
-        resp = requests.get(
-            f"{BASE_URL}/GetCloudBasedTxn/{transaction_id}",
-            params={"MerchantID": MERCHANT_ID, "TerminalID": TERMINAL_ID},
-            timeout=10,
+        resp = await terminal_limiter.run(
+            _aclient().get, f"/GetCloudBasedTxn/{transaction_id}", params=_status_params()
         )
         resp.raise_for_status()
-        data = resp.json()
-        logger.info(f"Pine Labs status response: {data}")
-
-        response_code = str(data.get("ResponseCode", ""))
-        if response_code == "00":
-            status = "success"
-        elif response_code in ("", "null"):
-            status = "pending"
-        else:
-            status = "failed"
-
-        return {
-            "status": status,
-            "transaction_id": transaction_id,
-            "response_code": response_code,
-            "message": data.get("ResponseMessage", ""),
-            "card_type": data.get("CardType", ""),
-            "approval_code": data.get("ApprovalCode", ""),
-            "raw": data,
-        }
-
+        return _status(transaction_id, resp.json())
+    except ExecutorBusy:
+        raise
     except Exception as e:
         logger.error(f"Pine Labs status check error: {e}")
         return {"status": "error", "transaction_id": transaction_id, "message": str(e)}
+
+
+async def wait_for_payment(transaction_id: str, timeout: float = WAIT_DEFAULT) -> dict:
+    """
+    Poll until the transaction is `success` or `failed`, or `timeout` seconds
+    pass. Polls start at POLL_FIRST and back off to POLL_MAX; transient
+    errors are retried. On timeout the last status is returned with
+    `timed_out: true` (status `pending`, or `error` if the terminal never answered).
+    A poll turned away by a full queue counts as a transient error.
+    """
+    global _payment_waits
+    deadline = time.monotonic() + min(timeout, WAIT_MAX)
+    delay, polls = POLL_FIRST, 0
+    _payment_waits += 1
+    try:
+        while True:
+            try:
+                result = await get_payment_status(transaction_id)
+            except ExecutorBusy as e:
+                result = {"status": "error", "transaction_id": transaction_id, "message": str(e)}
+            polls += 1
+            if result["status"] in ("success", "failed"):
+                return {**result, "polls": polls, "timed_out": False}
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return {**result, "polls": polls, "timed_out": True}
+            await asyncio.sleep(min(delay, remaining))
+            delay = min(delay * 1.5, POLL_MAX)
+    finally:
+        _payment_waits -= 1
+
+
+def stats() -> dict:
+    """Terminal calls in flight and waiting for a slot, plus long-polls in progress."""
+    return {**terminal_limiter.stats(), "payment_waits": _payment_waits, "terminal": BASE_URL}
@@ -0,0 +1,231 @@
+"""
+hardware/print_queue.py — Background receipt printing with an on-disk spool.
+
+POST /hardware/print only enqueues: the job is written to the spool
+directory (one JSON file per job) and the request returns its id at once,
+so checkout never waits for paper. A worker thread per printer drains its
+queue in order. A job that fails (jam, paper out, printer offline) stays
+spooled and is retried with exponential backoff; jobs still spooled when the
+backend stops are picked up again on the next start.
+
+Configure via .env:
+    PRINT_SPOOL_DIR=print_spool
+    PRINT_RETRY_BASE=2          # seconds before the first retry, doubled per attempt
+    PRINT_RETRY_MAX=60          # longest wait between retries
+    PRINT_QUEUE_MAX=1000        # jobs waiting before new ones are refused
+"""
+import json
+import os
+import threading
+import time
+import uuid
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+SPOOL_DIR = os.getenv("PRINT_SPOOL_DIR", "print_spool")
+RETRY_BASE = float(os.getenv("PRINT_RETRY_BASE", 2))
+RETRY_MAX = float(os.getenv("PRINT_RETRY_MAX", 60))
+QUEUE_MAX = int(os.getenv("PRINT_QUEUE_MAX", 1000))
+FINISHED_KEPT = 1000            # finished jobs remembered for status queries
+
+
+class PrintQueueFull(Exception):
+    """Too many undelivered jobs; the printer has probably been offline for a while."""
+
+
+class PrintQueue:
+
+    def __init__(self, printer: str, send: Callable[[dict], None], spool_dir: str = SPOOL_DIR):
+        """`send(sale_data)` prints one receipt and raises on failure."""
+        self.printer = printer
+        self.send = send
+        self.spool_dir = os.path.join(spool_dir, printer)
+        self._cond = threading.Condition()
+        self._pending: Dict[str, dict] = {}            # job id → job, oldest first
+        self._finished: "OrderedDict[str, dict]" = OrderedDict()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = False
+        self.printed = 0
+        self.failures = 0
+
+    # ── Lifecycle ─────────────────────────────────────────────────────────────
+
+    def start(self):
+        """Load spooled jobs and start the worker (once)."""
+        with self._cond:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            os.makedirs(self.spool_dir, exist_ok=True)
+            jobs = []
+            for name in os.listdir(self.spool_dir):
+                if not name.endswith(".json"):
+                    continue
+                try:
+                    with open(os.path.join(self.spool_dir, name)) as f:
+                        jobs.append(json.load(f))
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Skipping unreadable print job {name}: {e}")
+            for job in sorted(jobs, key=lambda j: j["created_at"]):
+                job["status"] = "queued" if job["attempts"] == 0 else "retrying"
+                job["next_attempt"] = 0.0
+                self._pending[job["id"]] = job
+            if jobs:
+                logger.info(f"Print queue {self.printer}: {len(jobs)} spooled job(s) to retry")
+            self._stop = False
+            self._thread = threading.Thread(target=self._run, name=f"print-{self.printer}", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    # ── Jobs ──────────────────────────────────────────────────────────────────
+
+    def submit(self, sale_data: dict) -> dict:
+        """Spool a receipt and return its job; raises PrintQueueFull."""
+        job = {
+            "id": uuid.uuid4().hex,
+            "printer": self.printer,
+            "status": "queued",
+            "attempts": 0,
+            "error": None,
+            "created_at": datetime.now().isoformat(),
+            "printed_at": None,
+            "sale_data": sale_data,
+            "next_attempt": 0.0,
+        }
+        with self._cond:
+            if len(self._pending) >= QUEUE_MAX:
+                raise PrintQueueFull(f"{len(self._pending)} receipts waiting for printer {self.printer}")
+            self._spool(job)
+            self._pending[job["id"]] = job
+            self._cond.notify()
+        return self._public(job)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._cond:
+            job = self._pending.get(job_id) or self._finished.get(job_id)
+            return self._public(job) if job else None
+
+    def pending(self) -> List[dict]:
+        with self._cond:
+            return [self._public(j) for j in self._pending.values()]
+
+    def cancel(self, job_id: str) -> Optional[dict]:
+        """Drop a job that has not printed yet. Returns None if there is no such pending job."""
+        with self._cond:
+            job = self._pending.get(job_id)
+            if job is None or job["status"] == "printing":
+                return None
+            del self._pending[job_id]
+            job["status"] = "cancelled"
+            self._unspool(job_id)
+            self._remember(job)
+            return self._public(job)
+
+    def stats(self) -> dict:
+        with self._cond:
+            oldest = next(iter(self._pending.values()), None)
+            return {
+                "pending": len(self._pending),
+                "retrying": sum(1 for j in self._pending.values() if j["attempts"] > 0),
+                "printed": self.printed,
+                "failures": self.failures,
+                "oldest_pending": oldest["created_at"] if oldest else None,
+                "last_error": oldest["error"] if oldest else None,
+            }
+
+    # ── Worker ────────────────────────────────────────────────────────────────
+
+    def _run(self):
+        while True:
+            with self._cond:
+                job = self._next_due()
+                while job is None and not self._stop:
+                    self._cond.wait(timeout=self._seconds_to_next())
+                    job = self._next_due()
+                if self._stop:
+                    return
+                job["status"] = "printing"
+            try:
+                self.send(job["sale_data"])
+                error = None
+            except Exception as e:
+                error = str(e) or type(e).__name__
+            self._finish(job, error)
+
+    def _next_due(self) -> Optional[dict]:
+        """Oldest job, if its retry time has come (caller holds the lock). Receipts print in order."""
+        job = next(iter(self._pending.values()), None)
+        if job is not None and job["next_attempt"] <= time.monotonic():
+            return job
+        return None
+
+    def _seconds_to_next(self) -> Optional[float]:
+        job = next(iter(self._pending.values()), None)
+        return None if job is None else max(job["next_attempt"] - time.monotonic(), 0.01)
+
+    def _finish(self, job: dict, error: Optional[str]):
+        with self._cond:
+            job["attempts"] += 1
+            if error is None:
+                job.update(status="printed", error=None, printed_at=datetime.now().isoformat())
+                self._pending.pop(job["id"], None)
+                self._unspool(job["id"])
+                self._remember(job)
+                self.printed += 1
+                return
+            self.failures += 1
+            delay = min(RETRY_BASE * 2 ** (job["attempts"] - 1), RETRY_MAX)
+            job.update(status="retrying", error=error, next_attempt=time.monotonic() + delay)
+            self._spool(job)
+        logger.warning(f"Print job {job['id']} failed (attempt {job['attempts']}), retrying in {delay:g}s: {error}")
+
+    # ── Spool files ───────────────────────────────────────────────────────────
+
+    def _path(self, job_id: str) -> str:
+        return os.path.join(self.spool_dir, f"{job_id}.json")
+
+    def _spool(self, job: dict):
+        """Write the job atomically: a crash leaves the old file or the new one, never half of one."""
+        os.makedirs(self.spool_dir, exist_ok=True)
+        record = {k: v for k, v in job.items() if k != "next_attempt"}
+        tmp = self._path(job["id"]) + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(record, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self._path(job["id"]))
+
+    def _unspool(self, job_id: str):
+        try:
+            os.remove(self._path(job_id))
+        except FileNotFoundError:
+            pass
+
+    def _remember(self, job: dict):
+        job.pop("sale_data", None)
+        self._finished[job["id"]] = job
+        while len(self._finished) > FINISHED_KEPT:
+            self._finished.popitem(last=False)
+
+    @staticmethod
+    def _public(job: dict) -> dict:
+        return {k: job[k] for k in ("id", "printer", "status", "attempts", "error", "created_at", "printed_at")}
+
+
+def _send_receipt(sale_data: dict):
+    from backend.hardware.printer import printer_connection, render_receipt
+    printer_connection.write(render_receipt(sale_data))
+
+
+receipt_queue = PrintQueue("receipt", _send_receipt)
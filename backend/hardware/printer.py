@@ -10,13 +10,22 @@ Configure via .env:
     PRINTER_HOST=192.168.1.100
     PRINTER_PORT=9100
 
+    PRINTER_TIMEOUT=10
+
     STORE_NAME=E26 Supermarket
     STORE_ADDRESS=123 Main Street
     STORE_PHONE=+91-9999999999
+
+A receipt is rendered into one ESC/POS byte buffer (the store header and the
+footer are rendered once and reused) and sent in a single write over a
+persistent device handle, instead of one USB/TCP write per text/style call
+on a printer object rebuilt for every receipt.
 """
 import os
 import logging
+import threading
 from datetime import datetime
+from functools import lru_cache
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -26,6 +35,17 @@ STORE_NAME = os.getenv("STORE_NAME", "E26 Supermarket")
 STORE_ADDRESS = os.getenv("STORE_ADDRESS", "")
 STORE_PHONE = os.getenv("STORE_PHONE", "")
 PRINTER_TYPE = os.getenv("PRINTER_TYPE", "usb")
+PRINTER_TIMEOUT = float(os.getenv("PRINTER_TIMEOUT", 10))
+LINE_WIDTH = 42
+
+# ── ESC/POS commands ──────────────────────────────────────────────────────────
+ESC, GS = b"\x1b", b"\x1d"
+INIT = ESC + b"@"
+ALIGN_LEFT, ALIGN_CENTER = ESC + b"a\x00", ESC + b"a\x01"
+BOLD_ON, BOLD_OFF = ESC + b"E\x01", ESC + b"E\x00"
+SIZE_DOUBLE, SIZE_NORMAL = GS + b"!\x11", GS + b"!\x00"
+FEED_AND_CUT = ESC + b"d\x06" + GS + b"V\x00"     # feed 6 lines, full cut
+ENCODING = "cp437"
 
 
 def _get_printer():
@@ -38,38 +58,89 @@ def _get_printer():
     if PRINTER_TYPE == "network":
         host = os.getenv("PRINTER_HOST", "192.168.1.100")
         port = int(os.getenv("PRINTER_PORT", 9100))
-        return Network(host, port)
+        return Network(host, port, timeout=PRINTER_TIMEOUT)
     else:
         vendor_id = int(os.getenv("PRINTER_VENDOR_ID", "0x04b8"), 16)
         product_id = int(os.getenv("PRINTER_PRODUCT_ID", "0x0202"), 16)
         return Usb(vendor_id, product_id)
 
 
-def format_receipt(sale_data: dict) -> list:
+class PrinterConnection:
     """
-    Build a list of print commands from sale data dict.
-    sale_data structure:
-        {
-          "sale_id": int,
-          "created_at": str,
-          "cashier": str,
-          "customer": str | None,
-          "payment_mode": str,
-          "transaction_ref": str | None,
-          "items": [{"name", "qty", "unit_price", "subtotal"}, ...],
-          "subtotal": float,
-          "discount": float,
-          "tax": float,
-          "total": float,
-        }
+    One printer handle kept open across receipts. A failed write drops the
+    handle; the write is retried once on a fresh connection (printer
+    rebooted, network blip) before the error is reported.
     """
-    lines = []
-    lines.append(("header", STORE_NAME))
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._printer = None
+        self.connects = 0
+        self.writes = 0
+        self.errors = 0
+
+    def write(self, data: bytes):
+        with self._lock:
+            for attempt in (1, 2):
+                try:
+                    if self._printer is None:
+                        self._printer = _get_printer()
+                        self.connects += 1
+                    self._printer._raw(data)
+                    self.writes += 1
+                    return
+                except Exception as e:
+                    self.errors += 1
+                    self._close()
+                    if attempt == 2 or isinstance(e, RuntimeError):
+                        raise
+                    logger.warning(f"Printer write failed, reconnecting: {e}")
+
+    def _close(self):
+        if self._printer is not None:
+            try:
+                self._printer.close()
+            except Exception:
+                pass
+            self._printer = None
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+    def stats(self) -> dict:
+        return {
+            "connected": self._printer is not None,
+            "connects": self.connects,
+            "writes": self.writes,
+            "errors": self.errors,
+        }
+
+
+printer_connection = PrinterConnection()
+
+
+def _header_lines() -> list:
+    lines = [("header", STORE_NAME)]
     if STORE_ADDRESS:
         lines.append(("text", STORE_ADDRESS))
     if STORE_PHONE:
         lines.append(("text", STORE_PHONE))
     lines.append(("separator", "="))
+    return lines
+
+
+def _footer_lines() -> list:
+    return [
+        ("separator", "="),
+        ("center", "Thank you for shopping!"),
+        ("center", "Visit again :)"),
+        ("cut", None),
+    ]
+
+
+def _body_lines(sale_data: dict) -> list:
+    lines = []
     lines.append(("text", f"Receipt #: {sale_data.get('sale_id', 'N/A')}"))
     lines.append(("text", f"Date     : {sale_data.get('created_at', datetime.now().strftime('%Y-%m-%d %H:%M'))}"))
     lines.append(("text", f"Cashier  : {sale_data.get('cashier', '-')}"))
@@ -95,41 +166,69 @@ def format_receipt(sale_data: dict) -> list:
     lines.append(("text", f"Payment  : {sale_data.get('payment_mode', 'cash').upper()}"))
     if sale_data.get("transaction_ref"):
         lines.append(("text", f"Ref      : {sale_data['transaction_ref']}"))
-    lines.append(("separator", "="))
-    lines.append(("center", "Thank you for shopping!"))
-    lines.append(("center", "Visit again :)"))
-    lines.append(("cut", None))
     return lines
 
 
+def format_receipt(sale_data: dict) -> list:
+    """
+    Build a list of print commands from sale data dict.
+    sale_data structure:
+        {
+          "sale_id": int,
+          "created_at": str,
+          "cashier": str,
+          "customer": str | None,
+          "payment_mode": str,
+          "transaction_ref": str | None,
+          "items": [{"name", "qty", "unit_price", "subtotal"}, ...],
+          "subtotal": float,
+          "discount": float,
+          "tax": float,
+          "total": float,
+        }
+    """
+    return _header_lines() + _body_lines(sale_data) + _footer_lines()
+
+
+def _encode(text: str) -> bytes:
+    return (text + "\n").encode(ENCODING, errors="replace")
+
+
+def render(commands: list) -> bytes:
+    """Compile print commands into ESC/POS bytes; every styled line resets its style."""
+    out = bytearray()
+    for cmd_type, content in commands:
+        if cmd_type == "header":
+            out += ALIGN_CENTER + BOLD_ON + SIZE_DOUBLE + _encode(content) + SIZE_NORMAL + BOLD_OFF + ALIGN_LEFT
+        elif cmd_type == "center":
+            out += ALIGN_CENTER + _encode(content) + ALIGN_LEFT
+        elif cmd_type == "bold":
+            out += BOLD_ON + _encode(content) + BOLD_OFF
+        elif cmd_type == "separator":
+            out += _encode(content * LINE_WIDTH)
+        elif cmd_type in ("item", "text"):
+            out += _encode(content)
+        elif cmd_type == "cut":
+            out += FEED_AND_CUT
+    return bytes(out)
+
+
+@lru_cache(maxsize=1)
+def _static_segments() -> tuple:
+    """(header, footer) bytes: store details do not change while the app runs."""
+    return INIT + render(_header_lines()), render(_footer_lines())
+
+
+def render_receipt(sale_data: dict) -> bytes:
+    """The complete receipt as one ESC/POS buffer."""
+    header, footer = _static_segments()
+    return header + render(_body_lines(sale_data)) + footer
+
+
 def print_receipt(sale_data: dict) -> dict:
-    """Format and send receipt to the printer."""
+    """Format and send receipt to the printer in a single write."""
     try:
-        printer = _get_printer()
-        commands = format_receipt(sale_data)
-
-        for cmd_type, content in commands:
-            if cmd_type == "header":
-                printer.set(align="center", bold=True, double_height=True, double_width=True)
-                printer.text(content + "\n")
-                printer.set()  # reset
-            elif cmd_type == "center":
-                printer.set(align="center")
-                printer.text(content + "\n")
-                printer.set()
-            elif cmd_type == "bold":
-                printer.set(bold=True)
-                printer.text(content + "\n")
-                printer.set()
-            elif cmd_type == "separator":
-                printer.text(content * 42 + "\n")
-            elif cmd_type == "item":
-                printer.text(content + "\n")
-            elif cmd_type == "text":
-                printer.text(content + "\n")
-            elif cmd_type == "cut":
-                printer.cut()
-
+        printer_connection.write(render_receipt(sale_data))
         return {"success": True, "message": "Receipt printed successfully"}
 
     except Exception as e:
@@ -4,14 +4,31 @@ hardware/scale.py — RS-232 Digital Scale via pyserial.
 Connects to a serial weighing scale (common protocol: send ENQ, read weight string).
 Most generic RS-232 supermarket scales respond with a string like "  1.250 kg\r\n".
 
+A single long-lived ScaleSession keeps the port open and polls it from a
+background thread, so `read_weight()` answers from memory instead of opening
+the port per button press. A reading counts as stable when the scale says so
+(ST / US prefix) or, for scales without the flag, when the last
+SCALE_STABLE_SAMPLES readings agree within SCALE_STABLE_TOLERANCE kg.
+Subscribers (the SSE stream in routers/hardware.py) get every change.
+
 Configure via .env:
     SCALE_COM_PORT=COM3
     SCALE_BAUD_RATE=9600
     SCALE_TIMEOUT=2
+    SCALE_POLL_INTERVAL=0.2
+    SCALE_STABLE_SAMPLES=3
+    SCALE_STABLE_TOLERANCE=0.002
+
+Without a scale, `python -m backend.hardware.fake_scale` serves one on a pty.
 """
+import asyncio
 import os
 import re
+import threading
+import time
 import logging
+from collections import deque
+from typing import Dict, Optional
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -20,41 +37,192 @@ logger = logging.getLogger(__name__)
 COM_PORT = os.getenv("SCALE_COM_PORT", "COM3")
 BAUD_RATE = int(os.getenv("SCALE_BAUD_RATE", 9600))
 TIMEOUT = float(os.getenv("SCALE_TIMEOUT", 2))
+POLL_INTERVAL = float(os.getenv("SCALE_POLL_INTERVAL", 0.2))
+STABLE_SAMPLES = int(os.getenv("SCALE_STABLE_SAMPLES", 3))
+STABLE_TOLERANCE = float(os.getenv("SCALE_STABLE_TOLERANCE", 0.002))    # kg
+RECONNECT_DELAY = 2
+MAX_AGE = TIMEOUT + 1           # a reading older than this means the reader is stuck
+SUBSCRIBER_QUEUE = 100
+
+
+class ScaleSession:
+
+    def __init__(self, port: str = COM_PORT, baudrate: int = BAUD_RATE):
+        self.port = port
+        self.baudrate = baudrate
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._samples = deque(maxlen=STABLE_SAMPLES)
+        self._reading: Optional[dict] = None
+        self._read_at = 0.0
+        self._error: Optional[str] = "Scale not connected yet"
+        self._subscribers: Dict[asyncio.Queue, asyncio.AbstractEventLoop] = {}
+        self.connected = False
+        self.reconnects = 0
+        self.samples = 0
+
+    # ── Background reader ─────────────────────────────────────────────────────
+
+    def start(self):
+        """Start the reader thread once; later calls are no-ops."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="scale-reader", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=TIMEOUT + 1)
+
+    def _run(self):
+        try:
+            import serial  # pyserial
+        except ImportError:
+            self._fail("pyserial not installed. Run: pip install pyserial")
+            return
+
+        while not self._stop.is_set():
+            try:
+                with serial.Serial(
+                    port=self.port,
+                    baudrate=self.baudrate,
+                    bytesize=serial.EIGHTBITS,
+                    parity=serial.PARITY_NONE,
+                    stopbits=serial.STOPBITS_ONE,
+                    timeout=TIMEOUT,
+                ) as ser:
+                    logger.info(f"Scale connected on {self.port}")
+                    self.connected = True
+                    while not self._stop.is_set():
+                        # Some scales need ENQ to trigger a reading
+                        ser.write(b"\x05")
+                        raw = ser.readline().decode("ascii", errors="ignore").strip()
+                        if not raw:
+                            raise TimeoutError(f"No answer from scale within {TIMEOUT:g}s")
+                        self._sample(raw)
+                        self._stop.wait(POLL_INTERVAL)
+            except Exception as e:
+                self._fail(str(e))
+                self.reconnects += 1
+                self._stop.wait(RECONNECT_DELAY)
+
+    def _fail(self, error: str):
+        was_connected = self.connected
+        self.connected = False
+        with self._lock:
+            changed = self._error != error
+            self._error = error
+            self._reading = None
+            self._samples.clear()
+        if changed or was_connected:
+            logger.warning(f"Scale read error: {error}")
+            self._publish({"weight": None, "stable": False, "error": error})
+
+    def _sample(self, raw: str):
+        parsed = _parse_weight(raw)
+        self.samples += 1
+        if parsed["weight"] is None:
+            self._samples.clear()
+            reading = {"weight": None, "stable": False, "error": parsed["error"], "raw": raw}
+        else:
+            self._samples.append(parsed["weight"])
+            stable = _stability_flag(raw)
+            if stable is None:
+                stable = (
+                    len(self._samples) == self._samples.maxlen
+                    and max(self._samples) - min(self._samples) <= STABLE_TOLERANCE
+                )
+            reading = {**parsed, "stable": stable}
+        with self._lock:
+            previous = self._reading
+            self._reading, self._read_at, self._error = reading, time.monotonic(), None
+        if previous is None or (previous["weight"], previous["stable"]) != (reading["weight"], reading["stable"]):
+            self._publish(reading)
+
+    # ── Reads ─────────────────────────────────────────────────────────────────
+
+    def current(self) -> dict:
+        """Latest reading, stable or not, or the error that stopped the reader."""
+        with self._lock:
+            reading, read_at, error = self._reading, self._read_at, self._error
+        if reading is None:
+            return {"weight": None, "stable": False, "error": error or "Scale not responding"}
+        if time.monotonic() - read_at > MAX_AGE:
+            return {"weight": None, "stable": False, "error": "Scale not responding"}
+        return reading
+
+    def read(self) -> dict:
+        """The current weight if it is stable; otherwise why there is none."""
+        reading = self.current()
+        if reading["weight"] is not None and not reading["stable"]:
+            return {"weight": None, "stable": False, "error": "Weight not stable yet", "current": reading["weight"]}
+        return reading
+
+    def stats(self) -> dict:
+        return {
+            "port": self.port,
+            "connected": self.connected,
+            "samples": self.samples,
+            "reconnects": self.reconnects,
+            "subscribers": len(self._subscribers),
+        }
+
+    # ── Subscriptions ─────────────────────────────────────────────────────────
+
+    def subscribe(self) -> asyncio.Queue:
+        """Queue of readings for the calling event loop. Call unsubscribe when done."""
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE)
+        with self._lock:
+            self._subscribers[queue] = asyncio.get_running_loop()
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        with self._lock:
+            self._subscribers.pop(queue, None)
+
+    def _publish(self, reading: dict):
+        with self._lock:
+            subscribers = list(self._subscribers.items())
+        for queue, loop in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._offer, queue, reading)
+            except RuntimeError:
+                self.unsubscribe(queue)     # loop already closed
+
+    @staticmethod
+    def _offer(queue: asyncio.Queue, reading: dict):
+        if queue.full():
+            queue.get_nowait()              # only the newest weight matters
+        queue.put_nowait(reading)
+
+
+scale_session = ScaleSession()
 
 
 def read_weight() -> dict:
     """
-    Open the serial port, read a weight value, and return it.
+    Return the scale's current stable weight from the background session.
 
     Returns:
-        {"weight": float, "unit": "kg", "raw": str}  on success
-        {"weight": None, "error": str}                on failure
+        {"weight": float, "unit": "kg", "raw": str, "stable": True}  on success
+        {"weight": None, "error": str, ...}                           otherwise
     """
-    try:
-        import serial  # pyserial
-    except ImportError:
-        return {"weight": None, "error": "pyserial not installed. Run: pip install pyserial"}
-
-    try:
-        with serial.Serial(
-            port=COM_PORT,
-            baudrate=BAUD_RATE,
-            bytesize=serial.EIGHTBITS,
-            parity=serial.PARITY_NONE,
-            stopbits=serial.STOPBITS_ONE,
-            timeout=TIMEOUT,
-        ) as ser:
-            # Some scales need ENQ to trigger a reading
-            ser.write(b"\x05")
-
-            raw = ser.readline().decode("ascii", errors="ignore").strip()
-            logger.info(f"Scale raw response: {repr(raw)}")
-
-            return _parse_weight(raw)
-
-    except Exception as e:
-        logger.warning(f"Scale read error: {e}")
-        return {"weight": None, "error": str(e)}
+    scale_session.start()
+    return scale_session.read()
+
+
+def _stability_flag(raw: str) -> Optional[bool]:
+    """True / False from an 'ST,...' / 'US,...' prefix; None when the scale sends no flag."""
+    head = raw.lstrip()[:2].upper()
+    if head == "ST":
+        return True
+    if head == "US":
+        return False
+    return None
 
 
 def _parse_weight(raw: str) -> dict:
@@ -19,17 +19,27 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # ── Import DB and models to trigger Base registration ──────────────────────────
-from backend.database import engine, SessionLocal
-from backend.models import User, Product, Customer, Sale, SaleItem, InventoryLog, CreditLedger
+from backend.database import engine, SessionLocal, ASYNC_DB, async_engine
+from backend.executors import all_stats as executor_stats
+from backend.models import (
+    User, Product, Customer, Sale, SaleItem, InventoryLog, CreditLedger, IdempotencyKey,
+    SalesDailyRollup, ProductDailyRollup,
+)
 from backend.database import Base
 
 # ── Import routers ─────────────────────────────────────────────────────────────
 from backend.routers.auth import router as auth_router
-from backend.routers.products import router as products_router
-from backend.routers.sales import router as sales_router
 from backend.routers.inventory import router as inventory_router
-from backend.routers.dashboard import router as dashboard_router
 from backend.routers.hardware import router as hardware_router
+if ASYNC_DB:
+    # async def handlers on the async engine; same paths and responses
+    from backend.routers.async_products import router as products_router
+    from backend.routers.async_sales import router as sales_router
+    from backend.routers.async_dashboard import router as dashboard_router
+else:
+    from backend.routers.products import router as products_router
+    from backend.routers.sales import router as sales_router
+    from backend.routers.dashboard import router as dashboard_router
 
 # ── Create FastAPI app ─────────────────────────────────────────────────────────
 app = FastAPI(
@@ -45,6 +55,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # ── Include routers ────────────────────────────────────────────────────────────
@@ -62,7 +73,37 @@ def on_startup():
     logger.info("Creating database tables…")
     Base.metadata.create_all(bind=engine)
     logger.info("Tables ready.")
+    _run_migrations()
     _seed_default_admin()
+    _backfill_rollups()
+    _load_catalog_index()
+    _load_low_stock_tracker()
+    _start_scale_session()
+    _start_print_queue()
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    from backend.hardware.scale import scale_session
+    from backend.hardware.printer import printer_connection
+    from backend.hardware.print_queue import receipt_queue
+    from backend.hardware.pos_machine import aclose as close_terminal_clients
+
+    scale_session.stop()
+    receipt_queue.stop()
+    printer_connection.close()
+    await close_terminal_clients()
+    if async_engine is not None:
+        await async_engine.dispose()
+
+
+def _run_migrations():
+    """Add indexes that create_all cannot add to tables that already exist."""
+    from backend.migrations import run_migrations
+
+    applied = run_migrations(engine)
+    if applied:
+        logger.info(f"Applied schema migrations: {applied}")
 
 
 def _seed_default_admin():
@@ -86,6 +127,53 @@ def _seed_default_admin():
         db.close()
 
 
+def _backfill_rollups():
+    """Build the dashboard rollups once for databases that predate them."""
+    from backend.services.rollup_service import RollupService
+
+    db = SessionLocal()
+    try:
+        RollupService.backfill_if_empty(db)
+    finally:
+        db.close()
+
+
+def _load_catalog_index():
+    """Warm the in-memory typeahead index so the first POS search is fast."""
+    from backend.services.catalog_index import catalog_index
+
+    db = SessionLocal()
+    try:
+        catalog_index.load(db)
+    finally:
+        db.close()
+
+
+def _load_low_stock_tracker():
+    """Build the low-stock set so alerts and the SSE stream start populated."""
+    from backend.services.low_stock import low_stock_tracker
+
+    db = SessionLocal()
+    try:
+        low_stock_tracker.load(db)
+    finally:
+        db.close()
+
+
+def _start_scale_session():
+    """Open the scale once and keep reading it in the background."""
+    from backend.hardware.scale import scale_session
+
+    scale_session.start()
+
+
+def _start_print_queue():
+    """Start the receipt printer worker; receipts spooled before a restart are retried."""
+    from backend.hardware.print_queue import receipt_queue
+
+    receipt_queue.start()
+
+
 # ── Health check ───────────────────────────────────────────────────────────────
 @app.get("/", tags=["Health"])
 def root():
@@ -95,3 +183,9 @@ def root():
 @app.get("/health", tags=["Health"])
 def health():
     return {"status": "healthy"}
+
+
+@app.get("/health/executors", tags=["Health"])
+def health_executors():
+    """Queue depth, wait and run times of the dedicated executors."""
+    return executor_stats()
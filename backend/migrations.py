@@ -0,0 +1,249 @@
+"""
+migrations.py — Versioned, online-safe schema migrations.
+
+Base.metadata.create_all only creates missing tables; it never adds an index
+to a table that already exists. The migrations below bring existing
+databases up to date: each one runs once, in version order, and is recorded
+in the schema_migrations table. New databases get the same indexes from the
+models, so every statement here is IF NOT EXISTS.
+
+On PostgreSQL indexes are built with CREATE INDEX CONCURRENTLY in autocommit
+mode, so sales keep flowing while a large table is indexed. A concurrent
+build that was interrupted leaves an INVALID index behind; it is dropped and
+rebuilt on the next run.
+
+    python -m backend.migrations                  # apply pending migrations
+    python -m backend.migrations --status         # list applied / pending versions
+    python -m backend.migrations --check-plans    # EXPLAIN hot queries, exit 1 on a full scan
+"""
+import argparse
+import logging
+import re
+import sys
+from datetime import datetime, timedelta
+from typing import List, NamedTuple, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger(__name__)
+
+ADVISORY_LOCK_KEY = 7_260_016    # serialises migrations across workers (PostgreSQL)
+
+
+class _Index(NamedTuple):
+    name: str
+    table: str
+    columns: str
+    where: Optional[str] = None
+    include: Optional[str] = None    # PostgreSQL INCLUDE columns (index-only scans)
+    using: Optional[str] = None      # PostgreSQL access method, e.g. gin
+    postgresql_only: bool = False
+
+
+class _Sql(NamedTuple):
+    sql: str
+    postgresql_only: bool = False
+
+
+MIGRATIONS: List[Tuple[int, str, list]] = [
+    (1, "hot path indexes", [
+        _Index("ix_sales_created_at_id", "sales", "created_at, id"),
+        _Index("ix_sales_created_at_status", "sales", "created_at, payment_status",
+               include="payment_mode, total"),
+        _Index("ix_sales_payment_status", "sales", "payment_status"),
+        _Index("ix_sale_items_product_id", "sale_items", "product_id"),
+        _Index("ix_inventory_created_at_id", "inventory", "created_at, id"),
+        _Index("ix_inventory_product_created_id", "inventory", "product_id, created_at, id"),
+        _Index("ix_credit_ledger_customer_created", "credit_ledger", "customer_id, created_at"),
+        _Index("ix_products_low_stock", "products", "stock_qty", where="stock_qty <= min_stock_alert"),
+    ]),
+    (2, "product search trigram indexes", [
+        _Sql("CREATE EXTENSION IF NOT EXISTS pg_trgm", postgresql_only=True),
+        _Index("ix_products_name_trgm", "products", "name gin_trgm_ops", using="gin", postgresql_only=True),
+        _Index("ix_products_barcode_trgm", "products", "barcode gin_trgm_ops", using="gin", postgresql_only=True),
+        _Index("ix_products_category_trgm", "products", "category gin_trgm_ops", using="gin", postgresql_only=True),
+    ]),
+]
+
+
+# ── Applying ──────────────────────────────────────────────────────────────────
+
+def _drop_invalid_index(conn: Connection, name: str):
+    invalid = conn.execute(text(
+        "SELECT 1 FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid "
+        "WHERE c.relname = :name AND NOT i.indisvalid"
+    ), {"name": name}).first()
+    if invalid:
+        logger.warning(f"Dropping invalid index {name} left by an interrupted build")
+        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+
+
+def _apply_step(conn: Connection, step, postgresql: bool):
+    if step.postgresql_only and not postgresql:
+        return
+    if isinstance(step, _Sql):
+        conn.execute(text(step.sql))
+        return
+    if postgresql:
+        _drop_invalid_index(conn, step.name)
+        sql = f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {step.name} ON {step.table}"
+        if step.using:
+            sql += f" USING {step.using}"
+        sql += f" ({step.columns})"
+        if step.include:
+            sql += f" INCLUDE ({step.include})"
+    else:
+        sql = f"CREATE INDEX IF NOT EXISTS {step.name} ON {step.table} ({step.columns})"
+    if step.where:
+        sql += f" WHERE {step.where}"
+    conn.execute(text(sql))
+
+
+def run_migrations(engine: Engine) -> List[int]:
+    """Apply pending migrations. Returns the versions applied by this call."""
+    postgresql = engine.dialect.name == "postgresql"
+    applied_now = []
+    # CONCURRENTLY cannot run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        if postgresql:
+            conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": ADVISORY_LOCK_KEY})
+        try:
+            conn.execute(text(
+                "CREATE TABLE IF NOT EXISTS schema_migrations ("
+                " version INTEGER PRIMARY KEY,"
+                " name VARCHAR(100) NOT NULL,"
+                " applied_at TIMESTAMP NOT NULL)"
+            ))
+            done = set(conn.execute(text("SELECT version FROM schema_migrations")).scalars())
+            for version, name, steps in MIGRATIONS:
+                if version in done:
+                    continue
+                logger.info(f"Applying migration {version}: {name}")
+                for step in steps:
+                    _apply_step(conn, step, postgresql)
+                conn.execute(
+                    text("INSERT INTO schema_migrations (version, name, applied_at) VALUES (:v, :n, :t)"),
+                    {"v": version, "n": name, "t": datetime.utcnow()},
+                )
+                applied_now.append(version)
+        finally:
+            if postgresql:
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": ADVISORY_LOCK_KEY})
+    return applied_now
+
+
+def migration_status(engine: Engine) -> List[dict]:
+    with engine.connect() as conn:
+        try:
+            done = dict(conn.execute(text("SELECT version, applied_at FROM schema_migrations")).all())
+        except Exception:
+            done = {}
+    return [
+        {"version": v, "name": name, "applied_at": done.get(v)}
+        for v, name, _ in MIGRATIONS
+    ]
+
+
+# ── Plan checks ───────────────────────────────────────────────────────────────
+
+_now = datetime(2024, 1, 1)
+
+# name → (table that must not be fully scanned, SQL, params, postgresql_only)
+HOT_QUERIES = {
+    "sales page (keyset)": (
+        "sales",
+        "SELECT id FROM sales WHERE (created_at, id) < (:ts, :id) "
+        "ORDER BY created_at DESC, id DESC LIMIT 100",
+        {"ts": _now, "id": 1000}, False,
+    ),
+    "sales of a day": (
+        "sales",
+        "SELECT payment_mode, SUM(total) FROM sales "
+        "WHERE created_at >= :start AND created_at < :end AND payment_status != 'failed' "
+        "GROUP BY payment_mode",
+        {"start": _now, "end": _now + timedelta(days=1)}, False,
+    ),
+    "pending card payments": (
+        "sales", "SELECT id FROM sales WHERE payment_status = 'pending'", {}, False,
+    ),
+    "sale items of a product": (
+        "sale_items", "SELECT sale_id, qty FROM sale_items WHERE product_id = :pid", {"pid": 1}, False,
+    ),
+    "stock movements of a product": (
+        "inventory",
+        "SELECT id FROM inventory WHERE product_id = :pid ORDER BY created_at DESC, id DESC LIMIT 200",
+        {"pid": 1}, False,
+    ),
+    "customer credit statement": (
+        "credit_ledger",
+        "SELECT id, amount FROM credit_ledger WHERE customer_id = :cid ORDER BY created_at DESC",
+        {"cid": 1}, False,
+    ),
+    "low stock products": (
+        "products",
+        "SELECT id FROM products WHERE stock_qty <= min_stock_alert ORDER BY stock_qty", {}, False,
+    ),
+    "dashboard day": (
+        "sales_daily_rollup", "SELECT * FROM sales_daily_rollup WHERE day = :day", {"day": _now.date()}, False,
+    ),
+    "top products window": (
+        "product_daily_rollup",
+        "SELECT product_id, SUM(revenue) FROM product_daily_rollup WHERE day >= :day GROUP BY product_id",
+        {"day": _now.date()}, False,
+    ),
+    "product substring search": (
+        "products", "SELECT id FROM products WHERE name ILIKE :q", {"q": "%milk%"}, True,
+    ),
+}
+
+
+def check_plans(engine: Engine) -> List[dict]:
+    """
+    EXPLAIN every hot query and flag the ones that fall back to a full table
+    scan. On PostgreSQL sequential scans are disabled for the check, so a
+    small table does not hide a missing index.
+    """
+    postgresql = engine.dialect.name == "postgresql"
+    results = []
+    with engine.connect() as conn:
+        if postgresql:
+            conn.execute(text("SET enable_seqscan = off"))
+        for name, (table, sql, params, postgresql_only) in HOT_QUERIES.items():
+            if postgresql_only and not postgresql:
+                continue
+            if postgresql:
+                plan = [r[0] for r in conn.execute(text(f"EXPLAIN {sql}"), params)]
+                full_scan = any(re.search(rf"Seq Scan on {table}\b", line) for line in plan)
+            else:
+                plan = [r[-1] for r in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params)]
+                full_scan = any(re.fullmatch(rf"SCAN {table}", line.strip()) for line in plan)
+            results.append({"query": name, "ok": not full_scan, "plan": plan})
+        conn.rollback()
+    return results
+
+
+if __name__ == "__main__":
+    from backend.database import engine
+
+    parser = argparse.ArgumentParser(description="Apply or inspect schema migrations.")
+    parser.add_argument("--status", action="store_true", help="list applied and pending migrations")
+    parser.add_argument("--check-plans", action="store_true",
+                        help="EXPLAIN hot queries and exit 1 if any needs a full table scan")
+    args = parser.parse_args()
+
+    if args.status:
+        for m in migration_status(engine):
+            state = f"applied {m['applied_at']}" if m["applied_at"] else "pending"
+            print(f"{m['version']:>4}  {m['name']:<40} {state}")
+    elif args.check_plans:
+        failed = 0
+        for r in check_plans(engine):
+            print(f"{'ok  ' if r['ok'] else 'SCAN'}  {r['query']}")
+            if not r["ok"]:
+                failed += 1
+                for line in r["plan"]:
+                    print(f"        {line}")
+        sys.exit(1 if failed else 0)
+    else:
+        logging.basicConfig(level=logging.INFO)
+        print(f"Applied: {run_migrations(engine) or 'nothing pending'}")
@@ -5,8 +5,11 @@ from backend.models.sale import Sale
 from backend.models.sale_item import SaleItem
 from backend.models.inventory import InventoryLog
 from backend.models.credit_ledger import CreditLedger
+from backend.models.idempotency_key import IdempotencyKey
+from backend.models.rollup import SalesDailyRollup, ProductDailyRollup
 
 __all__ = [
     "User", "Product", "Customer", "Sale",
-    "SaleItem", "InventoryLog", "CreditLedger",
+    "SaleItem", "InventoryLog", "CreditLedger", "IdempotencyKey",
+    "SalesDailyRollup", "ProductDailyRollup",
 ]
@@ -2,13 +2,17 @@
 models/credit_ledger.py — Credit sales and repayments tracker
 """
 from datetime import datetime
-from sqlalchemy import Column, Integer, Float, DateTime, String, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, Float, DateTime, String, ForeignKey, Boolean, Index
 from sqlalchemy.orm import relationship
 from backend.database import Base
 
 
 class CreditLedger(Base):
     __tablename__ = "credit_ledger"
+    __table_args__ = (
+        # A customer's statement, newest first
+        Index("ix_credit_ledger_customer_created", "customer_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     customer_id = Column(Integer, ForeignKey("customers.id"), nullable=False, index=True)
@@ -0,0 +1,16 @@
+"""
+models/idempotency_key.py — Client-supplied keys that make POST /sales replay-safe
+"""
+from datetime import datetime
+from sqlalchemy import Column, Integer, DateTime, String, ForeignKey
+from backend.database import Base
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    key = Column(String(100), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    request_hash = Column(String(64), nullable=False)   # sha256 of the request body
+    sale_id = Column(Integer, ForeignKey("sales.id"), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
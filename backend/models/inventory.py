@@ -2,7 +2,7 @@
 models/inventory.py — Audit log for stock movements
 """
 from datetime import datetime
-from sqlalchemy import Column, Integer, Float, DateTime, String, ForeignKey, Enum
+from sqlalchemy import Column, Integer, Float, DateTime, String, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 from backend.database import Base
 import enum
@@ -17,6 +17,11 @@ class MovementType(str, enum.Enum):
 
 class InventoryLog(Base):
     __tablename__ = "inventory"
+    __table_args__ = (
+        # Keyset pagination over all movements and per product
+        Index("ix_inventory_created_at_id", "created_at", "id"),
+        Index("ix_inventory_product_created_id", "product_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     product_id = Column(Integer, ForeignKey("products.id"), nullable=False, index=True)
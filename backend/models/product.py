@@ -2,7 +2,7 @@
 models/product.py — Supermarket product / SKU
 """
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Float, DateTime
+from sqlalchemy import Column, Integer, String, Float, DateTime, Index, DDL, event, text
 from backend.database import Base
 
 
@@ -21,3 +21,24 @@ class Product(Base):
     description = Column(String(300), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        # Trigram GIN indexes back ILIKE '%q%' and similarity search (PostgreSQL only)
+        Index("ix_products_name_trgm", "name",
+              postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}).ddl_if(dialect="postgresql"),
+        Index("ix_products_barcode_trgm", "barcode",
+              postgresql_using="gin", postgresql_ops={"barcode": "gin_trgm_ops"}).ddl_if(dialect="postgresql"),
+        Index("ix_products_category_trgm", "category",
+              postgresql_using="gin", postgresql_ops={"category": "gin_trgm_ops"}).ddl_if(dialect="postgresql"),
+        # Partial index: only products at or below their alert threshold
+        Index("ix_products_low_stock", "stock_qty",
+              postgresql_where=text("stock_qty <= min_stock_alert"),
+              sqlite_where=text("stock_qty <= min_stock_alert")),
+    )
+
+
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
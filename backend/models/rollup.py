@@ -0,0 +1,27 @@
+"""
+models/rollup.py — Per-day aggregates of sales, kept current by RollupService
+"""
+from sqlalchemy import Column, Integer, Float, Date, String, ForeignKey, Enum
+from backend.database import Base
+from backend.models.sale import PaymentMode
+
+
+class SalesDailyRollup(Base):
+    """Revenue and transaction count per (day, payment mode), failed sales excluded."""
+    __tablename__ = "sales_daily_rollup"
+
+    day = Column(Date, primary_key=True)
+    payment_mode = Column(Enum(PaymentMode), primary_key=True)
+    revenue = Column(Float, nullable=False, default=0.0)
+    transactions = Column(Integer, nullable=False, default=0)
+
+
+class ProductDailyRollup(Base):
+    """Quantity and revenue sold per (day, product), failed sales excluded."""
+    __tablename__ = "product_daily_rollup"
+
+    day = Column(Date, primary_key=True)
+    product_id = Column(Integer, ForeignKey("products.id"), primary_key=True)
+    product_name = Column(String(150))          # latest name seen on a sale
+    qty = Column(Float, nullable=False, default=0.0)
+    revenue = Column(Float, nullable=False, default=0.0)
@@ -2,7 +2,7 @@
 models/sale.py — A completed sale transaction
 """
 from datetime import datetime
-from sqlalchemy import Column, Integer, Float, DateTime, Enum, ForeignKey, String
+from sqlalchemy import Column, Integer, Float, DateTime, Enum, ForeignKey, String, Index
 from sqlalchemy.orm import relationship
 from backend.database import Base
 import enum
@@ -23,6 +23,13 @@ class PaymentStatus(str, enum.Enum):
 
 class Sale(Base):
     __tablename__ = "sales"
+    __table_args__ = (
+        # Keyset pagination: ORDER BY created_at DESC, id DESC
+        Index("ix_sales_created_at_id", "created_at", "id"),
+        # Dashboard day aggregates; INCLUDE lets PostgreSQL answer them index-only
+        Index("ix_sales_created_at_status", "created_at", "payment_status",
+              postgresql_include=["payment_mode", "total"]),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     customer_id = Column(Integer, ForeignKey("customers.id"), nullable=True)
@@ -32,7 +39,7 @@ class Sale(Base):
     tax = Column(Float, default=0.0)
     total = Column(Float, nullable=False)
     payment_mode = Column(Enum(PaymentMode), default=PaymentMode.cash, nullable=False)
-    payment_status = Column(Enum(PaymentStatus), default=PaymentStatus.pending, nullable=False)
+    payment_status = Column(Enum(PaymentStatus), default=PaymentStatus.pending, nullable=False, index=True)
     transaction_ref = Column(String(100), nullable=True)   # POS / UPI reference
     notes = Column(String(300), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
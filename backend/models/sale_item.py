@@ -11,7 +11,7 @@ class SaleItem(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     sale_id = Column(Integer, ForeignKey("sales.id"), nullable=False, index=True)
-    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False, index=True)
     product_name = Column(String(150))          # snapshot at time of sale
     qty = Column(Float, nullable=False)
     unit_price = Column(Float, nullable=False)
@@ -0,0 +1,36 @@
+"""
+routers/async_dashboard.py — Admin KPI endpoints on the async engine (ASYNC_DB)
+"""
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from backend.database import get_async_db
+from backend.routers.params import Admin, SummaryDate, TopProducts
+from backend.services.async_service import AsyncDashboardService
+
+router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
+
+
+@router.get("/summary")
+async def daily_summary(_: Admin, target_date: SummaryDate = None, db: AsyncSession = Depends(get_async_db)):
+    return await AsyncDashboardService.daily_summary(db, target_date)
+
+
+@router.get("/top-products")
+async def top_products(query: TopProducts, _: Admin, db: AsyncSession = Depends(get_async_db)):
+    return await AsyncDashboardService.top_products(db, *query)
+
+
+@router.get("/low-stock")
+async def low_stock(_: Admin, db: AsyncSession = Depends(get_async_db)):
+    return await AsyncDashboardService.low_stock_alerts(db)
+
+
+@router.get("/credit-summary")
+async def credit_summary(_: Admin, db: AsyncSession = Depends(get_async_db)):
+    return await AsyncDashboardService.credit_summary(db)
+
+
+@router.get("/monthly-revenue")
+async def monthly_revenue(_: Admin, year: Optional[int] = None, db: AsyncSession = Depends(get_async_db)):
+    return await AsyncDashboardService.monthly_revenue(db, year)
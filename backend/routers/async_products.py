@@ -0,0 +1,71 @@
+"""
+routers/async_products.py — Product CRUD and barcode lookup on the async engine (ASYNC_DB)
+"""
+from typing import List
+from fastapi import APIRouter, Depends, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.database import get_async_db
+from backend.routers import products
+from backend.routers.params import Admin, Caller, ProductPage, SearchText, SuggestLimit, SuggestText
+from backend.services.async_service import AsyncProductService
+from backend.schemas.product import ProductCreate, ProductUpdate, ProductResponse, ProductSuggestion
+
+router = APIRouter(prefix="/products", tags=["Products"])
+
+
+@router.get("/", response_model=List[ProductResponse])
+async def list_products(response: Response, page: ProductPage, _: Caller, db: AsyncSession = Depends(get_async_db)):
+    """Products in id order. The next page's cursor is returned in `X-Next-Cursor`."""
+    rows, next_cursor = await AsyncProductService.get_all(db, *page)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return rows
+
+
+@router.get("/search", response_model=List[ProductResponse])
+async def search_products(q: SearchText, _: Caller, db: AsyncSession = Depends(get_async_db)):
+    return await AsyncProductService.search(db, q)
+
+
+@router.get("/suggest", response_model=List[ProductSuggestion])
+async def suggest_products(q: SuggestText, _: Caller, limit: SuggestLimit = 10,
+                           db: AsyncSession = Depends(get_async_db)):
+    """Microsecond typeahead served from the in-memory catalog index."""
+    return await AsyncProductService.suggest(db, q, limit)
+
+
+# No database access: same handlers as the sync router
+router.get("/suggest/stats")(products.suggest_stats)
+
+
+@router.get("/low-stock", response_model=List[ProductResponse])
+async def low_stock(_: Admin, db: AsyncSession = Depends(get_async_db)):
+    return await AsyncProductService.get_low_stock(db)
+
+
+router.get("/cache-stats")(products.cache_stats)
+
+
+@router.get("/barcode/{barcode}", response_model=ProductResponse)
+async def get_by_barcode(barcode: str, _: Caller, db: AsyncSession = Depends(get_async_db)):
+    return await AsyncProductService.get_by_barcode(db, barcode)
+
+
+@router.get("/{product_id}", response_model=ProductResponse)
+async def get_product(product_id: int, _: Caller, db: AsyncSession = Depends(get_async_db)):
+    return await AsyncProductService.get_by_id(db, product_id)
+
+
+@router.post("/", response_model=ProductResponse, status_code=201)
+async def create_product(data: ProductCreate, _: Admin, db: AsyncSession = Depends(get_async_db)):
+    return await AsyncProductService.create(db, data)
+
+
+@router.put("/{product_id}", response_model=ProductResponse)
+async def update_product(product_id: int, data: ProductUpdate, _: Admin, db: AsyncSession = Depends(get_async_db)):
+    return await AsyncProductService.update(db, product_id, data)
+
+
+@router.delete("/{product_id}")
+async def delete_product(product_id: int, _: Admin, db: AsyncSession = Depends(get_async_db)):
+    return await AsyncProductService.delete(db, product_id)
@@ -0,0 +1,63 @@
+"""
+routers/async_sales.py — Create and retrieve sales on the async engine (ASYNC_DB)
+"""
+from typing import List
+from fastapi import APIRouter, Depends, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.database import get_async_db
+from backend.routers import sales
+from backend.routers.params import Caller, IdempotencyKey, SalePage
+from backend.services.async_service import AsyncSalesService
+from backend.schemas.sale import SaleCreate, SaleResponse, SaleBatchCreate, SaleBatchResponse
+
+router = APIRouter(prefix="/sales", tags=["Sales"])
+
+
+@router.post("/", response_model=SaleResponse, status_code=201)
+async def create_sale(
+    data: SaleCreate,
+    current_user: Caller,
+    idempotency_key: IdempotencyKey = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Create a sale. Send an `Idempotency-Key` header to make retries safe: a
+    repeated request returns the original sale without touching stock.
+    """
+    return await AsyncSalesService.create_sale(
+        db, data, user_id=current_user.id, idempotency_key=idempotency_key
+    )
+
+
+@router.post("/batch", response_model=SaleBatchResponse)
+async def create_sales_batch(data: SaleBatchCreate, current_user: Caller, db: AsyncSession = Depends(get_async_db)):
+    """
+    Ingest many sales in one call (offline lane replay, imports). Returns a
+    per-sale result plus throughput; failed sales do not abort the batch.
+    """
+    return await AsyncSalesService.create_sales_batch(db, data, user_id=current_user.id)
+
+
+@router.get("/", response_model=List[SaleResponse])
+async def list_sales(response: Response, page: SalePage, _: Caller, db: AsyncSession = Depends(get_async_db)):
+    """Newest sales first. The next page's cursor is returned in `X-Next-Cursor`."""
+    rows, next_cursor = await AsyncSalesService.get_sales(db, *page)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return rows
+
+
+# The export streams from its own sync session: same handler as the sync router
+router.get("/export")(sales.export_sales)
+
+
+@router.get("/{sale_id}", response_model=SaleResponse)
+async def get_sale(sale_id: int, _: Caller, db: AsyncSession = Depends(get_async_db)):
+    return await AsyncSalesService.get_sale_by_id(db, sale_id)
+
+
+@router.patch("/{sale_id}/payment-status")
+async def update_payment(sale_id: int, status: str, _: Caller, ref: str = None,
+                         db: AsyncSession = Depends(get_async_db)):
+    """Called by POS machine callback to confirm/fail a card payment."""
+    return await AsyncSalesService.update_payment_status(db, sale_id, status, ref)
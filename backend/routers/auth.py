@@ -5,17 +5,20 @@ from fastapi import APIRouter, Depends
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from backend.database import get_db
-from backend.services.auth_service import AuthService
-from backend.schemas.user import UserCreate, UserResponse, Token
+from backend.services.auth_service import AuthService, Principal, require_admin_principal
+from backend.schemas.user import UserCreate, UserUpdate, UserResponse, Token
 from backend.models.user import User
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
 @router.post("/login", response_model=Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    """Login with username + password, returns JWT token."""
-    user = AuthService.authenticate(db, form_data.username, form_data.password)
+async def login(form_data: OAuth2PasswordRequestForm = Depends()):
+    """
+    Login with username + password, returns JWT token. Answers 503 with
+    Retry-After when the hashing executor's queue is full.
+    """
+    user = await AuthService.authenticate(form_data.username, form_data.password)
     token = AuthService.create_token(user)
     role = user.role.value if hasattr(user.role, "value") else user.role
     return Token(access_token=token, role=role, username=user.username, user_id=user.id)
@@ -38,3 +41,20 @@ def register(data: UserCreate, db: Session = Depends(get_db)):
     db.commit()
     db.refresh(user)
     return user
+
+
+@router.patch("/users/{user_id}", response_model=UserResponse)
+def update_user(
+    user_id: int,
+    data: UserUpdate,
+    db: Session = Depends(get_db),
+    _: Principal = Depends(require_admin_principal),
+):
+    """Change a user's name, password, role or active flag (admin)."""
+    return AuthService.update_user(db, user_id, data)
+
+
+@router.get("/cache-stats")
+def principal_cache_stats(_: Principal = Depends(require_admin_principal)):
+    """Hit/miss counters of this worker's principal cache."""
+    return AuthService.principal_cache_stats()
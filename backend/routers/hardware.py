@@ -1,25 +1,87 @@
 """
 routers/hardware.py — Endpoints that proxy to hardware modules.
 Backend calls these; frontend calls backend (no hardware import in frontend).
+
+No handler waits on a device from the shared threadpool. The scale is read
+continuously by its session thread and answers from memory. Receipts go to
+the print queue, which spools them and prints in the background, so an
+offline printer neither fails nor slows checkout. Terminal calls are native
+async on a pooled keep-alive client behind a bounded limiter (503 when full).
 """
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Optional
-from backend.services.auth_service import get_current_user
-from backend.models.user import User
+from typing import Awaitable, Optional
+from backend.executors import ExecutorBusy
+from backend.services.auth_service import Principal, get_current_principal
 
 router = APIRouter(prefix="/hardware", tags=["Hardware"])
 
+STREAM_KEEPALIVE = 15     # seconds between SSE comments on an idle stream
+
+
+async def _on_terminal(call: Awaitable):
+    try:
+        return await call
+    except ExecutorBusy as e:
+        raise HTTPException(status_code=503, detail=f"{e}, please retry", headers={"Retry-After": "1"})
+
+
+@router.get("/stats")
+def device_stats(_: Principal = Depends(get_current_principal)):
+    """Connection state, calls in flight and queue depth per device."""
+    from backend.hardware.scale import scale_session
+    from backend.hardware.printer import printer_connection
+    from backend.hardware.print_queue import receipt_queue
+    from backend.hardware import pos_machine
+    return {
+        "payment": pos_machine.stats(),
+        "printer": {**receipt_queue.stats(), "device": printer_connection.stats()},
+        "scale": scale_session.stats(),
+    }
+
 
 # ── Weight reading ────────────────────────────────────────────────────────────
 
 @router.get("/scale")
-def get_weight(_: User = Depends(get_current_user)):
-    """Read current weight from the RS-232 digital scale."""
+def get_weight(_: Principal = Depends(get_current_principal)):
+    """Current stable weight from the RS-232 digital scale (no serial I/O per call)."""
     from backend.hardware.scale import read_weight
     return read_weight()
 
 
+@router.get("/scale/stream")
+async def scale_stream(request: Request, _: Principal = Depends(get_current_principal)):
+    """
+    Server-sent `weight` events: the current reading first, then one per
+    change of weight or stability. `stable` is false while the scale settles.
+    """
+    from backend.hardware.scale import scale_session
+    scale_session.start()
+    queue = scale_session.subscribe()
+
+    async def _events():
+        try:
+            yield f"event: weight\ndata: {json.dumps(scale_session.current())}\n\n"
+            while not await request.is_disconnected():
+                try:
+                    reading = await asyncio.wait_for(queue.get(), timeout=STREAM_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: weight\ndata: {json.dumps(reading)}\n\n"
+        finally:
+            scale_session.unsubscribe(queue)
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # ── Receipt printing ──────────────────────────────────────────────────────────
 
 class PrintRequest(BaseModel):
@@ -36,14 +98,44 @@ class PrintRequest(BaseModel):
     total: float
 
 
-@router.post("/print")
-def print_receipt_endpoint(data: PrintRequest, _: User = Depends(get_current_user)):
-    """Format and send receipt to thermal printer."""
-    from backend.hardware.printer import print_receipt
-    result = print_receipt(data.model_dump())
-    if not result.get("success"):
-        raise HTTPException(status_code=500, detail=result.get("error", "Print failed"))
-    return result
+@router.post("/print", status_code=202)
+def print_receipt_endpoint(data: PrintRequest, _: Principal = Depends(get_current_principal)):
+    """
+    Queue a receipt for the thermal printer and return the job at once.
+    Poll /hardware/print/jobs/{id} for `printed`; failed jobs are retried.
+    """
+    from backend.hardware.print_queue import PrintQueueFull, receipt_queue
+    try:
+        return receipt_queue.submit(data.model_dump())
+    except PrintQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+
+
+@router.get("/print/jobs")
+def list_print_jobs(_: Principal = Depends(get_current_principal)):
+    """Receipts not printed yet, oldest first."""
+    from backend.hardware.print_queue import receipt_queue
+    return receipt_queue.pending()
+
+
+@router.get("/print/jobs/{job_id}")
+def get_print_job(job_id: str, _: Principal = Depends(get_current_principal)):
+    """Status of a job: queued, printing, retrying (with the last error), printed or cancelled."""
+    from backend.hardware.print_queue import receipt_queue
+    job = receipt_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Print job not found")
+    return job
+
+
+@router.delete("/print/jobs/{job_id}")
+def cancel_print_job(job_id: str, _: Principal = Depends(get_current_principal)):
+    """Drop a receipt that has not printed yet."""
+    from backend.hardware.print_queue import receipt_queue
+    job = receipt_queue.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="No pending print job with that id")
+    return job
 
 
 # ── POS Machine ───────────────────────────────────────────────────────────────
@@ -55,14 +147,29 @@ class PaymentRequest(BaseModel):
 
 
 @router.post("/payment/initiate")
-def initiate_pos_payment(data: PaymentRequest, _: User = Depends(get_current_user)):
+async def initiate_pos_payment(data: PaymentRequest, _: Principal = Depends(get_current_principal)):
     """Send a payment request to the Pine Labs Plutus Smart terminal."""
     from backend.hardware.pos_machine import initiate_payment
-    return initiate_payment(data.amount, data.payment_mode, data.reference)
+    return await _on_terminal(initiate_payment(data.amount, data.payment_mode, data.reference))
 
 
 @router.get("/payment/status/{transaction_id}")
-def get_pos_payment_status(transaction_id: str, _: User = Depends(get_current_user)):
+async def get_pos_payment_status(transaction_id: str, _: Principal = Depends(get_current_principal)):
     """Poll the Pine Labs terminal for transaction result."""
     from backend.hardware.pos_machine import get_payment_status
-    return get_payment_status(transaction_id)
+    return await _on_terminal(get_payment_status(transaction_id))
+
+
+@router.get("/payment/wait/{transaction_id}")
+async def wait_pos_payment(
+    transaction_id: str,
+    timeout: Optional[float] = Query(None, gt=0, description="Seconds to wait (default PAYMENT_WAIT_DEFAULT)"),
+    _: Principal = Depends(get_current_principal),
+):
+    """
+    Long-poll: returns as soon as the terminal reports `success` or `failed`,
+    or with `timed_out: true` when the deadline passes. The backend polls the
+    terminal with backoff, so the client makes a single request.
+    """
+    from backend.hardware.pos_machine import WAIT_DEFAULT, wait_for_payment
+    return await wait_for_payment(transaction_id, timeout or WAIT_DEFAULT)
@@ -1,14 +1,17 @@
 """
 routers/inventory.py — Stock management endpoints
 """
+import asyncio
+import json
 from typing import List, Optional
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from backend.database import get_db
 from backend.services.inventory_service import InventoryService
-from backend.services.auth_service import get_current_user, require_admin
+from backend.services.low_stock import low_stock_tracker
+from backend.services.auth_service import Principal, get_current_principal, require_admin_principal
 from backend.schemas.inventory import InventoryRestockRequest, InventoryLogResponse
-from backend.models.user import User
 
 router = APIRouter(prefix="/inventory", tags=["Inventory"])
 
@@ -17,21 +20,66 @@ router = APIRouter(prefix="/inventory", tags=["Inventory"])
 def restock(
     data: InventoryRestockRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_admin),
+    current_user: Principal = Depends(require_admin_principal),
 ):
     return InventoryService.restock(db, data, user_id=current_user.id)
 
 
 @router.get("/logs", response_model=List[InventoryLogResponse])
 def get_logs(
+    response: Response,
     product_id: Optional[int] = Query(None),
-    limit: int = 200,
+    limit: int = Query(200, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
     db: Session = Depends(get_db),
-    _: User = Depends(require_admin),
+    _: Principal = Depends(require_admin_principal),
 ):
-    return InventoryService.get_logs(db, product_id=product_id, limit=limit)
+    """Newest movements first. The next page's cursor is returned in `X-Next-Cursor`."""
+    logs, next_cursor = InventoryService.get_logs(db, product_id=product_id, limit=limit, cursor=cursor)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return logs
+
+
+STREAM_KEEPALIVE = 15     # seconds between SSE comments on an idle stream
 
 
 @router.get("/low-stock")
-def low_stock(db: Session = Depends(get_db), _: User = Depends(get_current_user)):
+def low_stock(db: Session = Depends(get_db), _: Principal = Depends(get_current_principal)):
     return InventoryService.get_low_stock(db)
+
+
+@router.get("/low-stock/stream")
+async def low_stock_stream(request: Request, _: Principal = Depends(get_current_principal)):
+    """
+    Server-sent events for low-stock threshold crossings. The first event is a
+    `snapshot` of the current set; then `low` / `ok` / `removed` per product.
+    A `resync` event means events were dropped and the client should refetch.
+    """
+    queue = low_stock_tracker.subscribe()
+
+    async def _events():
+        try:
+            snapshot = {"event": "snapshot", "products": low_stock_tracker.snapshot()}
+            yield f"event: snapshot\ndata: {json.dumps(snapshot)}\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=STREAM_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            low_stock_tracker.unsubscribe(queue)
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/low-stock/stats")
+def low_stock_stats(_: Principal = Depends(require_admin_principal)):
+    """Size of this worker's low-stock tracker and its open subscriptions."""
+    return low_stock_tracker.stats()
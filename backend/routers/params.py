@@ -0,0 +1,79 @@
+"""
+routers/params.py — Request parameters and auth dependencies shared by the sync and async routers
+
+routers/async_*.py serve the same routes as their sync counterparts when
+ASYNC_DB is enabled. Both import their signatures from here, so a limit,
+description or auth rule is changed in one place for both paths.
+"""
+from datetime import date
+from typing import Annotated, Literal, NamedTuple, Optional
+from fastapi import Depends, Header, Query
+from backend.services.auth_service import Principal, get_current_principal, require_admin_principal
+
+# ── Auth ──────────────────────────────────────────────────────────────────────
+
+Caller = Annotated[Principal, Depends(get_current_principal)]
+Admin = Annotated[Principal, Depends(require_admin_principal)]
+
+
+# ── Lists ─────────────────────────────────────────────────────────────────────
+
+class Page(NamedTuple):
+    skip: int
+    limit: int
+    cursor: Optional[str]
+
+
+def _page(default_limit: int):
+    def page(
+        skip: int = 0,
+        limit: int = Query(default_limit, ge=1, le=1000),
+        cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    ) -> Page:
+        return Page(skip, limit, cursor)
+    return page
+
+
+ProductPage = Annotated[Page, Depends(_page(200))]
+SalePage = Annotated[Page, Depends(_page(100))]
+
+
+# ── Products ──────────────────────────────────────────────────────────────────
+
+SearchText = Annotated[str, Query(description="Search query (name, barcode, or category)")]
+SuggestText = Annotated[str, Query(description="Typeahead text (name prefix, word prefix, or fuzzy)")]
+SuggestLimit = Annotated[int, Query(ge=1, le=50)]
+
+
+# ── Sales ─────────────────────────────────────────────────────────────────────
+
+IdempotencyKey = Annotated[Optional[str], Header(max_length=100)]
+
+
+# ── Dashboard ─────────────────────────────────────────────────────────────────
+
+SummaryDate = Annotated[Optional[date], Query(description="ISO date e.g. 2024-12-25")]
+
+
+class TopProductsQuery(NamedTuple):
+    """Arguments of DashboardService.top_products, in order."""
+    limit: int
+    window: str
+    date_from: Optional[date]
+    date_to: Optional[date]
+    category: Optional[str]
+    by: str
+
+
+def _top_products_query(
+    limit: int = Query(10, ge=1, le=100),
+    window: Literal["today", "7d", "30d", "custom", "all"] = Query("all"),
+    date_from: Optional[date] = Query(None, description="First day of a custom window"),
+    date_to: Optional[date] = Query(None, description="Last day of a custom window"),
+    category: Optional[str] = Query(None),
+    by: Literal["revenue", "qty"] = Query("revenue"),
+) -> TopProductsQuery:
+    return TopProductsQuery(limit, window, date_from, date_to, category, by)
+
+
+TopProducts = Annotated[TopProductsQuery, Depends(_top_products_query)]
@@ -1,83 +1,75 @@
 """
 routers/products.py — Product CRUD and barcode lookup
 """
-from typing import List, Optional
-from fastapi import APIRouter, Depends, Query
+from typing import List
+from fastapi import APIRouter, Depends, Response
 from sqlalchemy.orm import Session
 from backend.database import get_db
+from backend.routers.params import Admin, Caller, ProductPage, SearchText, SuggestLimit, SuggestText
 from backend.services.product_service import ProductService
-from backend.services.auth_service import get_current_user, require_admin
-from backend.schemas.product import ProductCreate, ProductUpdate, ProductResponse
-from backend.models.user import User
+from backend.schemas.product import ProductCreate, ProductUpdate, ProductResponse, ProductSuggestion
 
 router = APIRouter(prefix="/products", tags=["Products"])
 
 
 @router.get("/", response_model=List[ProductResponse])
-def list_products(
-    skip: int = 0,
-    limit: int = 200,
-    db: Session = Depends(get_db),
-    _: User = Depends(get_current_user),
-):
-    return ProductService.get_all(db, skip, limit)
+def list_products(response: Response, page: ProductPage, _: Caller, db: Session = Depends(get_db)):
+    """Products in id order. The next page's cursor is returned in `X-Next-Cursor`."""
+    products, next_cursor = ProductService.get_all(db, *page)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return products
 
 
 @router.get("/search", response_model=List[ProductResponse])
-def search_products(
-    q: str = Query(..., description="Search query (name, barcode, or category)"),
-    db: Session = Depends(get_db),
-    _: User = Depends(get_current_user),
-):
+def search_products(q: SearchText, _: Caller, db: Session = Depends(get_db)):
     return ProductService.search(db, q)
 
 
+@router.get("/suggest", response_model=List[ProductSuggestion])
+def suggest_products(q: SuggestText, _: Caller, limit: SuggestLimit = 10, db: Session = Depends(get_db)):
+    """Microsecond typeahead served from the in-memory catalog index."""
+    return ProductService.suggest(db, q, limit)
+
+
+@router.get("/suggest/stats")
+def suggest_stats(_: Admin):
+    """Memory footprint of the catalog index (total and per 100k SKUs)."""
+    from backend.services.catalog_index import catalog_index
+    return catalog_index.memory_report()
+
+
 @router.get("/low-stock", response_model=List[ProductResponse])
-def low_stock(db: Session = Depends(get_db), _: User = Depends(require_admin)):
+def low_stock(_: Admin, db: Session = Depends(get_db)):
     return ProductService.get_low_stock(db)
 
 
+@router.get("/cache-stats")
+def cache_stats(_: Admin):
+    """Hit/miss/eviction counters of this worker's product lookup cache."""
+    return ProductService.cache_stats()
+
+
 @router.get("/barcode/{barcode}", response_model=ProductResponse)
-def get_by_barcode(
-    barcode: str,
-    db: Session = Depends(get_db),
-    _: User = Depends(get_current_user),
-):
+def get_by_barcode(barcode: str, _: Caller, db: Session = Depends(get_db)):
     return ProductService.get_by_barcode(db, barcode)
 
 
 @router.get("/{product_id}", response_model=ProductResponse)
-def get_product(
-    product_id: int,
-    db: Session = Depends(get_db),
-    _: User = Depends(get_current_user),
-):
+def get_product(product_id: int, _: Caller, db: Session = Depends(get_db)):
     return ProductService.get_by_id(db, product_id)
 
 
 @router.post("/", response_model=ProductResponse, status_code=201)
-def create_product(
-    data: ProductCreate,
-    db: Session = Depends(get_db),
-    _: User = Depends(require_admin),
-):
+def create_product(data: ProductCreate, _: Admin, db: Session = Depends(get_db)):
     return ProductService.create(db, data)
 
 
 @router.put("/{product_id}", response_model=ProductResponse)
-def update_product(
-    product_id: int,
-    data: ProductUpdate,
-    db: Session = Depends(get_db),
-    _: User = Depends(require_admin),
-):
+def update_product(product_id: int, data: ProductUpdate, _: Admin, db: Session = Depends(get_db)):
     return ProductService.update(db, product_id, data)
 
 
 @router.delete("/{product_id}")
-def delete_product(
-    product_id: int,
-    db: Session = Depends(get_db),
-    _: User = Depends(require_admin),
-):
+def delete_product(product_id: int, _: Admin, db: Session = Depends(get_db)):
     return ProductService.delete(db, product_id)
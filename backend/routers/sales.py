@@ -1,14 +1,16 @@
 """
 routers/sales.py — Create and retrieve sales
 """
-from typing import List
-from fastapi import APIRouter, Depends
+from datetime import date
+from typing import List, Literal
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from backend.database import get_db
+from backend.database import get_db, SessionLocal
+from backend.routers.params import Admin, Caller, IdempotencyKey, SalePage
 from backend.services.sales_service import SalesService
-from backend.services.auth_service import get_current_user
-from backend.schemas.sale import SaleCreate, SaleResponse
-from backend.models.user import User
+from backend.services.export_service import ExportService
+from backend.schemas.sale import SaleCreate, SaleResponse, SaleBatchCreate, SaleBatchResponse
 
 router = APIRouter(prefix="/sales", tags=["Sales"])
 
@@ -16,38 +18,76 @@ router = APIRouter(prefix="/sales", tags=["Sales"])
 @router.post("/", response_model=SaleResponse, status_code=201)
 def create_sale(
     data: SaleCreate,
+    current_user: Caller,
+    idempotency_key: IdempotencyKey = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
 ):
-    return SalesService.create_sale(db, data, user_id=current_user.id)
+    """
+    Create a sale. Send an `Idempotency-Key` header to make retries safe: a
+    repeated request returns the original sale without touching stock.
+    """
+    return SalesService.create_sale(
+        db, data, user_id=current_user.id, idempotency_key=idempotency_key
+    )
+
+
+@router.post("/batch", response_model=SaleBatchResponse)
+def create_sales_batch(data: SaleBatchCreate, current_user: Caller, db: Session = Depends(get_db)):
+    """
+    Ingest many sales in one call (offline lane replay, imports). Returns a
+    per-sale result plus throughput; failed sales do not abort the batch.
+    """
+    return SalesService.create_sales_batch(db, data, user_id=current_user.id)
 
 
 @router.get("/", response_model=List[SaleResponse])
-def list_sales(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
-    _: User = Depends(get_current_user),
+def list_sales(response: Response, page: SalePage, _: Caller, db: Session = Depends(get_db)):
+    """Newest sales first. The next page's cursor is returned in `X-Next-Cursor`."""
+    sales, next_cursor = SalesService.get_sales(db, *page)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return sales
+
+
+@router.get("/export")
+def export_sales(
+    request: Request,
+    _: Admin,
+    date_from: date = Query(..., description="First day, inclusive (ISO date)"),
+    date_to: date = Query(..., description="Last day, inclusive (ISO date)"),
+    format: Literal["ndjson", "csv"] = Query("ndjson"),
 ):
-    return SalesService.get_sales(db, skip, limit)
+    """
+    Stream sales with their line items for a date range. The body is gzip
+    encoded when the client sends `Accept-Encoding: gzip`.
+    """
+    if date_to < date_from:
+        raise HTTPException(status_code=400, detail="date_to is before date_from")
+    gzip = "gzip" in request.headers.get("accept-encoding", "").lower()
+
+    # The request-scoped session closes before a streamed body is sent,
+    # so the generator owns its own session for the lifetime of the stream.
+    def _stream():
+        db = SessionLocal()
+        try:
+            yield from ExportService.export_sales(db, date_from, date_to, format, gzip)
+        finally:
+            db.close()
+
+    filename = f"sales_{date_from}_{date_to}.{format}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(_stream(), media_type=media_type, headers=headers)
 
 
 @router.get("/{sale_id}", response_model=SaleResponse)
-def get_sale(
-    sale_id: int,
-    db: Session = Depends(get_db),
-    _: User = Depends(get_current_user),
-):
+def get_sale(sale_id: int, _: Caller, db: Session = Depends(get_db)):
     return SalesService.get_sale_by_id(db, sale_id)
 
 
 @router.patch("/{sale_id}/payment-status")
-def update_payment(
-    sale_id: int,
-    status: str,
-    ref: str = None,
-    db: Session = Depends(get_db),
-    _: User = Depends(get_current_user),
-):
+def update_payment(sale_id: int, status: str, _: Caller, ref: str = None, db: Session = Depends(get_db)):
     """Called by POS machine callback to confirm/fail a card payment."""
     return SalesService.update_payment_status(db, sale_id, status, ref)
@@ -1,13 +1,17 @@
-from backend.schemas.user import UserCreate, UserLogin, UserResponse, Token
-from backend.schemas.product import ProductCreate, ProductUpdate, ProductResponse
+from backend.schemas.user import UserCreate, UserUpdate, UserLogin, UserResponse, Token
+from backend.schemas.product import ProductCreate, ProductUpdate, ProductResponse, ProductSuggestion
 from backend.schemas.customer import CustomerCreate, CustomerUpdate, CustomerResponse
-from backend.schemas.sale import SaleCreate, SaleItemIn, SaleResponse
+from backend.schemas.sale import (
+    SaleCreate, SaleItemIn, SaleResponse,
+    SaleBatchEntry, SaleBatchCreate, SaleBatchResult, SaleBatchResponse,
+)
 from backend.schemas.inventory import InventoryRestockRequest, InventoryLogResponse
 
 __all__ = [
-    "UserCreate", "UserLogin", "UserResponse", "Token",
-    "ProductCreate", "ProductUpdate", "ProductResponse",
+    "UserCreate", "UserUpdate", "UserLogin", "UserResponse", "Token",
+    "ProductCreate", "ProductUpdate", "ProductResponse", "ProductSuggestion",
     "CustomerCreate", "CustomerUpdate", "CustomerResponse",
     "SaleCreate", "SaleItemIn", "SaleResponse",
+    "SaleBatchEntry", "SaleBatchCreate", "SaleBatchResult", "SaleBatchResponse",
     "InventoryRestockRequest", "InventoryLogResponse",
 ]
@@ -42,3 +42,13 @@ class ProductResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class ProductSuggestion(BaseModel):
+    id: int
+    name: str
+    barcode: Optional[str]
+    unit: str
+    price: float
+    stock_qty: float
+    match: str   # prefix | token | fuzzy
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional, List
+from pydantic import BaseModel, Field
+from typing import Optional, List, Literal
 from datetime import datetime
 
 
@@ -14,7 +14,7 @@ class SaleCreate(BaseModel):
     customer_id: Optional[int] = None
     items: List[SaleItemIn]
     discount: float = 0.0         # overall cart discount %
-    payment_mode: str = "cash"    # cash | upi | card | credit
+    payment_mode: Literal["cash", "upi", "card", "credit"] = "cash"
     notes: Optional[str] = None
 
 
@@ -49,3 +49,30 @@ class SaleResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class SaleBatchEntry(SaleCreate):
+    payment_mode: str = "cash"    # checked per sale, so one bad entry fails alone
+    idempotency_key: Optional[str] = Field(None, max_length=100)
+    created_at: Optional[datetime] = None   # original sale time (offline lanes, imports)
+
+
+class SaleBatchCreate(BaseModel):
+    sales: List[SaleBatchEntry] = Field(..., max_length=5000)
+    chunk_size: int = Field(200, ge=1, le=1000)
+
+
+class SaleBatchResult(BaseModel):
+    index: int
+    status: str                   # created | duplicate | failed
+    sale_id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class SaleBatchResponse(BaseModel):
+    results: List[SaleBatchResult]
+    created: int
+    duplicates: int
+    failed: int
+    elapsed_ms: float
+    sales_per_sec: float
@@ -10,6 +10,13 @@ class UserCreate(BaseModel):
     role: str = "staff"  # "admin" | "staff"
 
 
+class UserUpdate(BaseModel):
+    full_name: Optional[str] = None
+    password: Optional[str] = None
+    role: Optional[str] = None       # "admin" | "staff"
+    is_active: Optional[int] = None
+
+
 class UserLogin(BaseModel):
     username: str
     password: str
@@ -1,10 +1,12 @@
-from backend.services.auth_service import AuthService, get_current_user, require_admin
+from backend.services.auth_service import (
+    AuthService, Principal, get_current_principal, require_admin_principal,
+)
 from backend.services.product_service import ProductService
 from backend.services.sales_service import SalesService
 from backend.services.inventory_service import InventoryService
 from backend.services.dashboard_service import DashboardService
 
 __all__ = [
-    "AuthService", "get_current_user", "require_admin",
+    "AuthService", "Principal", "get_current_principal", "require_admin_principal",
     "ProductService", "SalesService", "InventoryService", "DashboardService",
 ]
@@ -0,0 +1,146 @@
+"""
+services/async_service.py — async front ends for the product, sales and dashboard services.
+
+Used by the routers in routers/async_*.py when ASYNC_DB is enabled. Each
+method runs the existing sync service on an AsyncSession through run_sync, so
+the SQLAlchemy code stays in one place while every database round trip is
+awaited on the event loop instead of holding a threadpool thread.
+
+Results are converted to response schemas inside run_sync: lazy loads (sale
+items, expired attributes after commit) cannot be awaited once it returns.
+
+run_sync executes on the event loop thread, so it only suits calls that spend
+their time waiting on the database. Batch ingest validates, prices and builds
+thousands of rows in Python; it runs on a sync session in the threadpool
+instead, where it cannot stall every other request on the loop. (Exports are
+already served by the sync router's handler, which streams from a thread.)
+"""
+from datetime import date
+from typing import Callable, List, Optional, Tuple
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.database import SessionLocal
+from backend.schemas.product import ProductCreate, ProductUpdate, ProductResponse
+from backend.schemas.sale import SaleCreate, SaleResponse, SaleBatchCreate, SaleBatchResponse
+from backend.services.product_service import ProductService
+from backend.services.sales_service import SalesService
+from backend.services.dashboard_service import DashboardService
+
+
+async def _run(db: AsyncSession, fn: Callable, *args, dump: Optional[Callable] = None):
+    """Await `fn(session, *args)`; `dump` converts the result while the session can still load."""
+    def _call(session):
+        result = fn(session, *args)
+        return dump(result) if dump else result
+    return await db.run_sync(_call)
+
+
+async def _run_in_thread(fn: Callable, *args):
+    """Await `fn(session, *args)` on a sync session in the threadpool, for CPU-heavy calls."""
+    def _call():
+        db = SessionLocal()
+        try:
+            return fn(db, *args)
+        finally:
+            db.close()
+    return await run_in_threadpool(_call)
+
+
+def _many(schema):
+    return lambda rows: [schema.model_validate(r) for r in rows]
+
+
+def _page(schema):
+    return lambda result: ([schema.model_validate(r) for r in result[0]], result[1])
+
+
+class AsyncProductService:
+
+    @staticmethod
+    async def get_all(db: AsyncSession, skip: int = 0, limit: int = 200,
+                      cursor: Optional[str] = None) -> Tuple[List[ProductResponse], Optional[str]]:
+        return await _run(db, ProductService.get_all, skip, limit, cursor, dump=_page(ProductResponse))
+
+    @staticmethod
+    async def get_by_id(db: AsyncSession, product_id: int) -> ProductResponse:
+        return await _run(db, ProductService.get_by_id, product_id)
+
+    @staticmethod
+    async def get_by_barcode(db: AsyncSession, barcode: str) -> ProductResponse:
+        return await _run(db, ProductService.get_by_barcode, barcode)
+
+    @staticmethod
+    async def search(db: AsyncSession, query: str) -> List[ProductResponse]:
+        return await _run(db, ProductService.search, query, dump=_many(ProductResponse))
+
+    @staticmethod
+    async def suggest(db: AsyncSession, query: str, limit: int = 10) -> List[dict]:
+        return await _run(db, ProductService.suggest, query, limit)
+
+    @staticmethod
+    async def get_low_stock(db: AsyncSession) -> List[ProductResponse]:
+        return await _run(db, ProductService.get_low_stock, dump=_many(ProductResponse))
+
+    @staticmethod
+    async def create(db: AsyncSession, data: ProductCreate) -> ProductResponse:
+        return await _run(db, ProductService.create, data, dump=ProductResponse.model_validate)
+
+    @staticmethod
+    async def update(db: AsyncSession, product_id: int, data: ProductUpdate) -> ProductResponse:
+        return await _run(db, ProductService.update, product_id, data, dump=ProductResponse.model_validate)
+
+    @staticmethod
+    async def delete(db: AsyncSession, product_id: int) -> dict:
+        return await _run(db, ProductService.delete, product_id)
+
+
+class AsyncSalesService:
+
+    @staticmethod
+    async def create_sale(db: AsyncSession, data: SaleCreate, user_id: int,
+                          idempotency_key: Optional[str] = None) -> SaleResponse:
+        return await _run(db, SalesService.create_sale, data, user_id, idempotency_key)
+
+    @staticmethod
+    async def create_sales_batch(db: AsyncSession, data: SaleBatchCreate, user_id: int) -> SaleBatchResponse:
+        # `db` stays unused: an AsyncSession only connects when first used
+        return await _run_in_thread(SalesService.create_sales_batch, data, user_id)
+
+    @staticmethod
+    async def get_sales(db: AsyncSession, skip: int = 0, limit: int = 100,
+                        cursor: Optional[str] = None) -> Tuple[List[SaleResponse], Optional[str]]:
+        return await _run(db, SalesService.get_sales, skip, limit, cursor, dump=_page(SaleResponse))
+
+    @staticmethod
+    async def get_sale_by_id(db: AsyncSession, sale_id: int) -> SaleResponse:
+        return await _run(db, SalesService.get_sale_by_id, sale_id, dump=SaleResponse.model_validate)
+
+    @staticmethod
+    async def update_payment_status(db: AsyncSession, sale_id: int, status: str, ref: str = None) -> dict:
+        return await _run(db, SalesService.update_payment_status, sale_id, status, ref, dump=jsonable_encoder)
+
+
+class AsyncDashboardService:
+
+    @staticmethod
+    async def daily_summary(db: AsyncSession, target_date: date = None) -> dict:
+        return await _run(db, DashboardService.daily_summary, target_date)
+
+    @staticmethod
+    async def top_products(db: AsyncSession, limit: int = 10, window: str = "all",
+                           date_from: Optional[date] = None, date_to: Optional[date] = None,
+                           category: Optional[str] = None, by: str = "revenue") -> list:
+        return await _run(db, DashboardService.top_products, limit, window, date_from, date_to, category, by)
+
+    @staticmethod
+    async def low_stock_alerts(db: AsyncSession) -> list:
+        return await _run(db, DashboardService.low_stock_alerts)
+
+    @staticmethod
+    async def credit_summary(db: AsyncSession) -> list:
+        return await _run(db, DashboardService.credit_summary)
+
+    @staticmethod
+    async def monthly_revenue(db: AsyncSession, year: int = None) -> list:
+        return await _run(db, DashboardService.monthly_revenue, year)
@@ -1,16 +1,32 @@
 """
 services/auth_service.py — Password hashing, JWT creation/verification,
 and FastAPI dependency helpers.
+
+Most endpoints only need to know who is calling and whether they are an
+admin. `get_current_principal` answers that from a short-TTL in-process cache
+keyed by user id, so a request costs no database query for identity; the
+cache entry is dropped when the user is updated, and other workers pick the
+change up within PRINCIPAL_CACHE_TTL seconds.
+
+bcrypt runs on the dedicated hashing executor (backend/executors.py), never
+on the threadpool shared by sync routes, so a burst of logins at shift change
+cannot stall checkouts. BCRYPT_ROUNDS sets the cost; stored hashes with a
+different cost are transparently rehashed on the user's next login.
 """
 import os
 import jwt
+from dataclasses import dataclass
 from datetime import datetime
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
-from backend.database import get_db
-from backend.models.user import User
+from backend.database import get_db, SessionLocal
+from backend.models.user import User, UserRole
+from backend.schemas.user import UserUpdate
+from backend.services.cache import TTLCache
+from backend.executors import ExecutorBusy, hashing_executor
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -19,19 +35,60 @@ SECRET_KEY = os.getenv("SECRET_KEY", "change_me_to_a_secure_secret")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 # ACCESS_TOKEN_EXPIRE_MINUTES is disabled; tokens do not expire.
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+
+# min == max == default: a hash with any other cost "needs update" and is
+# rehashed on the next successful login
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
+_principals = TTLCache(
+    maxsize=int(os.getenv("PRINCIPAL_CACHE_SIZE", 1024)),
+    ttl=float(os.getenv("PRINCIPAL_CACHE_TTL", 30)),
+)
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated caller — enough for authorisation and attribution, no ORM row."""
+    id: int
+    username: str
+    role: str
+
+    @property
+    def is_admin(self) -> bool:
+        return self.role == "admin"
+
 
 class AuthService:
 
+    @staticmethod
+    def _busy() -> HTTPException:
+        return HTTPException(
+            status_code=503,
+            detail="Too many logins in progress, please retry",
+            headers={"Retry-After": "1"},
+        )
+
     @staticmethod
     def hash_password(password: str) -> str:
-        return pwd_context.hash(password)
+        try:
+            return hashing_executor.call(pwd_context.hash, password)
+        except ExecutorBusy:
+            raise AuthService._busy()
 
     @staticmethod
     def verify_password(plain: str, hashed: str) -> bool:
-        return pwd_context.verify(plain, hashed)
+        try:
+            return hashing_executor.call(pwd_context.verify, plain, hashed)
+        except ExecutorBusy:
+            raise AuthService._busy()
 
     @staticmethod
     def create_token(user: User) -> str:
@@ -53,31 +110,124 @@ class AuthService:
             raise HTTPException(status_code=401, detail="Invalid token")
 
     @staticmethod
-    def authenticate(db: Session, username: str, password: str) -> User:
-        user = db.query(User).filter(User.username == username).first()
-        if not user or not AuthService.verify_password(password, user.hashed_password):
+    def _find_user(username: str) -> User:
+        db = SessionLocal()
+        try:
+            user = db.query(User).filter(User.username == username).first()
+            if user is not None:
+                db.expunge(user)
+            return user
+        finally:
+            db.close()
+
+    @staticmethod
+    def _store_hash(user_id: int, hashed_password: str):
+        db = SessionLocal()
+        try:
+            db.query(User).filter(User.id == user_id).update({"hashed_password": hashed_password})
+            db.commit()
+        finally:
+            db.close()
+
+    @staticmethod
+    async def authenticate(username: str, password: str) -> User:
+        """
+        Check credentials without tying up the shared threadpool: the user
+        lookup is a short threadpool call, bcrypt runs on the hashing executor.
+        A hash made with an outdated cost is replaced after a successful check.
+        """
+        user = await run_in_threadpool(AuthService._find_user, username)
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Incorrect username or password",
+            )
+        try:
+            ok, new_hash = await hashing_executor.run(
+                pwd_context.verify_and_update, password, user.hashed_password
+            )
+        except ExecutorBusy:
+            raise AuthService._busy()
+        if not ok:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect username or password",
             )
         if not user.is_active:
             raise HTTPException(status_code=400, detail="User is deactivated")
+        if new_hash:
+            await run_in_threadpool(AuthService._store_hash, user.id, new_hash)
+        return user
+
+    @staticmethod
+    def update_user(db: Session, user_id: int, data: UserUpdate) -> User:
+        user = db.query(User).filter(User.id == user_id).first()
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        update_data = data.model_dump(exclude_unset=True)
+        if "role" in update_data and update_data["role"] not in {r.value for r in UserRole}:
+            raise HTTPException(status_code=400, detail=f"Invalid role '{update_data['role']}'")
+        if "password" in update_data:
+            user.hashed_password = AuthService.hash_password(update_data.pop("password"))
+        for field, value in update_data.items():
+            setattr(user, field, value)
+        db.commit()
+        db.refresh(user)
+        AuthService.invalidate_principal(user_id)
         return user
 
+    # ── Principal cache ───────────────────────────────────────────────────────
+
+    @staticmethod
+    def _load_principal(db: Session, user_id: int) -> Principal:
+        """Read identity through the request's session and cache it."""
+        version = _principals.version()
+        started = not db.in_transaction()
+        row = (
+            db.query(User.id, User.username, User.role, User.is_active)
+            .filter(User.id == user_id)
+            .first()
+        )
+        if started:
+            # Give the connection back: a streaming response keeps the session open
+            db.rollback()
+        if not row:
+            raise HTTPException(status_code=404, detail="User not found")
+        if not row.is_active:
+            raise HTTPException(status_code=400, detail="User is deactivated")
+        role = row.role.value if hasattr(row.role, "value") else row.role
+        principal = Principal(id=row.id, username=row.username, role=role)
+        _principals.set(user_id, principal, version)    # an update since the read wins
+        return principal
+
+    @staticmethod
+    def invalidate_principal(user_id: int):
+        """Call after a user's role or active flag changes."""
+        _principals.pop(user_id)
+
+    @staticmethod
+    def principal_cache_stats() -> dict:
+        return _principals.stats()
+
 
-def get_current_user(
+def get_current_principal(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db),
-) -> User:
+) -> Principal:
+    """
+    The caller, from the principal cache. On a miss the user is read through
+    the request's session (shared with the route's own `get_db`), which opens
+    no connection when the cache answers.
+    """
     payload = AuthService.decode_token(token)
-    user = db.query(User).filter(User.id == int(payload["sub"])).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    return user
+    user_id = int(payload["sub"])
+    principal = _principals.get(user_id)
+    if principal is None:
+        principal = AuthService._load_principal(db, user_id)
+    return principal
 
 
-def require_admin(current_user: User = Depends(get_current_user)) -> User:
-    role = current_user.role.value if hasattr(current_user.role, "value") else current_user.role
-    if role != "admin":
+def require_admin_principal(principal: Principal = Depends(get_current_principal)) -> Principal:
+    if not principal.is_admin:
         raise HTTPException(status_code=403, detail="Admin access required")
-    return current_user
+    return principal
@@ -0,0 +1,118 @@
+"""
+services/cache.py — Small thread-safe in-process cache (TTL + LRU eviction).
+
+Used for read-mostly lookups on the hot POS path. Each worker process keeps
+its own copy, so entries are also bounded by a short TTL: a write handled by
+another worker becomes visible here after at most `ttl` seconds.
+
+A fill that races a write must not put the old row back. Readers take
+`version()` before loading from the database and pass it to `set()`; every
+invalidation of a key stamps it with a new version, and a fill that started
+before the key's last invalidation is dropped. Only the most recent
+`maxsize` invalidations are remembered; a fill older than the oldest of
+them is dropped as well.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class TTLCache:
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = 0
+        self._invalidated: "OrderedDict[Hashable, int]" = OrderedDict()   # key → version
+        self._floor = 0                 # versions at or below this are too old to trust
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.stale_fills = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value or None (expired entries count as misses)."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def version(self) -> int:
+        """Take before reading the value from its source; pass to set()."""
+        with self._lock:
+            return self._version
+
+    def set(self, key: Hashable, value: Any, version: Optional[int] = None):
+        """Cache `value`; with `version`, only if `key` was not invalidated since."""
+        with self._lock:
+            if version is not None and (version < self._floor or self._invalidated.get(key, -1) > version):
+                self.stale_fills += 1
+                return
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def _invalidate(self, key: Hashable):
+        """Stamp `key` with a new version (caller holds the lock)."""
+        self._version += 1
+        self._invalidated[key] = self._version
+        self._invalidated.move_to_end(key)
+        while len(self._invalidated) > self.maxsize:
+            _, self._floor = self._invalidated.popitem(last=False)
+
+    def pop(self, key: Hashable):
+        with self._lock:
+            self._invalidate(key)
+            if self._data.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def update(self, key: Hashable, fn: Callable[[Any], Any]):
+        """
+        Replace a cached value with fn(value), keeping its expiry; a missing
+        key stays missing. Fills that started before the update are dropped.
+        """
+        with self._lock:
+            self._invalidate(key)
+            entry = self._data.get(key)
+            if entry is not None:
+                self._data[key] = (fn(entry[0]), entry[1])
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._invalidated.clear()
+            self._version += 1
+            self._floor = self._version
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "stale_fills": self.stale_fills,
+            }
@@ -0,0 +1,357 @@
+"""
+services/catalog_index.py — Compact in-process catalog index for POS typeahead.
+
+The index is column-oriented: row r describes one product through parallel
+arrays (ids[r], prices[r], stocks[r]) and interned string tables (names,
+units, barcodes), instead of one ORM object per product. On top of the rows
+it keeps three lookup structures:
+
+  - a sorted list of lower-cased names        → whole-name prefix matches
+  - a sorted token list with per-token rows   → word prefix matches ("milk" → "Amul Milk 1L")
+  - a trigram → rows posting list             → fuzzy matches ("choclate" → "Chocolate")
+
+It is loaded once at startup and kept current by ProductService write hooks.
+Other worker processes do not see those hooks, so the index also reloads in
+the background once it is older than CATALOG_MAX_AGE seconds. Hook events
+that arrive while a load is reading the table are recorded and replayed on
+the new columns before they are swapped in, so a reload never drops them.
+Queries and hooks share one lock; a load builds its columns outside it.
+"""
+import os
+import sys
+import threading
+import time
+import logging
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from backend.models.product import Product
+
+logger = logging.getLogger(__name__)
+
+MAX_AGE = float(os.getenv("CATALOG_MAX_AGE", 300))
+FUZZY_THRESHOLD = 0.3
+FUZZY_CANDIDATE_BUDGET = 5000    # posting entries scanned per fuzzy query
+FUZZY_RESCORE = 200              # candidates rescored exactly
+
+
+def _tokens(lname: str) -> List[str]:
+    return [t for t in "".join(c if c.isalnum() else " " for c in lname).split() if t]
+
+
+def _trigrams(lname: str) -> set:
+    padded = f"  {lname} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class _Columns:
+    """One immutable-ish generation of the index; swapped wholesale on reload."""
+
+    def __init__(self):
+        self.ids = array("q")
+        self.prices = array("d")
+        self.stocks = array("d")
+        self.alive = bytearray()
+        self.names: List[str] = []
+        self.units: List[str] = []
+        self.barcodes: List[Optional[str]] = []
+        self.row_of: Dict[int, int] = {}
+        self.name_keys: List[str] = []       # sorted "lname\x00row"
+        self.token_keys: List[str] = []      # sorted unique tokens
+        self.token_rows: Dict[str, array] = {}
+        self.grams: Dict[str, array] = {}
+        self.dead = 0
+
+    def append(self, pid: int, name: str, price: float, stock: float,
+               unit: Optional[str], barcode: Optional[str], sort_now: bool = True):
+        row = len(self.ids)
+        lname = name.lower()
+        self.ids.append(pid)
+        self.prices.append(price or 0.0)
+        self.stocks.append(stock or 0.0)
+        self.alive.append(1)
+        self.names.append(sys.intern(name))
+        self.units.append(sys.intern(unit or "pcs"))
+        self.barcodes.append(barcode)
+        self.row_of[pid] = row
+
+        key = f"{lname}\x00{row}"
+        if sort_now:
+            insort(self.name_keys, key)
+        else:
+            self.name_keys.append(key)
+        for token in set(_tokens(lname)):
+            rows = self.token_rows.get(token)
+            if rows is None:
+                rows = self.token_rows[token] = array("i")
+                token = sys.intern(token)
+                if sort_now:
+                    insort(self.token_keys, token)
+                else:
+                    self.token_keys.append(token)
+            rows.append(row)
+        for g in _trigrams(lname):
+            self.grams.setdefault(g, array("i")).append(row)
+
+    def finish(self):
+        self.name_keys.sort()
+        self.token_keys.sort()
+
+
+class CatalogIndex:
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._cols = _Columns()
+        self._loaded_at: Optional[float] = None
+        self._reloading = False
+        self._recorders: List[List[Tuple]] = []    # one per load in progress
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    # ── Loading ───────────────────────────────────────────────────────────────
+
+    def load(self, db: Session):
+        """Build a fresh index from the products table and swap it in."""
+        started = time.perf_counter()
+        events: List[Tuple] = []
+        with self._lock:
+            self._recorders.append(events)
+        try:
+            cols = _Columns()
+            rows = (
+                db.query(Product.id, Product.name, Product.price, Product.stock_qty,
+                         Product.unit, Product.barcode)
+                .yield_per(5000)
+            )
+            for pid, name, price, stock, unit, barcode in rows:
+                cols.append(pid, name, price, stock, unit, barcode, sort_now=False)
+            cols.finish()
+        except BaseException:
+            with self._lock:
+                self._recorders.remove(events)
+            raise
+        with self._lock:
+            self._recorders.remove(events)
+            self._cols = cols
+            self._loaded_at = time.monotonic()
+            # Writes that landed while the table was being read may be missing
+            # from the snapshot; replaying them in order is idempotent.
+            for event in events:
+                self._apply(event)
+        logger.info(f"Catalog index loaded: {len(cols.ids)} products in "
+                    f"{(time.perf_counter() - started) * 1000:.0f} ms"
+                    f"{f', {len(events)} write(s) replayed' if events else ''}")
+
+    def refresh_if_stale(self, session_factory):
+        """Reload in a background thread once the index is older than MAX_AGE."""
+        with self._lock:
+            if self._reloading or self._loaded_at is None:
+                return
+            if time.monotonic() - self._loaded_at < MAX_AGE:
+                return
+            self._reloading = True
+
+        def _reload():
+            db = session_factory()
+            try:
+                self.load(db)
+            except Exception as e:
+                logger.warning(f"Catalog index reload failed: {e}")
+            finally:
+                db.close()
+                self._reloading = False
+
+        threading.Thread(target=_reload, name="catalog-reload", daemon=True).start()
+
+    # ── Write hooks ───────────────────────────────────────────────────────────
+
+    def upsert(self, product: Product):
+        self._hook(("upsert", product.id, product.name, product.price, product.stock_qty,
+                    product.unit, product.barcode))
+
+    def remove(self, product_id: int):
+        self._hook(("remove", product_id))
+
+    def set_stock(self, product_id: int, stock_qty: float):
+        self._hook(("stock", product_id, stock_qty))
+
+    def _hook(self, event: Tuple):
+        with self._lock:
+            for events in self._recorders:
+                events.append(event)
+            if self.loaded:
+                self._apply(event)
+
+    def _apply(self, event: Tuple):
+        """Apply one write to the current columns (caller holds the lock)."""
+        kind, pid, *fields = event
+        cols = self._cols
+        if kind == "stock":
+            row = cols.row_of.get(pid)
+            if row is not None:
+                cols.stocks[row] = fields[0]
+            return
+        if kind == "remove":
+            row = cols.row_of.pop(pid, None)
+            if row is not None:
+                cols.alive[row] = 0
+                cols.dead += 1
+                self._compact_if_needed()
+            return
+
+        name, price, stock, unit, barcode = fields
+        row = cols.row_of.get(pid)
+        if row is not None and cols.names[row] == name:
+            cols.prices[row] = price or 0.0
+            cols.stocks[row] = stock or 0.0
+            cols.units[row] = sys.intern(unit or "pcs")
+            cols.barcodes[row] = barcode
+            return
+        if row is not None:
+            cols.alive[row] = 0
+            cols.dead += 1
+        cols.append(pid, name, price, stock, unit, barcode)
+        self._compact_if_needed()
+
+    def _compact_if_needed(self):
+        cols = self._cols
+        if cols.dead < 1000 or cols.dead * 4 < len(cols.ids):
+            return
+        fresh = _Columns()
+        for r in range(len(cols.ids)):
+            if cols.alive[r]:
+                fresh.append(cols.ids[r], cols.names[r], cols.prices[r], cols.stocks[r],
+                             cols.units[r], cols.barcodes[r], sort_now=False)
+        fresh.finish()
+        self._cols = fresh
+
+    # ── Queries ───────────────────────────────────────────────────────────────
+
+    def suggest(self, query: str, limit: int = 10, fuzzy: bool = True) -> List[dict]:
+        """
+        Prefix matches on the whole name first, then word-prefix matches, then
+        (if still short of ``limit``) fuzzy trigram matches.
+        """
+        q = query.strip().lower()
+        if not q:
+            return []
+        with self._lock:    # write hooks mutate the columns in place
+            return self._suggest(self._cols, q, limit, fuzzy)
+
+    def _suggest(self, cols: _Columns, q: str, limit: int, fuzzy: bool) -> List[dict]:
+        seen = set()
+        out = []
+
+        def emit(row: int, match: str):
+            if row in seen or not cols.alive[row]:
+                return False
+            seen.add(row)
+            out.append(self._row(cols, row, match))
+            return len(out) >= limit
+
+        # 1. Whole-name prefix
+        i = bisect_left(cols.name_keys, q)
+        while i < len(cols.name_keys) and cols.name_keys[i].startswith(q):
+            if emit(int(cols.name_keys[i].rsplit("\x00", 1)[1]), "prefix"):
+                return out
+            i += 1
+
+        # 2. Every query token must prefix-match some token of the name
+        q_tokens = _tokens(q)
+        if q_tokens:
+            candidate = None
+            for qt in q_tokens:
+                rows = set()
+                j = bisect_left(cols.token_keys, qt)
+                while j < len(cols.token_keys) and cols.token_keys[j].startswith(qt):
+                    rows.update(cols.token_rows[cols.token_keys[j]])
+                    j += 1
+                candidate = rows if candidate is None else candidate & rows
+                if not candidate:
+                    break
+            for row in sorted(candidate or (), key=lambda r: cols.names[r]):
+                if emit(row, "token"):
+                    return out
+
+        # 3. Fuzzy: Jaccard similarity over trigrams. Candidates come from the
+        #    rarest query trigrams only (common ones like "ilk" carry no signal
+        #    and would touch most rows); the best candidates are then rescored
+        #    exactly against their own trigrams.
+        if fuzzy and len(q) >= 3:
+            q_grams = _trigrams(q)
+            postings = sorted((cols.grams[g] for g in q_grams if g in cols.grams), key=len)
+            shared = Counter()
+            budget = FUZZY_CANDIDATE_BUDGET
+            for rows in postings:
+                if len(rows) > budget and shared:
+                    break
+                shared.update(rows)
+                budget -= len(rows)
+            scored = []
+            for row, _ in shared.most_common(FUZZY_RESCORE):
+                grams = _trigrams(cols.names[row].lower())
+                n = len(q_grams & grams)
+                sim = n / (len(q_grams) + len(grams) - n)
+                if sim >= FUZZY_THRESHOLD:
+                    scored.append((sim, row))
+            scored.sort(reverse=True)
+            for _, row in scored:
+                if emit(row, "fuzzy"):
+                    return out
+        return out
+
+    @staticmethod
+    def _row(cols: _Columns, row: int, match: str) -> dict:
+        return {
+            "id": cols.ids[row],
+            "name": cols.names[row],
+            "barcode": cols.barcodes[row],
+            "unit": cols.units[row],
+            "price": cols.prices[row],
+            "stock_qty": cols.stocks[row],
+            "match": match,
+        }
+
+    # ── Introspection ─────────────────────────────────────────────────────────
+
+    def memory_report(self) -> dict:
+        """Approximate memory footprint of the index, total and per 100k SKUs."""
+        with self._lock:
+            return self._memory_report(self._cols)
+
+    def _memory_report(self, cols: _Columns) -> dict:
+        arrays = sum(a.buffer_info()[1] * a.itemsize
+                     for a in (cols.ids, cols.prices, cols.stocks)) + len(cols.alive)
+        strings = (
+            sum(sys.getsizeof(n) for n in set(cols.names))
+            + sum(sys.getsizeof(u) for u in set(cols.units))
+            + sum(sys.getsizeof(b) for b in cols.barcodes if b)
+            + sys.getsizeof(cols.names) + sys.getsizeof(cols.units) + sys.getsizeof(cols.barcodes)
+        )
+        lookup = (
+            sys.getsizeof(cols.row_of)
+            + sys.getsizeof(cols.name_keys) + sum(sys.getsizeof(k) for k in cols.name_keys)
+            + sys.getsizeof(cols.token_keys) + sys.getsizeof(cols.token_rows)
+            + sum(sys.getsizeof(a) for a in cols.token_rows.values())
+            + sys.getsizeof(cols.grams)
+            + sum(sys.getsizeof(g) + sys.getsizeof(a) for g, a in cols.grams.items())
+        )
+        total = arrays + strings + lookup
+        products = len(cols.row_of)
+        return {
+            "products": products,
+            "dead_rows": cols.dead,
+            "tokens": len(cols.token_keys),
+            "trigrams": len(cols.grams),
+            "bytes": {"columns": arrays, "strings": strings, "lookup": lookup, "total": total},
+            "mb_per_100k_skus": round(total / products * 100_000 / 1_048_576, 2) if products else 0.0,
+            "age_seconds": round(time.monotonic() - self._loaded_at, 1) if self._loaded_at else None,
+        }
+
+
+catalog_index = CatalogIndex()
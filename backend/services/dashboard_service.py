@@ -1,14 +1,25 @@
 """
 services/dashboard_service.py — Aggregate KPIs for the admin dashboard.
+
+Sales figures are read from the daily rollups (services/rollup_service.py),
+so their cost depends on the number of days, not the number of sales.
 """
-from datetime import datetime, date
+import heapq
+from datetime import date, timedelta
+from operator import attrgetter
+from typing import Optional, Tuple
+from fastapi import HTTPException
 from sqlalchemy.orm import Session
 from sqlalchemy import func, desc
-from backend.models.sale import Sale, PaymentStatus
-from backend.models.sale_item import SaleItem
+from backend.models.sale import PaymentMode
+from backend.models.rollup import SalesDailyRollup, ProductDailyRollup
 from backend.models.product import Product
 from backend.models.customer import Customer
 from backend.models.credit_ledger import CreditLedger
+from backend.services.product_service import ProductService
+
+# Named top-products windows → number of days, ending today
+TOP_PRODUCT_WINDOWS = {"today": 1, "7d": 7, "30d": 30}
 
 
 class DashboardService:
@@ -17,48 +28,68 @@ class DashboardService:
     def daily_summary(db: Session, target_date: date = None) -> dict:
         if not target_date:
             target_date = date.today()
-        start = datetime.combine(target_date, datetime.min.time())
-        end = datetime.combine(target_date, datetime.max.time())
-
-        sales = db.query(Sale).filter(
-            Sale.created_at >= start,
-            Sale.created_at <= end,
-            Sale.payment_status != PaymentStatus.failed,
-        ).all()
+        # At most one rollup row per payment mode
+        rows = db.query(SalesDailyRollup).filter(SalesDailyRollup.day == target_date).all()
 
-        total_revenue = sum(s.total for s in sales)
-        total_transactions = len(sales)
-        cash_total = sum(s.total for s in sales if s.payment_mode.value == "cash")
-        upi_total = sum(s.total for s in sales if s.payment_mode.value == "upi")
-        card_total = sum(s.total for s in sales if s.payment_mode.value == "card")
-        credit_total = sum(s.total for s in sales if s.payment_mode.value == "credit")
+        breakdown = {mode.value: 0.0 for mode in PaymentMode}
+        total_transactions = 0
+        for r in rows:
+            breakdown[r.payment_mode.value] = r.revenue
+            total_transactions += r.transactions
 
         return {
             "date": str(target_date),
-            "total_revenue": round(total_revenue, 2),
+            "total_revenue": round(sum(breakdown.values()), 2),
             "total_transactions": total_transactions,
-            "payment_breakdown": {
-                "cash": round(cash_total, 2),
-                "upi": round(upi_total, 2),
-                "card": round(card_total, 2),
-                "credit": round(credit_total, 2),
-            },
+            "payment_breakdown": {mode: round(v, 2) for mode, v in breakdown.items()},
         }
 
     @staticmethod
-    def top_products(db: Session, limit: int = 10) -> list:
-        results = (
-            db.query(
-                SaleItem.product_id,
-                SaleItem.product_name,
-                func.sum(SaleItem.qty).label("total_qty"),
-                func.sum(SaleItem.subtotal).label("total_revenue"),
-            )
-            .group_by(SaleItem.product_id, SaleItem.product_name)
-            .order_by(desc("total_revenue"))
-            .limit(limit)
-            .all()
+    def _window(window: str, date_from: Optional[date], date_to: Optional[date]) -> Tuple[Optional[date], Optional[date]]:
+        """Inclusive (first_day, last_day) for a named window; (None, None) means all time."""
+        if window == "all":
+            return None, None
+        if window == "custom":
+            if not date_from or not date_to:
+                raise HTTPException(status_code=400, detail="date_from and date_to are required for a custom window")
+            if date_to < date_from:
+                raise HTTPException(status_code=400, detail="date_to is before date_from")
+            return date_from, date_to
+        today = date.today()
+        return today - timedelta(days=TOP_PRODUCT_WINDOWS[window] - 1), today
+
+    @staticmethod
+    def top_products(db: Session, limit: int = 10, window: str = "all",
+                     date_from: Optional[date] = None, date_to: Optional[date] = None,
+                     category: Optional[str] = None, by: str = "revenue") -> list:
+        """
+        Top `limit` products by revenue or quantity over a window of days.
+
+        Per-product totals are summed from product_daily_rollup (rows per day,
+        not per sale) and streamed into a bounded heap, so only `limit`
+        candidates are held in memory however many products sold.
+        """
+        first_day, last_day = DashboardService._window(window, date_from, date_to)
+        q = db.query(
+            ProductDailyRollup.product_id,
+            func.max(ProductDailyRollup.product_name).label("product_name"),
+            func.sum(ProductDailyRollup.qty).label("total_qty"),
+            func.sum(ProductDailyRollup.revenue).label("total_revenue"),
         )
+        if first_day:
+            q = q.filter(ProductDailyRollup.day >= first_day)
+        if last_day:
+            q = q.filter(ProductDailyRollup.day <= last_day)
+        if category:
+            q = (
+                q.join(Product, Product.id == ProductDailyRollup.product_id)
+                .filter(func.lower(Product.category) == category.strip().lower())
+            )
+        rows = q.group_by(ProductDailyRollup.product_id).yield_per(1000)
+
+        # Rows of sales that later failed net out to zero — not "top" anything
+        sold = (r for r in rows if r.total_qty > 0)
+        key = attrgetter("total_qty" if by == "qty" else "total_revenue")
         return [
             {
                 "product_id": r.product_id,
@@ -66,27 +97,12 @@ class DashboardService:
                 "total_qty": round(r.total_qty, 2),
                 "total_revenue": round(r.total_revenue, 2),
             }
-            for r in results
+            for r in heapq.nlargest(limit, sold, key=key)
         ]
 
     @staticmethod
     def low_stock_alerts(db: Session) -> list:
-        products = (
-            db.query(Product)
-            .filter(Product.stock_qty <= Product.min_stock_alert)
-            .order_by(Product.stock_qty)
-            .all()
-        )
-        return [
-            {
-                "id": p.id,
-                "name": p.name,
-                "stock_qty": p.stock_qty,
-                "min_stock_alert": p.min_stock_alert,
-                "unit": p.unit,
-            }
-            for p in products
-        ]
+        return ProductService.low_stock_snapshot(db)
 
     @staticmethod
     def credit_summary(db: Session) -> list:
@@ -109,21 +125,52 @@ class DashboardService:
 
     @staticmethod
     def monthly_revenue(db: Session, year: int = None) -> list:
+        """
+        Revenue and transactions per month of `year`, side by side with the same
+        month of the previous year. Both years come from one scan of the daily
+        rollup over a half-open date range; growth_pct is None when the previous
+        month had no revenue or the month has not started.
+        """
+        today = date.today()
         if not year:
-            year = date.today().year
+            year = today.year
         results = (
             db.query(
-                func.extract("month", Sale.created_at).label("month"),
-                func.sum(Sale.total).label("revenue"),
-                func.count(Sale.id).label("transactions"),
+                func.extract("year", SalesDailyRollup.day).label("year"),
+                func.extract("month", SalesDailyRollup.day).label("month"),
+                func.sum(SalesDailyRollup.revenue).label("revenue"),
+                func.sum(SalesDailyRollup.transactions).label("transactions"),
             )
             .filter(
-                func.extract("year", Sale.created_at) == year,
-                Sale.payment_status != PaymentStatus.failed,
+                SalesDailyRollup.day >= date(year - 1, 1, 1),
+                SalesDailyRollup.day < date(year + 1, 1, 1),
             )
-            .group_by("month")
-            .order_by("month")
+            .group_by("year", "month")
             .all()
         )
-        return [{"month": int(r.month), "revenue": round(r.revenue, 2), "transactions": r.transactions}
-                for r in results]
+        by_month = {}
+        for r in results:
+            if not r.transactions:
+                continue
+            by_month[(int(r.year), int(r.month))] = (r.revenue, r.transactions)
+
+        months = []
+        for month in range(1, 13):
+            current = by_month.get((year, month))
+            previous = by_month.get((year - 1, month))
+            if current is None and previous is None:
+                continue
+            revenue, transactions = current or (0.0, 0)
+            prev_revenue, prev_transactions = previous or (0.0, 0)
+            growth = (revenue - prev_revenue) / prev_revenue * 100 if prev_revenue else None
+            if date(year, month, 1) > today:
+                growth = None       # month has not started yet
+            months.append({
+                "month": month,
+                "revenue": round(revenue, 2),
+                "transactions": transactions,
+                "prev_revenue": round(prev_revenue, 2),
+                "prev_transactions": prev_transactions,
+                "growth_pct": round(growth, 1) if growth is not None else None,
+            })
+        return months
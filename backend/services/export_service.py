@@ -0,0 +1,124 @@
+"""
+services/export_service.py — Streaming export of sales with their line items.
+
+Rows are read through a server-side cursor (`yield_per` turns on
+`stream_results`), encoded, and handed out as byte chunks of roughly
+CHUNK_BYTES, so memory use stays flat regardless of the date range.
+
+  - csv    → one row per line item, sale columns repeated
+  - ndjson → one JSON object per sale with an `items` array
+"""
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime, timedelta
+from typing import Iterator, Tuple
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from backend.models.sale import Sale
+from backend.models.sale_item import SaleItem
+
+YIELD_PER = 5000
+CHUNK_BYTES = 64 * 1024
+
+SALE_COLUMNS = (
+    "sale_id", "created_at", "customer_id", "user_id", "payment_mode", "payment_status",
+    "transaction_ref", "sale_subtotal", "sale_discount", "sale_tax", "sale_total",
+)
+ITEM_COLUMNS = (
+    "item_id", "product_id", "product_name", "qty", "unit_price", "discount", "tax", "subtotal",
+)
+
+
+class ExportService:
+
+    @staticmethod
+    def _rows(db: Session, date_from: date, date_to: date) -> Iterator[Tuple[tuple, tuple]]:
+        """
+        (sale, item) value tuples ordered by sale, half-open on the day after
+        date_to. The sale tuple is built once per sale and repeated for each of
+        its items, so consumers can detect a new sale by identity.
+        """
+        start = datetime.combine(date_from, datetime.min.time())
+        end = datetime.combine(date_to + timedelta(days=1), datetime.min.time())
+        stmt = (
+            select(
+                Sale.id, Sale.created_at, Sale.customer_id, Sale.user_id,
+                Sale.payment_mode, Sale.payment_status, Sale.transaction_ref,
+                Sale.subtotal, Sale.discount, Sale.tax, Sale.total,
+                SaleItem.id, SaleItem.product_id, SaleItem.product_name, SaleItem.qty,
+                SaleItem.unit_price, SaleItem.discount, SaleItem.tax, SaleItem.subtotal,
+            )
+            .join(SaleItem, SaleItem.sale_id == Sale.id)
+            .where(Sale.created_at >= start, Sale.created_at < end)
+            .order_by(Sale.created_at, Sale.id, SaleItem.id)
+        )
+        # Core execution: plain tuples, no ORM row processing per line item
+        result = db.connection().execution_options(yield_per=YIELD_PER).execute(stmt)
+        n_sale = len(SALE_COLUMNS)
+        sale, current_id = None, None
+        for row in result:
+            if row[0] != current_id:
+                current_id = row[0]
+                sale = (
+                    row[0], row[1].isoformat() if row[1] else None, row[2], row[3],
+                    row[4].value, row[5].value, *row[6:n_sale],
+                )
+            yield sale, tuple(row[n_sale:])
+
+    @staticmethod
+    def _csv(rows: Iterator[Tuple[tuple, tuple]]) -> Iterator[str]:
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(SALE_COLUMNS + ITEM_COLUMNS)
+        for sale, item in rows:
+            writer.writerow(sale + item)
+            if buf.tell() >= CHUNK_BYTES:
+                yield buf.getvalue()
+                buf.seek(0)
+                buf.truncate()
+        yield buf.getvalue()
+
+    @staticmethod
+    def _ndjson(rows: Iterator[Tuple[tuple, tuple]]) -> Iterator[str]:
+        parts, size = [], 0
+        record, current = None, None
+
+        def flush_record():
+            line = json.dumps(record, separators=(",", ":")) + "\n"
+            parts.append(line)
+            return len(line)
+
+        for sale, item in rows:
+            if sale is not current:
+                if record is not None:
+                    size += flush_record()
+                    if size >= CHUNK_BYTES:
+                        yield "".join(parts)
+                        parts, size = [], 0
+                current = sale
+                record = dict(zip(SALE_COLUMNS, sale))
+                record["items"] = []
+            record["items"].append(dict(zip(ITEM_COLUMNS, item)))
+        if record is not None:
+            flush_record()
+        yield "".join(parts)
+
+    @staticmethod
+    def export_sales(db: Session, date_from: date, date_to: date,
+                     fmt: str = "ndjson", gzip: bool = False) -> Iterator[bytes]:
+        """Encoded export as byte chunks, optionally as one continuous gzip stream."""
+        rows = ExportService._rows(db, date_from, date_to)
+        chunks = ExportService._csv(rows) if fmt == "csv" else ExportService._ndjson(rows)
+        if not gzip:
+            for chunk in chunks:
+                if chunk:
+                    yield chunk.encode()
+            return
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)   # wbits=31 → gzip container
+        for chunk in chunks:
+            out = compressor.compress(chunk.encode())
+            if out:
+                yield out
+        yield compressor.flush()
@@ -1,55 +1,57 @@
 """
 services/inventory_service.py — Stock management and audit log.
 """
-from typing import List
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import case, update, tuple_
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
 from backend.models.product import Product
 from backend.models.inventory import InventoryLog, MovementType
 from backend.schemas.inventory import InventoryRestockRequest
+from backend.services.product_service import ProductService
+from backend.services.pagination import decode_cursor, page
 
 
 class InventoryService:
 
     @staticmethod
-    def restock(db: Session, data: InventoryRestockRequest, user_id: int) -> InventoryLog:
-        product = db.query(Product).filter(Product.id == data.product_id).first()
-        if not product:
-            raise HTTPException(status_code=404, detail="Product not found")
+    def apply_stock_changes(db: Session, changes: Dict[int, float],
+                            require_stock: bool = False) -> Dict[int, Tuple[float, float]]:
+        """
+        Apply per-product stock deltas as one conditional UPDATE … RETURNING.
 
-        before_qty = product.stock_qty
-        product.stock_qty += data.qty
-        after_qty = product.stock_qty
+        The arithmetic happens inside the database, so concurrent lanes can never
+        lose each other's updates. With ``require_stock`` a row is only touched if
+        the result stays non-negative; products that were not updated are simply
+        absent from the result, and the caller decides how to fail.
 
-        log = InventoryLog(
-            product_id=product.id,
-            movement_type=MovementType.restock,
-            change_qty=data.qty,
-            before_qty=before_qty,
-            after_qty=after_qty,
-            reason=data.reason or "Restock",
-            created_by=user_id,
+        Returns {product_id: (before_qty, after_qty)}.
+        """
+        if not changes:
+            return {}
+        delta = case(changes, value=Product.id, else_=0.0)
+        stmt = (
+            update(Product)
+            .where(Product.id.in_(changes.keys()))
+            .values(stock_qty=Product.stock_qty + delta)
+            .returning(Product.id, Product.stock_qty)
         )
-        db.add(log)
-        db.commit()
-        db.refresh(log)
-        return log
+        if require_stock:
+            stmt = stmt.where(Product.stock_qty + delta >= 0)
+        rows = db.execute(stmt, execution_options={"synchronize_session": False}).all()
+        return {pid: (after - changes[pid], after) for pid, after in rows}
 
     @staticmethod
-    def adjust_stock(db: Session, product_id: int, qty_change: float,
-                     reason: str, user_id: int) -> InventoryLog:
-        """Manual positive or negative stock adjustment."""
-        product = db.query(Product).filter(Product.id == product_id).first()
-        if not product:
+    def _log_movement(db: Session, product_id: int, qty_change: float,
+                      movement_type: MovementType, reason: str, user_id: int) -> InventoryLog:
+        changed = InventoryService.apply_stock_changes(db, {product_id: qty_change})
+        if product_id not in changed:
             raise HTTPException(status_code=404, detail="Product not found")
-
-        before_qty = product.stock_qty
-        product.stock_qty += qty_change
-        after_qty = product.stock_qty
+        before_qty, after_qty = changed[product_id]
 
         log = InventoryLog(
-            product_id=product.id,
-            movement_type=MovementType.adjustment,
+            product_id=product_id,
+            movement_type=movement_type,
             change_qty=qty_change,
             before_qty=before_qty,
             after_qty=after_qty,
@@ -59,20 +61,36 @@ class InventoryService:
         db.add(log)
         db.commit()
         db.refresh(log)
+        ProductService.stock_changed({product_id: after_qty})
         return log
 
     @staticmethod
-    def get_logs(db: Session, product_id: int = None, limit: int = 200) -> List[InventoryLog]:
-        q = db.query(InventoryLog).order_by(InventoryLog.created_at.desc())
+    def restock(db: Session, data: InventoryRestockRequest, user_id: int) -> InventoryLog:
+        return InventoryService._log_movement(
+            db, data.product_id, data.qty, MovementType.restock,
+            data.reason or "Restock", user_id,
+        )
+
+    @staticmethod
+    def adjust_stock(db: Session, product_id: int, qty_change: float,
+                     reason: str, user_id: int) -> InventoryLog:
+        """Manual positive or negative stock adjustment."""
+        return InventoryService._log_movement(
+            db, product_id, qty_change, MovementType.adjustment, reason, user_id,
+        )
+
+    @staticmethod
+    def get_logs(db: Session, product_id: int = None, limit: int = 200,
+                 cursor: Optional[str] = None) -> Tuple[List[InventoryLog], Optional[str]]:
+        """Newest movements first, keyed on (created_at, id). Returns (rows, next_cursor)."""
+        q = db.query(InventoryLog).order_by(InventoryLog.created_at.desc(), InventoryLog.id.desc())
         if product_id:
             q = q.filter(InventoryLog.product_id == product_id)
-        return q.limit(limit).all()
+        if cursor:
+            created_at, log_id = decode_cursor(cursor, "created_at", "id")
+            q = q.filter(tuple_(InventoryLog.created_at, InventoryLog.id) < tuple_(created_at, log_id))
+        return page(q.limit(limit + 1).all(), limit, "created_at", "id")
 
     @staticmethod
     def get_low_stock(db: Session) -> List[Product]:
-        return (
-            db.query(Product)
-            .filter(Product.stock_qty <= Product.min_stock_alert)
-            .order_by(Product.stock_qty)
-            .all()
-        )
+        return ProductService.get_low_stock(db)
@@ -0,0 +1,232 @@
+"""
+services/low_stock.py — Incrementally maintained set of low-stock products.
+
+The tracker keeps (stock_qty, min_stock_alert, name, unit) for every product
+and the set of products at or below their threshold. ProductService write
+hooks feed it every committed sale, restock, adjustment and product edit, so
+a product enters or leaves the set the moment it crosses its threshold and
+reads cost O(size of set) instead of a scan of the products table.
+
+Threshold crossings are pushed to subscribers (the SSE stream in
+routers/inventory.py). Like the catalog index, each worker process keeps its
+own copy and reloads in the background once it is older than
+LOW_STOCK_MAX_AGE seconds, so changes made through other workers show up
+(and are announced) after at most that long.
+"""
+import asyncio
+import os
+import threading
+import time
+import logging
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from backend.models.product import Product
+
+logger = logging.getLogger(__name__)
+
+MAX_AGE = float(os.getenv("LOW_STOCK_MAX_AGE", 60))
+SUBSCRIBER_QUEUE = 1000
+
+
+class LowStockTracker:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._products: Dict[int, list] = {}     # id → [stock_qty, min_stock_alert, name, unit]
+        self._low: set = set()
+        self._loaded_at: Optional[float] = None
+        self._reloading = False
+        self._recorders: List[List[Tuple]] = []    # one per load in progress
+        self._subscribers: Dict[asyncio.Queue, asyncio.AbstractEventLoop] = {}
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    # ── Loading ───────────────────────────────────────────────────────────────
+
+    def load(self, db: Session):
+        """Rebuild from the products table; changes since the last load are announced."""
+        recorded: List[Tuple] = []
+        with self._lock:
+            self._recorders.append(recorded)
+        try:
+            products = {
+                pid: [stock or 0.0, min_alert or 0.0, name, unit or "pcs"]
+                for pid, stock, min_alert, name, unit in db.query(
+                    Product.id, Product.stock_qty, Product.min_stock_alert, Product.name, Product.unit
+                ).yield_per(5000)
+            }
+        except BaseException:
+            with self._lock:
+                self._recorders.remove(recorded)
+            raise
+        with self._lock:
+            self._recorders.remove(recorded)
+            # Writes that landed while the table was being read may be missing
+            # from the snapshot; replaying them in order is idempotent.
+            for change in recorded:
+                self._replay(products, change)
+            low = {pid for pid, (stock, min_alert, _, _) in products.items() if stock <= min_alert}
+            first_load = self._loaded_at is None
+            old_low, old_products = self._low, self._products
+            self._products, self._low = products, low
+            self._loaded_at = time.monotonic()
+        if not first_load:
+            events = [self._event("low", pid, products[pid]) for pid in low - old_low]
+            events += [
+                self._event("ok", pid, products[pid]) if pid in products
+                else self._event("removed", pid, old_products[pid])
+                for pid in old_low - low
+            ]
+            self._publish(events)
+
+    def refresh_if_stale(self, session_factory):
+        """Reload in a background thread once the tracker is older than MAX_AGE."""
+        with self._lock:
+            if self._reloading or self._loaded_at is None:
+                return
+            if time.monotonic() - self._loaded_at < MAX_AGE:
+                return
+            self._reloading = True
+
+        def _reload():
+            db = session_factory()
+            try:
+                self.load(db)
+            except Exception as e:
+                logger.warning(f"Low-stock tracker reload failed: {e}")
+            finally:
+                db.close()
+                self._reloading = False
+
+        threading.Thread(target=_reload, name="low-stock-reload", daemon=True).start()
+
+    # ── Write hooks ───────────────────────────────────────────────────────────
+
+    def _set(self, pid: int, entry: list) -> Optional[dict]:
+        """Store an entry (caller holds the lock); return an event if it crossed its threshold."""
+        self._products[pid] = entry
+        is_low = entry[0] <= entry[1]
+        if is_low and pid not in self._low:
+            self._low.add(pid)
+            return self._event("low", pid, entry)
+        if not is_low and pid in self._low:
+            self._low.discard(pid)
+            return self._event("ok", pid, entry)
+        return None
+
+    def _record(self, change: Tuple):
+        """Remember a write for every load in progress (caller holds the lock)."""
+        for recorded in self._recorders:
+            recorded.append(change)
+
+    @staticmethod
+    def _replay(products: Dict[int, list], change: Tuple):
+        kind, pid, value = change
+        if kind == "stock":
+            entry = products.get(pid)
+            if entry is not None:
+                entry[0] = value
+        elif kind == "product":
+            products[pid] = list(value)
+        else:
+            products.pop(pid, None)
+
+    def stock_changed(self, stock: Dict[int, float]):
+        events = []
+        with self._lock:
+            for pid, stock_qty in stock.items():
+                self._record(("stock", pid, float(stock_qty)))
+                entry = self._products.get(pid) if self.loaded else None
+                if entry is not None:
+                    event = self._set(pid, [float(stock_qty), entry[1], entry[2], entry[3]])
+                    if event:
+                        events.append(event)
+        self._publish(events)
+
+    def product_changed(self, product: Product):
+        entry = [product.stock_qty or 0.0, product.min_stock_alert or 0.0, product.name, product.unit or "pcs"]
+        with self._lock:
+            self._record(("product", product.id, entry))
+            event = self._set(product.id, list(entry)) if self.loaded else None
+        if event:
+            self._publish([event])
+
+    def product_removed(self, product_id: int):
+        with self._lock:
+            self._record(("remove", product_id, None))
+            entry = self._products.pop(product_id, None)
+            was_low = product_id in self._low
+            self._low.discard(product_id)
+        if entry is not None and was_low:
+            self._publish([self._event("removed", product_id, entry)])
+
+    # ── Reads ─────────────────────────────────────────────────────────────────
+
+    def low_ids(self) -> List[int]:
+        """Ids of low-stock products, lowest stock first."""
+        with self._lock:
+            return sorted(self._low, key=lambda pid: self._products[pid][0])
+
+    def snapshot(self) -> List[dict]:
+        with self._lock:
+            items = [self._item(pid, self._products[pid]) for pid in self._low]
+        return sorted(items, key=lambda i: i["stock_qty"])
+
+    @staticmethod
+    def _item(pid: int, entry: list) -> dict:
+        stock_qty, min_alert, name, unit = entry
+        return {"id": pid, "name": name, "stock_qty": stock_qty, "min_stock_alert": min_alert, "unit": unit}
+
+    @staticmethod
+    def _event(kind: str, pid: int, entry: list) -> dict:
+        return {"event": kind, "product": LowStockTracker._item(pid, entry)}
+
+    # ── Subscriptions ─────────────────────────────────────────────────────────
+
+    def subscribe(self) -> asyncio.Queue:
+        """Queue of crossing events for the calling event loop. Call unsubscribe when done."""
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE)
+        with self._lock:
+            self._subscribers[queue] = asyncio.get_running_loop()
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        with self._lock:
+            self._subscribers.pop(queue, None)
+
+    def _publish(self, events: List[dict]):
+        """Hand events to every subscriber; called from request threads."""
+        if not events:
+            return
+        with self._lock:
+            subscribers = list(self._subscribers.items())
+        for queue, loop in subscribers:
+            for event in events:
+                try:
+                    loop.call_soon_threadsafe(self._offer, queue, event)
+                except RuntimeError:
+                    self.unsubscribe(queue)     # loop already closed
+                    break
+
+    @staticmethod
+    def _offer(queue: asyncio.Queue, event: dict):
+        if queue.full():
+            # Slow consumer: drop the backlog and ask it to resynchronise
+            while not queue.empty():
+                queue.get_nowait()
+            event = {"event": "resync"}
+        queue.put_nowait(event)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "products": len(self._products),
+                "low": len(self._low),
+                "subscribers": len(self._subscribers),
+                "age_seconds": round(time.monotonic() - self._loaded_at, 1) if self._loaded_at else None,
+            }
+
+
+low_stock_tracker = LowStockTracker()
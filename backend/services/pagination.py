@@ -0,0 +1,46 @@
+"""
+services/pagination.py — Opaque cursors for keyset pagination.
+
+A cursor is the sort key of the last row on a page, e.g. {"id": 42} or
+{"created_at": "...", "id": 42}, serialised as URL-safe base64 JSON. Clients
+pass it back unchanged; its contents are not part of the API contract.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import List, Optional, Tuple
+from fastapi import HTTPException
+
+
+def encode_cursor(**key) -> str:
+    payload = {k: v.isoformat() if isinstance(v, datetime) else v for k, v in key.items()}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *fields: str) -> Tuple:
+    """Return the requested fields of a cursor, parsing `created_at` back to datetime."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        values = []
+        for field in fields:
+            value = payload[field]
+            if field == "created_at":
+                value = datetime.fromisoformat(value)
+            values.append(value)
+        return tuple(values)
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def page(rows: List, limit: int, *fields: str) -> Tuple[List, Optional[str]]:
+    """
+    Trim a `limit + 1` result to `limit` rows and build the next cursor from
+    the last row kept (None when there is no further page).
+    """
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(**{f: getattr(last, f) for f in fields})
@@ -1,47 +1,166 @@
 """
 services/product_service.py — CRUD operations for products.
+
+Single-product lookups (by id and by barcode — every POS scan) are served from
+an in-process TTL/LRU cache, and typeahead from the in-memory catalog index.
+Product writes and stock movements keep both current through the
+product_changed() / product_removed() / stock_changed() hooks.
 """
-from typing import List, Optional
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import case, func, or_
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
+from backend.database import SessionLocal
 from backend.models.product import Product
-from backend.schemas.product import ProductCreate, ProductUpdate
+from backend.schemas.product import ProductCreate, ProductUpdate, ProductResponse
+from backend.services.cache import TTLCache
+from backend.services.catalog_index import catalog_index
+from backend.services.low_stock import low_stock_tracker
+from backend.services.pagination import decode_cursor, page
+
+CACHE_SIZE = int(os.getenv("PRODUCT_CACHE_SIZE", 20000))
+CACHE_TTL = float(os.getenv("PRODUCT_CACHE_TTL", 30))
+
+_products = TTLCache(maxsize=CACHE_SIZE, ttl=CACHE_TTL)   # id → ProductResponse
+_barcodes = TTLCache(maxsize=CACHE_SIZE, ttl=CACHE_TTL)   # barcode → id
 
 
 class ProductService:
 
     @staticmethod
-    def get_all(db: Session, skip: int = 0, limit: int = 200) -> List[Product]:
-        return db.query(Product).offset(skip).limit(limit).all()
+    def get_all(db: Session, skip: int = 0, limit: int = 200,
+                cursor: Optional[str] = None) -> Tuple[List[Product], Optional[str]]:
+        """Products in id order. Returns (rows, next_cursor); prefer `cursor` over `skip`."""
+        q = db.query(Product).order_by(Product.id)
+        if cursor:
+            (after_id,) = decode_cursor(cursor, "id")
+            q = q.filter(Product.id > after_id)
+        elif skip:
+            q = q.offset(skip)
+        return page(q.limit(limit + 1).all(), limit, "id")
 
     @staticmethod
-    def get_by_id(db: Session, product_id: int) -> Product:
+    def _get(db: Session, product_id: int) -> Product:
+        """Load the ORM row (uncached) for writes."""
         p = db.query(Product).filter(Product.id == product_id).first()
         if not p:
             raise HTTPException(status_code=404, detail="Product not found")
         return p
 
     @staticmethod
-    def get_by_barcode(db: Session, barcode: str) -> Product:
+    def _remember(product: Product, versions: Tuple[int, int]) -> ProductResponse:
+        """Cache a row read after taking `versions`; a write since then wins."""
+        snapshot = ProductResponse.model_validate(product)
+        _products.set(product.id, snapshot, versions[0])
+        if product.barcode:
+            _barcodes.set(product.barcode, product.id, versions[1])
+        return snapshot
+
+    @staticmethod
+    def get_by_id(db: Session, product_id: int) -> ProductResponse:
+        cached = _products.get(product_id)
+        if cached is not None:
+            return cached
+        versions = _products.version(), _barcodes.version()
+        return ProductService._remember(ProductService._get(db, product_id), versions)
+
+    @staticmethod
+    def get_by_barcode(db: Session, barcode: str) -> ProductResponse:
+        product_id = _barcodes.get(barcode)
+        if product_id is not None:
+            cached = _products.get(product_id)
+            if cached is not None:
+                return cached
+        versions = _products.version(), _barcodes.version()
         p = db.query(Product).filter(Product.barcode == barcode).first()
         if not p:
             raise HTTPException(status_code=404, detail=f"No product with barcode {barcode}")
-        return p
+        return ProductService._remember(p, versions)
 
     @staticmethod
-    def search(db: Session, query: str) -> List[Product]:
-        pattern = f"%{query}%"
-        return (
-            db.query(Product)
-            .filter(
-                (Product.name.ilike(pattern)) |
-                (Product.barcode.ilike(pattern)) |
-                (Product.category.ilike(pattern))
-            )
-            .limit(50)
-            .all()
+    def suggest(db: Session, query: str, limit: int = 10) -> List[dict]:
+        """Typeahead from the in-memory catalog index (loaded on first use)."""
+        if not catalog_index.loaded:
+            catalog_index.load(db)
+        else:
+            catalog_index.refresh_if_stale(SessionLocal)
+        return catalog_index.suggest(query, limit)
+
+    # ── Write hooks (cache + catalog index) ───────────────────────────────────
+
+    @staticmethod
+    def _forget(product_id: int, barcodes: Iterable[Optional[str]]):
+        _products.pop(product_id)
+        for barcode in barcodes:
+            if barcode:
+                _barcodes.pop(barcode)
+
+    @staticmethod
+    def product_changed(product: Product, old_barcode: Optional[str] = None):
+        """Called after a committed create/update."""
+        ProductService._forget(product.id, [old_barcode, product.barcode])
+        catalog_index.upsert(product)
+        low_stock_tracker.product_changed(product)
+
+    @staticmethod
+    def product_removed(product_id: int, barcode: Optional[str]):
+        """Called after a committed delete."""
+        ProductService._forget(product_id, [barcode])
+        catalog_index.remove(product_id)
+        low_stock_tracker.product_removed(product_id)
+
+    @staticmethod
+    def stock_changed(stock: Dict[int, float]):
+        """Called after a committed stock movement with {product_id: new stock_qty}."""
+        for product_id, stock_qty in stock.items():
+            _products.update(product_id, lambda p, qty=stock_qty: p.model_copy(update={"stock_qty": qty}))
+            catalog_index.set_stock(product_id, stock_qty)
+        low_stock_tracker.stock_changed(stock)
+
+    @staticmethod
+    def cache_stats() -> dict:
+        return {"products": _products.stats(), "barcodes": _barcodes.stats()}
+
+    @staticmethod
+    def search(db: Session, query: str, limit: int = 50) -> List[Product]:
+        """
+        Ranked product search: prefix matches on name/barcode first, then by
+        trigram similarity. On PostgreSQL this runs off the pg_trgm GIN indexes
+        (and also matches misspellings); other databases (e.g. a local SQLite file) fall
+        back to plain substring matching with the same prefix-first ordering.
+        """
+        query = query.strip()
+        if not query:
+            return []
+        escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        pattern = f"%{escaped}%"
+        prefix = f"{escaped}%"
+
+        matches = [
+            Product.name.ilike(pattern, escape="\\"),
+            Product.barcode.ilike(pattern, escape="\\"),
+            Product.category.ilike(pattern, escape="\\"),
+        ]
+        prefix_first = case(
+            (Product.name.ilike(prefix, escape="\\"), 0),
+            (Product.barcode.ilike(prefix, escape="\\"), 0),
+            else_=1,
         )
 
+        q = db.query(Product)
+        if db.get_bind().dialect.name == "postgresql":
+            similarity = func.greatest(
+                func.similarity(Product.name, query),
+                func.similarity(func.coalesce(Product.category, ""), query),
+            )
+            q = q.filter(or_(*matches, Product.name.op("%")(query))).order_by(
+                prefix_first, similarity.desc(), Product.name
+            )
+        else:
+            q = q.filter(or_(*matches)).order_by(prefix_first, Product.name)
+        return q.limit(limit).all()
+
     @staticmethod
     def create(db: Session, data: ProductCreate) -> Product:
         # Check barcode uniqueness
@@ -53,29 +172,56 @@ class ProductService:
         db.add(product)
         db.commit()
         db.refresh(product)
+        ProductService.product_changed(product)
         return product
 
     @staticmethod
     def update(db: Session, product_id: int, data: ProductUpdate) -> Product:
-        product = ProductService.get_by_id(db, product_id)
+        product = ProductService._get(db, product_id)
+        old_barcode = product.barcode
         update_data = data.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(product, field, value)
         db.commit()
         db.refresh(product)
+        ProductService.product_changed(product, old_barcode)
         return product
 
     @staticmethod
     def delete(db: Session, product_id: int) -> dict:
-        product = ProductService.get_by_id(db, product_id)
+        product = ProductService._get(db, product_id)
+        barcode = product.barcode
         db.delete(product)
         db.commit()
+        ProductService.product_removed(product_id, barcode)
         return {"message": f"Product {product_id} deleted"}
 
     @staticmethod
     def get_low_stock(db: Session) -> List[Product]:
+        """
+        Products at or below their alert threshold, lowest stock first. The ids
+        come from the in-memory low-stock tracker, so this reads only those
+        rows; re-checking the threshold drops any that another worker restocked.
+        """
+        if not low_stock_tracker.loaded:
+            low_stock_tracker.load(db)
+        else:
+            low_stock_tracker.refresh_if_stale(SessionLocal)
+        ids = low_stock_tracker.low_ids()
+        if not ids:
+            return []
         return (
             db.query(Product)
-            .filter(Product.stock_qty <= Product.min_stock_alert)
+            .filter(Product.id.in_(ids), Product.stock_qty <= Product.min_stock_alert)
+            .order_by(Product.stock_qty)
             .all()
         )
+
+    @staticmethod
+    def low_stock_snapshot(db: Session) -> List[dict]:
+        """Low-stock products straight from the tracker (no product rows read)."""
+        if not low_stock_tracker.loaded:
+            low_stock_tracker.load(db)
+        else:
+            low_stock_tracker.refresh_if_stale(SessionLocal)
+        return low_stock_tracker.snapshot()
@@ -0,0 +1,153 @@
+"""
+services/rollup_service.py — Incrementally maintained daily sales rollups.
+
+Every write that changes what the dashboard counts (a new sale, or a payment
+moving to or from `failed`) adds a signed delta to sales_daily_rollup and
+product_daily_rollup inside the same transaction, so the dashboard reads a
+handful of rows per day instead of aggregating raw sales.
+
+Rebuild or backfill from the raw tables:
+    python -m backend.services.rollup_service [--from 2024-01-01] [--to 2024-12-31]
+"""
+import argparse
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Iterable, Optional
+from sqlalchemy import func, delete, insert, select
+from sqlalchemy.orm import Session
+from backend.models.sale import Sale, PaymentMode, PaymentStatus
+from backend.models.sale_item import SaleItem
+from backend.models.rollup import SalesDailyRollup, ProductDailyRollup
+
+logger = logging.getLogger(__name__)
+
+
+def _upsert(db: Session, model):
+    """INSERT ... ON CONFLICT for the session's dialect (PostgreSQL or SQLite)."""
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    return dialect_insert(model)
+
+
+class RollupDelta:
+    """Signed contributions of one or more sales, grouped by rollup key."""
+
+    def __init__(self):
+        self.sales = defaultdict(lambda: [0.0, 0])        # (day, mode) → [revenue, count]
+        self.products = defaultdict(lambda: [None, 0.0, 0.0])  # (day, pid) → [name, qty, revenue]
+
+    def add(self, created_at: datetime, payment_mode: PaymentMode, total: float,
+            items: Iterable[dict], sign: int = 1):
+        """`items` are dicts with product_id, product_name, qty and subtotal."""
+        day = created_at.date()
+        entry = self.sales[(day, payment_mode)]
+        entry[0] += sign * total
+        entry[1] += sign
+        for item in items:
+            entry = self.products[(day, item["product_id"])]
+            entry[0] = item["product_name"]
+            entry[1] += sign * item["qty"]
+            entry[2] += sign * item["subtotal"]
+
+    def __bool__(self):
+        return bool(self.sales)
+
+
+class RollupService:
+
+    @staticmethod
+    def apply(db: Session, delta: RollupDelta):
+        """
+        Upsert the delta into both rollup tables. Rows are written in key order
+        so concurrent transactions lock them in the same order. Call this last
+        before commit: the (day, mode) rows are shared by every lane.
+        """
+        if not delta:
+            return
+        sale_rows = [
+            {"day": day, "payment_mode": mode, "revenue": revenue, "transactions": count}
+            for (day, mode), (revenue, count) in sorted(delta.sales.items())
+        ]
+        stmt = _upsert(db, SalesDailyRollup)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["day", "payment_mode"],
+            set_={
+                "revenue": SalesDailyRollup.revenue + stmt.excluded.revenue,
+                "transactions": SalesDailyRollup.transactions + stmt.excluded.transactions,
+            },
+        ), sale_rows)
+
+        product_rows = [
+            {"day": day, "product_id": pid, "product_name": name, "qty": qty, "revenue": revenue}
+            for (day, pid), (name, qty, revenue) in sorted(delta.products.items())
+        ]
+        if product_rows:
+            stmt = _upsert(db, ProductDailyRollup)
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=["day", "product_id"],
+                set_={
+                    "product_name": stmt.excluded.product_name,
+                    "qty": ProductDailyRollup.qty + stmt.excluded.qty,
+                    "revenue": ProductDailyRollup.revenue + stmt.excluded.revenue,
+                },
+            ), product_rows)
+
+    @staticmethod
+    def rebuild(db: Session, date_from: Optional[date] = None, date_to: Optional[date] = None) -> dict:
+        """Recompute the rollups for [date_from, date_to] (all days when omitted) and commit."""
+        sale_day = func.date(Sale.created_at)
+        sale_filter = [Sale.payment_status != PaymentStatus.failed]
+        sales_scope, product_scope = [], []
+        if date_from:
+            sale_filter.append(Sale.created_at >= datetime.combine(date_from, datetime.min.time()))
+            sales_scope.append(SalesDailyRollup.day >= date_from)
+            product_scope.append(ProductDailyRollup.day >= date_from)
+        if date_to:
+            sale_filter.append(Sale.created_at < datetime.combine(date_to + timedelta(days=1), datetime.min.time()))
+            sales_scope.append(SalesDailyRollup.day <= date_to)
+            product_scope.append(ProductDailyRollup.day <= date_to)
+
+        db.execute(delete(SalesDailyRollup).where(*sales_scope))
+        db.execute(delete(ProductDailyRollup).where(*product_scope))
+
+        sales = db.execute(insert(SalesDailyRollup).from_select(
+            ["day", "payment_mode", "revenue", "transactions"],
+            select(sale_day, Sale.payment_mode, func.sum(Sale.total), func.count(Sale.id))
+            .where(*sale_filter)
+            .group_by(sale_day, Sale.payment_mode),
+        ))
+        products = db.execute(insert(ProductDailyRollup).from_select(
+            ["day", "product_id", "product_name", "qty", "revenue"],
+            select(sale_day, SaleItem.product_id, func.max(SaleItem.product_name),
+                   func.sum(SaleItem.qty), func.sum(SaleItem.subtotal))
+            .join(Sale, Sale.id == SaleItem.sale_id)
+            .where(*sale_filter)
+            .group_by(sale_day, SaleItem.product_id),
+        ))
+        db.commit()
+        return {"sales_rows": sales.rowcount, "product_rows": products.rowcount}
+
+    @staticmethod
+    def backfill_if_empty(db: Session):
+        """Build the rollups once for databases that had sales before they existed."""
+        if db.query(SalesDailyRollup.day).first() is None and db.query(Sale.id).first() is not None:
+            counts = RollupService.rebuild(db)
+            logger.info(f"Sales rollups backfilled: {counts}")
+
+
+if __name__ == "__main__":
+    from backend.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Rebuild the daily sales rollups from raw sales.")
+    parser.add_argument("--from", dest="date_from", type=date.fromisoformat, default=None)
+    parser.add_argument("--to", dest="date_to", type=date.fromisoformat, default=None)
+    args = parser.parse_args()
+
+    session = SessionLocal()
+    try:
+        print(RollupService.rebuild(session, args.date_from, args.date_to))
+    finally:
+        session.close()
@@ -1,7 +1,14 @@
 """
 services/sales_service.py — Create sales, deduct stock, handle credit.
 """
-from sqlalchemy.orm import Session
+import hashlib
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import insert, update, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, selectinload
 from fastapi import HTTPException
 from backend.models.product import Product
 from backend.models.sale import Sale, PaymentMode, PaymentStatus
@@ -9,27 +16,54 @@ from backend.models.sale_item import SaleItem
 from backend.models.inventory import InventoryLog, MovementType
 from backend.models.credit_ledger import CreditLedger
 from backend.models.customer import Customer
-from backend.schemas.sale import SaleCreate
+from backend.models.idempotency_key import IdempotencyKey
+from backend.schemas.sale import (
+    SaleCreate, SaleResponse, SaleBatchEntry, SaleBatchCreate, SaleBatchResult, SaleBatchResponse,
+)
+from backend.services.inventory_service import InventoryService
+from backend.services.product_service import ProductService
+from backend.services.pagination import decode_cursor, page
+from backend.services.rollup_service import RollupService, RollupDelta
 
 
 class SalesService:
 
     @staticmethod
-    def create_sale(db: Session, data: SaleCreate, user_id: int) -> Sale:
+    def _load_products(db: Session, product_ids: Iterable[int]) -> Dict[int, Product]:
+        """
+        Fetch every product in the cart with a single keyed query.
+
+        Rows are locked in primary-key order so that two lanes selling
+        overlapping baskets always queue up instead of deadlocking.
+        """
+        ids = set(product_ids)
+        if not ids:
+            return {}
+        rows = (
+            db.query(Product)
+            .filter(Product.id.in_(ids))
+            .order_by(Product.id)
+            .with_for_update()
+            .all()
+        )
+        return {p.id: p for p in rows}
+
+    @staticmethod
+    def _price_cart(data: SaleCreate, products: Dict[int, Product]) -> Tuple[List[dict], dict]:
+        """
+        Price every cart line against the loaded products.
+
+        Returns (item_rows, totals) where item_rows are plain dicts ready for a
+        bulk SaleItem insert and totals holds subtotal/discount/tax/total.
+        """
         subtotal = 0.0
         tax_total = 0.0
-        sale_items = []
+        item_rows = []
 
-        # ── Validate items & compute totals ────────────────────────────────
         for item_in in data.items:
-            product = db.query(Product).filter(Product.id == item_in.product_id).first()
+            product = products.get(item_in.product_id)
             if not product:
                 raise HTTPException(status_code=404, detail=f"Product {item_in.product_id} not found")
-            if product.stock_qty < item_in.qty:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Insufficient stock for '{product.name}' (available: {product.stock_qty})"
-                )
 
             item_subtotal = item_in.unit_price * item_in.qty
             item_discount = item_subtotal * (item_in.discount / 100)
@@ -40,92 +74,468 @@ class SalesService:
             subtotal += item_after_discount
             tax_total += item_tax
 
-            sale_items.append(SaleItem(
-                product_id=product.id,
-                product_name=product.name,
-                qty=item_in.qty,
-                unit_price=item_in.unit_price,
-                discount=item_discount,
-                tax=item_tax,
-                subtotal=item_total,
-            ))
+            item_rows.append({
+                "product_id": product.id,
+                "product_name": product.name,
+                "qty": item_in.qty,
+                "unit_price": item_in.unit_price,
+                "discount": item_discount,
+                "tax": item_tax,
+                "subtotal": item_total,
+            })
 
         # ── Cart-level discount ─────────────────────────────────────────────
         cart_discount = (subtotal + tax_total) * (data.discount / 100) if data.discount else 0.0
         total = subtotal + tax_total - cart_discount
 
-        # ── Credit validation ───────────────────────────────────────────────
-        if data.payment_mode == "credit":
-            if not data.customer_id:
-                raise HTTPException(status_code=400, detail="Customer required for credit payment")
-            customer = db.query(Customer).filter(Customer.id == data.customer_id).first()
-            if not customer:
-                raise HTTPException(status_code=404, detail="Customer not found")
-            available_credit = customer.credit_limit - customer.outstanding_credit
-            if total > available_credit:
+        return item_rows, {
+            "subtotal": subtotal,
+            "discount": cart_discount,
+            "tax": tax_total,
+            "total": total,
+        }
+
+    @staticmethod
+    def _check_credit(db: Session, data: SaleCreate, total: float) -> Optional[Customer]:
+        """Validate (and lock) the customer for a credit sale; None otherwise."""
+        if data.payment_mode != "credit":
+            return None
+        if not data.customer_id:
+            raise HTTPException(status_code=400, detail="Customer required for credit payment")
+        customer = (
+            db.query(Customer)
+            .filter(Customer.id == data.customer_id)
+            .with_for_update()
+            .first()
+        )
+        SalesService._validate_credit(customer, customer.outstanding_credit if customer else 0.0, total)
+        return customer
+
+    @staticmethod
+    def _validate_payment_mode(mode: str):
+        if mode not in PaymentMode.__members__:
+            raise HTTPException(status_code=400, detail=f"Invalid payment_mode '{mode}'")
+
+    @staticmethod
+    def _validate_credit(customer: Optional[Customer], outstanding: float, total: float):
+        if not customer:
+            raise HTTPException(status_code=404, detail="Customer not found")
+        available_credit = customer.credit_limit - outstanding
+        if total > available_credit:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Credit limit exceeded. Available: ₹{available_credit:.2f}"
+            )
+
+    @staticmethod
+    def _sale_row(data: SaleCreate, totals: dict, user_id: int, created_at: datetime) -> dict:
+        status = PaymentStatus.success if data.payment_mode != "card" else PaymentStatus.pending
+        return {
+            "customer_id": data.customer_id,
+            "user_id": user_id,
+            "subtotal": round(totals["subtotal"], 2),
+            "discount": round(totals["discount"], 2),
+            "tax": round(totals["tax"], 2),
+            "total": round(totals["total"], 2),
+            "payment_mode": PaymentMode(data.payment_mode),
+            "payment_status": status,
+            "notes": data.notes,
+            "created_at": created_at,
+        }
+
+    @staticmethod
+    def _insert_ids(db: Session, model, rows: List[dict]) -> List[int]:
+        """Multi-row INSERT … RETURNING id; ids come back in the order of ``rows``."""
+        if db.get_bind().dialect.name == "sqlite":
+            # SQLAlchemy cannot order RETURNING rows on SQLite and would fall back
+            # to one INSERT per row. SQLite has a single writer and numbers the
+            # rows of one INSERT in VALUES order, so sorting the ids is the same.
+            return sorted(db.scalars(insert(model).returning(model.id), rows).all())
+        return db.scalars(insert(model).returning(model.id, sort_by_parameter_order=True), rows).all()
+
+    @staticmethod
+    def _write_lines(db: Session, item_rows: List[dict],
+                     running: Dict[int, float], user_id: int) -> List[dict]:
+        """
+        Bulk-insert sale items (each row carries its sale_id) and their
+        inventory movements.
+
+        ``running`` maps product_id to the stock level before these lines and is
+        advanced line by line, so a SKU split over several lines or sales still
+        produces a continuous audit trail. Returns the item rows with their
+        generated ids filled in.
+        """
+        item_ids = SalesService._insert_ids(db, SaleItem, item_rows)
+
+        log_rows = []
+        for item_id, row in zip(item_ids, item_rows):
+            row["id"] = item_id
+            before_qty = running[row["product_id"]]
+            after_qty = before_qty - row["qty"]
+            running[row["product_id"]] = after_qty
+            log_rows.append({
+                "product_id": row["product_id"],
+                "movement_type": MovementType.sale,
+                "change_qty": -row["qty"],
+                "before_qty": before_qty,
+                "after_qty": after_qty,
+                "reference_id": row["sale_id"],
+                "reason": f"Sale #{row['sale_id']}",
+                "created_by": user_id,
+            })
+        db.execute(insert(InventoryLog), log_rows)
+        return item_rows
+
+    @staticmethod
+    def _charge_credit(db: Session, customer_id: int, sale_id: int, total: float):
+        balance = db.execute(
+            update(Customer)
+            .where(Customer.id == customer_id)
+            .values(outstanding_credit=Customer.outstanding_credit + total)
+            .returning(Customer.outstanding_credit),
+            execution_options={"synchronize_session": False},
+        ).scalar_one()
+        db.execute(insert(CreditLedger).values(
+            customer_id=customer_id,
+            sale_id=sale_id,
+            entry_type="debit",
+            amount=total,
+            balance_after=balance,
+            notes=f"Credit sale #{sale_id}",
+        ))
+
+    @staticmethod
+    def _response(sale_id: int, sale_row: dict, item_rows: List[dict]) -> SaleResponse:
+        """Build the API response from rows already in memory (no refresh)."""
+        return SaleResponse(
+            id=sale_id,
+            customer_id=sale_row["customer_id"],
+            user_id=sale_row["user_id"],
+            subtotal=sale_row["subtotal"],
+            discount=sale_row["discount"],
+            tax=sale_row["tax"],
+            total=sale_row["total"],
+            payment_mode=sale_row["payment_mode"].value,
+            payment_status=sale_row["payment_status"].value,
+            transaction_ref=None,
+            notes=sale_row["notes"],
+            created_at=sale_row["created_at"],
+            items=item_rows,
+        )
+
+    @staticmethod
+    def _request_hash(data: SaleCreate) -> str:
+        # Only the SaleCreate fields count, so a batch replay of a sale that was
+        # first posted on its own still matches the stored hash.
+        body = data.model_dump_json(include=set(SaleCreate.model_fields))
+        return hashlib.sha256(body.encode()).hexdigest()
+
+    @staticmethod
+    def _claim_key(db: Session, key: str, data: SaleCreate, user_id: int) -> Optional[SaleResponse]:
+        """
+        Reserve an idempotency key for this request.
+
+        Returns None when the key is new and the caller should go on to create
+        the sale, or the original SaleResponse when the key was already used.
+        The key row is inserted in the same transaction as the sale, so a
+        duplicate that arrives while the first request is still in flight
+        blocks on the primary-key index until that transaction finishes.
+        """
+        request_hash = SalesService._request_hash(data)
+
+        row = db.query(IdempotencyKey).filter(IdempotencyKey.key == key).first()
+        if row is None:
+            try:
+                db.execute(insert(IdempotencyKey).values(
+                    key=key, user_id=user_id, request_hash=request_hash,
+                ))
+                return None
+            except IntegrityError:
+                # A concurrent request with this key committed first
+                db.rollback()
+                row = db.query(IdempotencyKey).filter(IdempotencyKey.key == key).one()
+
+        if row.user_id != user_id or row.request_hash != request_hash:
+            raise HTTPException(
+                status_code=422,
+                detail="Idempotency-Key was already used for a different request",
+            )
+        sale = SalesService.get_sale_by_id(db, row.sale_id)
+        return SaleResponse.model_validate(sale)
+
+    @staticmethod
+    def _requested_qty(item_rows: List[dict]) -> Dict[int, float]:
+        """Total quantity per product — the same SKU may appear on several lines."""
+        requested: Dict[int, float] = {}
+        for row in item_rows:
+            requested[row["product_id"]] = requested.get(row["product_id"], 0.0) + row["qty"]
+        return requested
+
+    @staticmethod
+    def create_sale(db: Session, data: SaleCreate, user_id: int,
+                    idempotency_key: Optional[str] = None,
+                    created_at: Optional[datetime] = None) -> SaleResponse:
+        if idempotency_key:
+            replay = SalesService._claim_key(db, idempotency_key, data, user_id)
+            if replay is not None:
+                return replay
+
+        products = SalesService._load_products(db, (i.product_id for i in data.items))
+
+        # ── Validate items & compute totals ────────────────────────────────
+        item_rows, totals = SalesService._price_cart(data, products)
+
+        requested = SalesService._requested_qty(item_rows)
+        for pid, qty in requested.items():
+            product = products[pid]
+            if product.stock_qty < qty:
                 raise HTTPException(
                     status_code=400,
-                    detail=f"Credit limit exceeded. Available: ₹{available_credit:.2f}"
+                    detail=f"Insufficient stock for '{product.name}' (available: {product.stock_qty})"
                 )
 
+        # ── Credit validation ───────────────────────────────────────────────
+        customer = SalesService._check_credit(db, data, totals["total"])
+
         # ── Create Sale record ──────────────────────────────────────────────
-        sale = Sale(
-            customer_id=data.customer_id,
-            user_id=user_id,
-            subtotal=round(subtotal, 2),
-            discount=round(cart_discount, 2),
-            tax=round(tax_total, 2),
-            total=round(total, 2),
-            payment_mode=data.payment_mode,
-            payment_status=PaymentStatus.success if data.payment_mode != "card" else PaymentStatus.pending,
-            notes=data.notes,
-        )
-        db.add(sale)
-        db.flush()  # get sale.id before committing
-
-        # ── Attach items & deduct stock ────────────────────────────────────
-        for item, item_in in zip(sale_items, data.items):
-            product = db.query(Product).filter(Product.id == item_in.product_id).first()
-            item.sale_id = sale.id
-            db.add(item)
-
-            before_qty = product.stock_qty
-            product.stock_qty -= item_in.qty
-            after_qty = product.stock_qty
-
-            log = InventoryLog(
-                product_id=product.id,
-                movement_type=MovementType.sale,
-                change_qty=-item_in.qty,
-                before_qty=before_qty,
-                after_qty=after_qty,
-                reference_id=sale.id,
-                reason=f"Sale #{sale.id}",
-                created_by=user_id,
+        sale_row = SalesService._sale_row(data, totals, user_id, created_at or datetime.utcnow())
+        sale_id = db.execute(insert(Sale).values(**sale_row).returning(Sale.id)).scalar_one()
+        if idempotency_key:
+            db.execute(
+                update(IdempotencyKey)
+                .where(IdempotencyKey.key == idempotency_key)
+                .values(sale_id=sale_id)
             )
-            db.add(log)
+
+        # ── Deduct stock atomically ────────────────────────────────────────
+        stock = InventoryService.apply_stock_changes(
+            db, {pid: -qty for pid, qty in requested.items()}, require_stock=True
+        )
+        for pid in requested:
+            if pid not in stock:
+                db.rollback()
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"Insufficient stock for '{products[pid].name}' (sold on another lane)"
+                )
+
+        # ── Attach items & log movements ───────────────────────────────────
+        for row in item_rows:
+            row["sale_id"] = sale_id
+        running = {pid: before for pid, (before, _) in stock.items()}
+        SalesService._write_lines(db, item_rows, running, user_id)
 
         # ── Credit ledger entry ────────────────────────────────────────────
-        if data.payment_mode == "credit" and data.customer_id:
-            customer = db.query(Customer).filter(Customer.id == data.customer_id).first()
-            customer.outstanding_credit += total
-            ledger = CreditLedger(
-                customer_id=data.customer_id,
-                sale_id=sale.id,
-                entry_type="debit",
-                amount=total,
-                balance_after=customer.outstanding_credit,
-                notes=f"Credit sale #{sale.id}",
-            )
-            db.add(ledger)
+        if customer is not None:
+            SalesService._charge_credit(db, customer.id, sale_id, totals["total"])
+
+        # ── Dashboard rollups (last: their rows are shared by every lane) ──
+        delta = RollupDelta()
+        delta.add(sale_row["created_at"], sale_row["payment_mode"], sale_row["total"], item_rows)
+        RollupService.apply(db, delta)
 
         db.commit()
-        db.refresh(sale)
-        return sale
+        ProductService.stock_changed({pid: after for pid, (_, after) in stock.items()})
+        return SalesService._response(sale_id, sale_row, item_rows)
+
+    @staticmethod
+    def create_sales_batch(db: Session, data: SaleBatchCreate, user_id: int) -> SaleBatchResponse:
+        """
+        Ingest many sales at once (offline lane replay, imports from another store).
+
+        Each chunk runs in its own transaction: the products and credit customers
+        of the whole chunk are locked in one pass, every sale is priced exactly as
+        in create_sale, and all rows are written with multi-row INSERTs. A sale
+        that fails validation is reported and skipped without affecting the rest
+        of its chunk.
+        """
+        started = time.perf_counter()
+        results: List[SaleBatchResult] = []
+        entries = data.sales
+
+        for offset in range(0, len(entries), data.chunk_size):
+            chunk = entries[offset:offset + data.chunk_size]
+            try:
+                results.extend(SalesService._ingest_chunk(db, chunk, offset, user_id))
+            except IntegrityError:
+                # Another request claimed one of the chunk's idempotency keys
+                db.rollback()
+                results.extend(SalesService._ingest_one_by_one(db, chunk, offset, user_id))
+
+        elapsed = time.perf_counter() - started
+        counts = Counter(r.status for r in results)
+        return SaleBatchResponse(
+            results=results,
+            created=counts["created"],
+            duplicates=counts["duplicate"],
+            failed=counts["failed"],
+            elapsed_ms=round(elapsed * 1000, 2),
+            sales_per_sec=round(len(entries) / elapsed, 1) if elapsed else 0.0,
+        )
 
     @staticmethod
-    def get_sales(db: Session, skip: int = 0, limit: int = 100):
-        return db.query(Sale).order_by(Sale.created_at.desc()).offset(skip).limit(limit).all()
+    def _ingest_chunk(db: Session, chunk: List[SaleBatchEntry], offset: int,
+                      user_id: int) -> List[SaleBatchResult]:
+        results: List[SaleBatchResult] = []
+
+        # ── Keys that were already used ────────────────────────────────────
+        keys = [e.idempotency_key for e in chunk if e.idempotency_key]
+        known = {}
+        if keys:
+            known = {
+                k.key: k
+                for k in db.query(IdempotencyKey).filter(IdempotencyKey.key.in_(keys)).all()
+            }
+
+        # ── Lock everything the chunk touches, in one pass ─────────────────
+        products = SalesService._load_products(
+            db, (i.product_id for e in chunk for i in e.items)
+        )
+        customer_ids = {e.customer_id for e in chunk if e.payment_mode == "credit" and e.customer_id}
+        customers = {}
+        if customer_ids:
+            customers = {
+                c.id: c
+                for c in db.query(Customer)
+                .filter(Customer.id.in_(customer_ids))
+                .order_by(Customer.id)
+                .with_for_update()
+                .all()
+            }
+        available = {pid: p.stock_qty for pid, p in products.items()}
+        outstanding = {cid: c.outstanding_credit for cid, c in customers.items()}
+
+        # ── Validate & price every sale against the running totals ─────────
+        accepted = []
+        sold: Dict[int, float] = {}
+        seen_keys = set()
+        now = datetime.utcnow()
+        for index, entry in enumerate(chunk, start=offset):
+            key = entry.idempotency_key
+            if key in known:
+                row = known[key]
+                if row.user_id != user_id or row.request_hash != SalesService._request_hash(entry):
+                    results.append(SaleBatchResult(
+                        index=index, status="failed",
+                        error="Idempotency-Key was already used for a different request",
+                    ))
+                else:
+                    results.append(SaleBatchResult(index=index, status="duplicate", sale_id=row.sale_id))
+                continue
+            if key and key in seen_keys:
+                results.append(SaleBatchResult(
+                    index=index, status="failed", error="Idempotency-Key repeated within the batch",
+                ))
+                continue
+
+            try:
+                SalesService._validate_payment_mode(entry.payment_mode)
+                item_rows, totals = SalesService._price_cart(entry, products)
+                requested = SalesService._requested_qty(item_rows)
+                for pid, qty in requested.items():
+                    if available[pid] < qty:
+                        raise HTTPException(
+                            status_code=400,
+                            detail=f"Insufficient stock for '{products[pid].name}' (available: {available[pid]})"
+                        )
+                if entry.payment_mode == "credit":
+                    if not entry.customer_id:
+                        raise HTTPException(status_code=400, detail="Customer required for credit payment")
+                    customer = customers.get(entry.customer_id)
+                    SalesService._validate_credit(customer, outstanding.get(entry.customer_id, 0.0), totals["total"])
+                    outstanding[entry.customer_id] += totals["total"]
+            except HTTPException as e:
+                results.append(SaleBatchResult(index=index, status="failed", error=str(e.detail)))
+                continue
+
+            for pid, qty in requested.items():
+                available[pid] -= qty
+                sold[pid] = sold.get(pid, 0.0) + qty
+            if key:
+                seen_keys.add(key)
+            sale_row = SalesService._sale_row(entry, totals, user_id, entry.created_at or now)
+            accepted.append((index, entry, sale_row, item_rows, totals))
+
+        if not accepted:
+            db.rollback()
+            return sorted(results, key=lambda r: r.index)
+
+        # ── Bulk writes ────────────────────────────────────────────────────
+        sale_ids = SalesService._insert_ids(db, Sale, [sale_row for _, _, sale_row, _, _ in accepted])
+
+        stock = InventoryService.apply_stock_changes(
+            db, {pid: -qty for pid, qty in sold.items()}, require_stock=True
+        )
+        if len(stock) != len(sold):
+            # Another lane sold the same stock in between: redo this chunk
+            # sale by sale so only the sales that no longer fit fail.
+            db.rollback()
+            return SalesService._ingest_one_by_one(db, chunk, offset, user_id)
+        running = {pid: before for pid, (before, _) in stock.items()}
+
+        all_items = []
+        key_rows = []
+        delta = RollupDelta()
+        for sale_id, (index, entry, sale_row, item_rows, totals) in zip(sale_ids, accepted):
+            for row in item_rows:
+                row["sale_id"] = sale_id
+            all_items.extend(item_rows)
+            delta.add(sale_row["created_at"], sale_row["payment_mode"], sale_row["total"], item_rows)
+            if entry.payment_mode == "credit":
+                SalesService._charge_credit(db, entry.customer_id, sale_id, totals["total"])
+            if entry.idempotency_key:
+                key_rows.append({
+                    "key": entry.idempotency_key,
+                    "user_id": user_id,
+                    "request_hash": SalesService._request_hash(entry),
+                    "sale_id": sale_id,
+                })
+            results.append(SaleBatchResult(index=index, status="created", sale_id=sale_id))
+        SalesService._write_lines(db, all_items, running, user_id)
+        if key_rows:
+            db.execute(insert(IdempotencyKey), key_rows)
+        RollupService.apply(db, delta)
+
+        db.commit()
+        ProductService.stock_changed({pid: after for pid, (_, after) in stock.items()})
+        return sorted(results, key=lambda r: r.index)
+
+    @staticmethod
+    def _ingest_one_by_one(db: Session, chunk: List[SaleBatchEntry], offset: int,
+                           user_id: int) -> List[SaleBatchResult]:
+        results = []
+        for index, entry in enumerate(chunk, start=offset):
+            key = entry.idempotency_key
+            try:
+                replayed = key and db.query(IdempotencyKey).filter(IdempotencyKey.key == key).first()
+                sale = SalesService.create_sale(
+                    db, entry, user_id, idempotency_key=key, created_at=entry.created_at
+                )
+                status = "duplicate" if replayed else "created"
+                results.append(SaleBatchResult(index=index, status=status, sale_id=sale.id))
+            except HTTPException as e:
+                db.rollback()
+                results.append(SaleBatchResult(index=index, status="failed", error=str(e.detail)))
+        return results
+
+    @staticmethod
+    def get_sales(db: Session, skip: int = 0, limit: int = 100,
+                  cursor: Optional[str] = None) -> Tuple[List[Sale], Optional[str]]:
+        """
+        Newest sales first, keyed on (created_at, id) so deep pages cost the
+        same as the first one. Returns (rows, next_cursor).
+        """
+        q = (
+            db.query(Sale)
+            .options(selectinload(Sale.items))
+            .order_by(Sale.created_at.desc(), Sale.id.desc())
+        )
+        if cursor:
+            created_at, sale_id = decode_cursor(cursor, "created_at", "id")
+            q = q.filter(tuple_(Sale.created_at, Sale.id) < tuple_(created_at, sale_id))
+        elif skip:
+            q = q.offset(skip)
+        return page(q.limit(limit + 1).all(), limit, "created_at", "id")
 
     @staticmethod
     def get_sale_by_id(db: Session, sale_id: int) -> Sale:
@@ -136,10 +546,30 @@ class SalesService:
 
     @staticmethod
     def update_payment_status(db: Session, sale_id: int, status: str, ref: str = None) -> Sale:
-        sale = SalesService.get_sale_by_id(db, sale_id)
-        sale.payment_status = status
+        # Row lock: two callbacks for the same sale must not both apply a rollup delta
+        sale = db.query(Sale).filter(Sale.id == sale_id).with_for_update().first()
+        if not sale:
+            raise HTTPException(status_code=404, detail="Sale not found")
+        try:
+            new_status = PaymentStatus(status)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid payment status '{status}'")
+
+        was_failed = sale.payment_status == PaymentStatus.failed
+        is_failed = new_status == PaymentStatus.failed
+        sale.payment_status = new_status
         if ref:
             sale.transaction_ref = ref
+        if was_failed != is_failed:
+            # Failed sales are not counted: remove or re-add this sale's contribution
+            delta = RollupDelta()
+            items = [
+                {"product_id": i.product_id, "product_name": i.product_name,
+                 "qty": i.qty, "subtotal": i.subtotal}
+                for i in sale.items
+            ]
+            delta.add(sale.created_at, sale.payment_mode, sale.total, items, sign=-1 if is_failed else 1)
+            RollupService.apply(db, delta)
         db.commit()
         db.refresh(sale)
         return sale
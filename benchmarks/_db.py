@@ -0,0 +1,44 @@
+"""
+benchmarks/_db.py — Database setup shared by the benchmark scripts.
+
+backend.database builds its engine from DATABASE_URL at import time, so
+use_database() must run before anything from backend is imported. The
+benchmarks write rows: point them at a scratch database, never a live one.
+"""
+import os
+import statistics
+import tempfile
+from typing import List, Optional
+
+
+def use_database(url: Optional[str] = None) -> str:
+    """Select the database: --database-url, BENCH_DATABASE_URL, or a throw-away SQLite file."""
+    url = url or os.getenv("BENCH_DATABASE_URL")
+    if not url:
+        url = f"sqlite:///{tempfile.mkdtemp(prefix='supermarket-bench-')}/bench.db"
+    os.environ["DATABASE_URL"] = url
+    return url
+
+
+def prepare():
+    """Create tables and apply migrations; returns the app's engine."""
+    from backend.database import Base, engine
+    from backend.migrations import run_migrations
+    # The tables the sale path writes and the migrations index, registered on Base
+    from backend.models import (
+        User, Product, Customer, Sale, SaleItem, InventoryLog, CreditLedger, IdempotencyKey,
+        SalesDailyRollup, ProductDailyRollup,
+    )
+
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    return engine
+
+
+def summary(samples_ms: List[float]) -> dict:
+    ordered = sorted(samples_ms)
+    return {
+        "p50": statistics.median(ordered),
+        "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "max": ordered[-1],
+    }
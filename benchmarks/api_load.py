@@ -0,0 +1,102 @@
+"""
+benchmarks/api_load.py — API throughput at 50 / 200 / 500 concurrent clients.
+
+Drives a running server with a mixed POS workload (45% product search, 35%
+sales page, 15% daily summary, 5% new sale) and reports requests per second
+and latency at each client count. Start the server once with the sync path
+and once with ASYNC_DB=true against the same scratch database, and compare:
+
+    uvicorn backend.main:app --port 8000                   # or ASYNC_DB=true uvicorn ...
+    python -m benchmarks.api_load --base-url http://127.0.0.1:8000 --duration 10
+
+The new sales write rows and consume stock: never point it at a live store.
+Run the generator on another machine (or at least other cores) than the
+server, or the two compete for the same CPU.
+"""
+import argparse
+import asyncio
+import random
+import time
+
+import httpx
+
+from benchmarks._db import summary
+
+SEARCHES = ["milk", "bread", "rice", "oil", "tea", "sugar", "salt", "soap", "biscuit", "atta"]
+
+
+async def _login(client: httpx.AsyncClient, username: str, password: str) -> dict:
+    resp = await client.post("/auth/login", data={"username": username, "password": password})
+    resp.raise_for_status()
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+async def _request(client: httpx.AsyncClient, rng: random.Random, products: list) -> httpx.Response:
+    roll = rng.random()
+    if roll < 0.45:
+        return await client.get("/products/search", params={"q": rng.choice(SEARCHES)})
+    if roll < 0.80:
+        return await client.get("/sales/", params={"limit": 50})
+    if roll < 0.95:
+        return await client.get("/dashboard/summary")
+    pid, price = rng.choice(products)
+    sale = {"items": [{"product_id": pid, "qty": 1, "unit_price": price}], "payment_mode": "cash"}
+    return await client.post("/sales/", json=sale)
+
+
+async def _level(base_url: str, headers: dict, products: list, clients: int, duration: float) -> dict:
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    samples, errors = [], 0
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=60) as client:
+        deadline = time.perf_counter() + duration
+
+        async def _client(seed: int):
+            nonlocal errors
+            rng = random.Random(seed)
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    resp = await _request(client, rng, products)
+                    ok = resp.status_code < 400
+                except httpx.HTTPError:
+                    ok = False
+                if ok:
+                    samples.append((time.perf_counter() - started) * 1000)
+                else:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(_client(seed) for seed in range(clients)))
+        elapsed = time.perf_counter() - started
+    return {"rps": len(samples) / elapsed, "errors": errors, **(summary(samples) if samples else {})}
+
+
+async def _run(args):
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=30) as client:
+        headers = await _login(client, args.username, args.password)
+        resp = await client.get("/products/", params={"limit": 200}, headers=headers)
+        resp.raise_for_status()
+        products = [(p["id"], p["price"]) for p in resp.json() if p["stock_qty"] > 0]
+    if not products:
+        raise SystemExit("no products in stock: seed the scratch database first")
+
+    print(f"server: {args.base_url}   duration: {args.duration:g} s per level")
+    print(f"{'clients':>8} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9} {'errors':>7}")
+    for clients in [int(n) for n in args.clients.split(",")]:
+        r = await _level(args.base_url, headers, products, clients, args.duration)
+        print(f"{clients:>8} {r['rps']:>8.1f} {r.get('p50', 0):>9.0f} {r.get('p95', 0):>9.0f} "
+              f"{r.get('max', 0):>9.0f} {r['errors']:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mixed-workload API load generator.")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--clients", default="50,200,500", help="comma-separated concurrent clients")
+    parser.add_argument("--duration", type=float, default=10, help="seconds per client count")
+    parser.add_argument("--username", default="admin", help="an admin: the mix includes the daily summary")
+    parser.add_argument("--password", default="admin123")
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+benchmarks/login_storm.py — Checkout responsiveness during a shift-change login storm.
+
+Against a running server, scans one barcode every 50 ms, first on an idle
+server and then while `--logins` cashiers log in at the same moment. bcrypt
+runs on the bounded hashing executor, so barcode latency should stay close
+to idle; logins beyond HASH_QUEUE are refused at once with 503 + Retry-After.
+
+    uvicorn backend.main:app --port 8000                   # HASH_QUEUE=8 to see 503s
+    python -m benchmarks.login_storm --base-url http://127.0.0.1:8000 --logins 30
+
+Every login uses the same account (the admin by default), which costs the
+server exactly what 30 different cashiers would: one lookup and one bcrypt
+verify each.
+"""
+import argparse
+import asyncio
+import time
+from collections import Counter
+
+import httpx
+
+from benchmarks._db import summary
+
+SCAN_INTERVAL = 0.05
+
+
+async def _login(client: httpx.AsyncClient, username: str, password: str) -> httpx.Response:
+    return await client.post("/auth/login", data={"username": username, "password": password})
+
+
+async def _scan(client: httpx.AsyncClient, headers: dict, barcode: str, until: asyncio.Event) -> list:
+    """Scan every SCAN_INTERVAL until `until` is set; returns latencies in ms."""
+    samples = []
+    while not until.is_set():
+        started = time.perf_counter()
+        resp = await client.get(f"/products/barcode/{barcode}", headers=headers)
+        resp.raise_for_status()
+        samples.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(SCAN_INTERVAL)
+    return samples
+
+
+async def _run(args):
+    limits = httpx.Limits(max_connections=args.logins + 1)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=120, limits=limits) as client:
+        resp = await _login(client, args.username, args.password)
+        resp.raise_for_status()
+        headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+        resp = await client.get("/products/", params={"limit": 1}, headers=headers)
+        resp.raise_for_status()
+        if not resp.json():
+            raise SystemExit("no products: seed the scratch database first")
+        barcode = resp.json()[0]["barcode"]
+
+        done = asyncio.Event()
+        scanner = asyncio.create_task(_scan(client, headers, barcode, done))
+        await asyncio.sleep(args.idle)
+        done.set()
+        idle = summary(await scanner)
+
+        done = asyncio.Event()
+        scanner = asyncio.create_task(_scan(client, headers, barcode, done))
+        started = time.perf_counter()
+        logins = await asyncio.gather(*(_login(client, args.username, args.password) for _ in range(args.logins)))
+        storm_s = time.perf_counter() - started
+        done.set()
+        storm = summary(await scanner)
+
+    statuses = Counter(r.status_code for r in logins)
+    retry_after = {r.headers.get("retry-after") for r in logins if r.status_code == 503}
+    print(f"server: {args.base_url}   logins: {args.logins}")
+    print(f"logins: {dict(sorted(statuses.items()))} in {storm_s:.2f} s"
+          + (f"   503 Retry-After: {', '.join(sorted(retry_after))}" if retry_after else ""))
+    print(f"{'barcode scan':>14} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+    for label, s in (("idle", idle), ("during storm", storm)):
+        print(f"{label:>14} {s['p50']:>9.1f} {s['p95']:>9.1f} {s['max']:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Barcode scan latency during a login storm.")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--logins", type=int, default=30, help="concurrent logins")
+    parser.add_argument("--idle", type=float, default=2.0, help="seconds of idle scanning first")
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin123")
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
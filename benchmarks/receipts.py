@@ -0,0 +1,88 @@
+"""
+benchmarks/receipts.py — Receipts per second through print_receipt to a local TCP sink.
+
+Starts a sink on 127.0.0.1 that accepts connections and drains them, points
+the network printer at it and prints the same receipt repeatedly through
+print_receipt: render into one ESC/POS buffer, one write over the persistent
+handle. The sink counts connections, so a handle that is reopened per
+receipt shows up at once:
+
+    python -m benchmarks.receipts
+    python -m benchmarks.receipts --receipts 5000 --lines 40
+"""
+import argparse
+import os
+import socket
+import threading
+import time
+
+from benchmarks._db import summary
+
+
+class _Sink:
+    """TCP server that reads and discards everything; counts connections and bytes."""
+
+    def __init__(self):
+        self._server = socket.create_server(("127.0.0.1", 0))
+        self.port = self._server.getsockname()[1]
+        self.connections = 0
+        self.bytes = 0
+        threading.Thread(target=self._accept, name="receipt-sink", daemon=True).start()
+
+    def _accept(self):
+        while True:
+            conn, _ = self._server.accept()
+            self.connections += 1
+            threading.Thread(target=self._drain, args=(conn,), daemon=True).start()
+
+    def _drain(self, conn: socket.socket):
+        with conn:
+            while chunk := conn.recv(65536):
+                self.bytes += len(chunk)
+
+
+def _sale(lines: int) -> dict:
+    items = [{"name": f"Item {i} Family Pack 500 g", "qty": 1 + i % 3, "unit_price": 12.5 + i,
+              "subtotal": (1 + i % 3) * (12.5 + i)} for i in range(lines)]
+    subtotal = sum(item["subtotal"] for item in items)
+    return {"sale_id": 1042, "created_at": "2026-10-17 09:30", "cashier": "bench",
+            "payment_mode": "card", "transaction_ref": "TXN-0001", "items": items,
+            "subtotal": subtotal, "discount": 0.0, "tax": round(subtotal * 0.05, 2),
+            "total": round(subtotal * 1.05, 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark receipt printing to a TCP sink.")
+    parser.add_argument("--receipts", type=int, default=2000)
+    parser.add_argument("--lines", type=int, default=15, help="items per receipt")
+    args = parser.parse_args()
+
+    sink = _Sink()
+    # printer.py reads the printer type at import; host and port per connection
+    os.environ.update(PRINTER_TYPE="network", PRINTER_HOST="127.0.0.1", PRINTER_PORT=str(sink.port))
+    from backend.hardware.printer import print_receipt, printer_connection, render_receipt
+
+    sale = _sale(args.lines)
+    size = len(render_receipt(sale))
+    print_receipt(sale)     # connect
+
+    samples = []
+    started = time.perf_counter()
+    for _ in range(args.receipts):
+        t = time.perf_counter()
+        result = print_receipt(sale)
+        samples.append((time.perf_counter() - t) * 1000)
+        if not result["success"]:
+            raise SystemExit(f"print failed: {result['error']}")
+    elapsed = time.perf_counter() - started
+    printer_connection.close()
+
+    s = summary(samples)
+    print(f"receipt: {args.lines} items, {size} bytes   receipts: {args.receipts}")
+    print(f"{'receipts/s':>11} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'connections':>12} {'writes':>7}")
+    print(f"{args.receipts / elapsed:>11.0f} {s['p50']:>8.3f} {s['p95']:>8.3f} {s['max']:>8.3f} "
+          f"{sink.connections:>12} {printer_connection.writes:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -134,6 +134,10 @@ with st.sidebar:
     st.divider()
 
     if st.button("🚪 Logout", use_container_width=True):
+        for key in ["low_stock_feed", "lane_replayer"]:
+            worker = st.session_state.pop(key, None)
+            if worker is not None:
+                worker.stop()
         for key in ["token", "role", "username", "user_id", "page", "cart"]:
             st.session_state.pop(key, None)
             cookie_manager.delete(key, key=f"delete_{key}")
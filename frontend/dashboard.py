@@ -7,10 +7,13 @@ import os
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
-from datetime import date
+from datetime import date, timedelta
+from urllib.parse import urlencode
 
 from config import API_BASE
 
+TOP_WINDOWS = {"Today": "today", "Last 7 days": "7d", "Last 30 days": "30d", "Custom": "custom", "All time": "all"}
+
 
 def _headers():
     return {"Authorization": f"Bearer {st.session_state.get('token', '')}"}
@@ -79,8 +82,19 @@ def show_dashboard():
 
     # ── Top Products ──────────────────────────────────────────────────────────
     with col_top:
-        st.subheader("🏆 Top Products (All Time)")
-        top = _api("/dashboard/top-products?limit=8")
+        st.subheader("🏆 Top Products")
+        w1, w2, w3 = st.columns(3)
+        window_label = w1.selectbox("Window", list(TOP_WINDOWS.keys()), index=2, key="top_window")
+        rank_by = w2.selectbox("Rank by", ["revenue", "qty"], key="top_by")
+        category = w3.text_input("Category", key="top_category")
+        params = {"limit": 8, "window": TOP_WINDOWS[window_label], "by": rank_by}
+        if params["window"] == "custom":
+            d1, d2 = st.columns(2)
+            params["date_from"] = d1.date_input("From", value=date.today() - timedelta(days=6), key="top_from")
+            params["date_to"] = d2.date_input("To", value=date.today(), key="top_to")
+        if category.strip():
+            params["category"] = category.strip()
+        top = _api("/dashboard/top-products?" + urlencode(params))
         if top:
             df_top = pd.DataFrame(top)
             fig = px.bar(
@@ -127,17 +141,23 @@ def show_dashboard():
     st.divider()
 
     # ── Monthly Revenue Chart ─────────────────────────────────────────────────
-    st.subheader("📈 Monthly Revenue")
+    st.subheader("📈 Monthly Revenue vs Last Year")
     monthly = _api("/dashboard/monthly-revenue")
     if monthly:
         months = ["Jan","Feb","Mar","Apr","May","Jun","Jul","Aug","Sep","Oct","Nov","Dec"]
         df_m = pd.DataFrame(monthly)
         df_m["month_name"] = df_m["month"].apply(lambda m: months[int(m)-1])
         fig = go.Figure()
+        fig.add_trace(go.Bar(
+            x=df_m["month_name"], y=df_m["prev_revenue"],
+            name="Revenue (last year)",
+            marker_color="#533483",
+        ))
         fig.add_trace(go.Bar(
             x=df_m["month_name"], y=df_m["revenue"],
             name="Revenue",
             marker_color="#e94560",
+            text=df_m["growth_pct"].apply(lambda g: "" if pd.isna(g) else f"{g:+.1f}%"),
         ))
         fig.add_trace(go.Scatter(
             x=df_m["month_name"], y=df_m["transactions"],
@@ -151,6 +171,7 @@ def show_dashboard():
             plot_bgcolor="rgba(0,0,0,0)",
             font_color="#ccc",
             legend=dict(bgcolor="rgba(0,0,0,0)"),
+            barmode="group",
             yaxis=dict(title=dict(text="Revenue (₹)", font=dict(color="#e94560"))),
             yaxis2=dict(title=dict(text="Transactions", font=dict(color="#0f3460")), overlaying="y", side="right"),
             height=340,
@@ -7,6 +7,7 @@ import os
 import pandas as pd
 
 from config import API_BASE
+import low_stock_feed
 
 
 def _headers():
@@ -36,7 +37,11 @@ def show_inventory():
 
     st.markdown('<div class="page-header">📦 Inventory Management</div>', unsafe_allow_html=True)
 
-    tab_list, tab_add, tab_restock = st.tabs(["📋 Product List", "➕ Add Product", "🔄 Restock"])
+    low_stock_feed.session_feed(API_BASE)
+
+    tab_list, tab_low, tab_add, tab_restock = st.tabs(
+        ["📋 Product List", "⚠️ Low Stock", "➕ Add Product", "🔄 Restock"]
+    )
 
     # ── PRODUCT LIST ──────────────────────────────────────────────────────────
     with tab_list:
@@ -107,6 +112,10 @@ def show_inventory():
             else:
                 st.info("No products found. Add your first product.")
 
+    # ── LOW STOCK (live) ──────────────────────────────────────────────────────
+    with tab_low:
+        _low_stock_panel()
+
     # ── ADD PRODUCT ───────────────────────────────────────────────────────────
     with tab_add:
         st.subheader("➕ Add New Product")
@@ -165,3 +174,21 @@ def show_inventory():
                     st.success(f"✅ Restocked {qty} units of '{product['name']}'.")
                 else:
                     st.error(f"Restock failed: {r.text if r else 'No response'}")
+
+
+@st.fragment(run_every=3)
+def _low_stock_panel():
+    """Re-renders from the live feed's in-memory set; no API request per refresh."""
+    feed = low_stock_feed.session_feed(API_BASE)
+    low = feed.products()
+    status = feed.status()
+    if not status["connected"]:
+        st.caption("🔌 Connecting to live low-stock updates…")
+    elif status["updated_at"]:
+        st.caption(f"🟢 Live — last change {status['updated_at']:%H:%M:%S}")
+    if low:
+        df_low = pd.DataFrame(low)[["id", "name", "stock_qty", "min_stock_alert", "unit"]]
+        df_low.columns = ["ID", "Name", "Stock", "Min Alert", "Unit"]
+        st.dataframe(df_low, use_container_width=True, height=400)
+    elif status["connected"]:
+        st.success("✅ All products have adequate stock.")
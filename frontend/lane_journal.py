@@ -0,0 +1,403 @@
+"""
+frontend/lane_journal.py — Offline-capable lane journal.
+
+An embedded SQLite file on the lane PC keeps:
+  - a read-only snapshot of the product catalog, refreshed while the backend
+    is reachable, so barcode lookups and search keep working offline
+  - an append-only journal of confirmed carts that could not be posted
+
+A background replayer pushes journaled sales to POST /sales/batch once the
+backend is reachable again. Every cart keeps the Idempotency-Key it was
+confirmed with, so a sale that did reach the backend before the link dropped
+is reported as a duplicate instead of being created twice.
+
+Journaled sales record the cashier's user id, never their token. Bearer
+tokens do not expire, so they stay in the browser session: each session runs
+its own LaneReplayer (kept in st.session_state) that replays only its
+cashier's sales with its cashier's token, and stops on logout. A cashier's
+offline sales therefore sync once that cashier is logged in on the lane
+again. The file is created owner-only (0600).
+
+Sales the server rejects, or refuses with a 4xx, and journal entries that
+cannot be read stay in the file with their error; the POS page lists them.
+
+Configure via .env:
+    POS_JOURNAL_PATH=pos_journal.db
+    POS_REPLAY_INTERVAL=15        # seconds between replay attempts
+    POS_REPLAY_BATCH=100          # sales per /sales/batch call
+    POS_CATALOG_REFRESH=300       # seconds between catalog snapshots
+"""
+import os
+import json
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import requests
+import streamlit as st
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_PATH = os.getenv("POS_JOURNAL_PATH", "pos_journal.db")
+REPLAY_INTERVAL = float(os.getenv("POS_REPLAY_INTERVAL", 15))
+REPLAY_BATCH = int(os.getenv("POS_REPLAY_BATCH", 100))
+CATALOG_REFRESH = float(os.getenv("POS_CATALOG_REFRESH", 300))
+CATALOG_PAGE = 200
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS catalog (
+    id        INTEGER PRIMARY KEY,
+    barcode   TEXT,
+    name      TEXT NOT NULL,
+    category  TEXT,
+    data      TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_catalog_barcode ON catalog (barcode);
+
+CREATE TABLE IF NOT EXISTS journal (
+    seq             INTEGER PRIMARY KEY AUTOINCREMENT,
+    idempotency_key TEXT NOT NULL UNIQUE,
+    cashier_id      INTEGER NOT NULL,
+    payload         TEXT NOT NULL,
+    created_at      TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_journal_cashier ON journal (cashier_id);
+
+CREATE TABLE IF NOT EXISTS journal_acks (
+    seq        INTEGER PRIMARY KEY REFERENCES journal (seq),
+    status     TEXT NOT NULL,          -- synced | rejected
+    sale_id    INTEGER,
+    error      TEXT,
+    acked_at   TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS journal_attempts (
+    seq          INTEGER PRIMARY KEY REFERENCES journal (seq),
+    http_status  INTEGER NOT NULL,     -- 4xx (or unreadable 200) from the last replay attempt
+    error        TEXT,
+    attempted_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_schema_ready = False
+_schema_lock = threading.Lock()
+
+
+def _restrict_permissions(path: str):
+    """Owner-only access; SQLite gives the -wal / -shm files the same mode."""
+    if not os.path.exists(path):
+        os.close(os.open(path, os.O_CREAT | os.O_WRONLY, 0o600))
+    for name in (path, f"{path}-wal", f"{path}-shm"):
+        try:
+            os.chmod(name, 0o600)
+        except OSError:
+            pass
+
+
+def _connect() -> sqlite3.Connection:
+    global _schema_ready
+    if not _schema_ready:
+        _restrict_permissions(JOURNAL_PATH)
+    conn = sqlite3.connect(JOURNAL_PATH, timeout=10)
+    conn.row_factory = sqlite3.Row
+    if not _schema_ready:
+        with _schema_lock:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            _schema_ready = True
+    return conn
+
+
+@contextmanager
+def _journal():
+    """Connection that commits on success and is always closed."""
+    conn = _connect()
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def _set_meta(conn: sqlite3.Connection, key: str, value: str):
+    conn.execute(
+        "INSERT INTO meta (key, value) VALUES (?, ?) "
+        "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+        (key, value),
+    )
+
+
+# ── Catalog snapshot ──────────────────────────────────────────────────────────
+
+def refresh_catalog(api_base: str, token: str) -> int:
+    """Replace the local catalog with a fresh copy of GET /products/. Returns row count."""
+    headers = {"Authorization": f"Bearer {token}"}
+    products = []
+    params = {"limit": CATALOG_PAGE}
+    while True:
+        resp = requests.get(f"{api_base}/products/", headers=headers, timeout=10, params=params)
+        resp.raise_for_status()
+        products.extend(resp.json())
+        next_cursor = resp.headers.get("X-Next-Cursor")
+        if not next_cursor:
+            break
+        params["cursor"] = next_cursor
+
+    with _journal() as conn:
+        conn.execute("DELETE FROM catalog")
+        conn.executemany(
+            "INSERT INTO catalog (id, barcode, name, category, data) VALUES (?, ?, ?, ?, ?)",
+            [(p["id"], p.get("barcode"), p["name"], p.get("category"), json.dumps(p)) for p in products],
+        )
+        _set_meta(conn, "catalog_refreshed_at", datetime.utcnow().isoformat())
+    return len(products)
+
+
+def lookup_barcode(barcode: str):
+    """Product dict from the local snapshot, or None."""
+    with _journal() as conn:
+        row = conn.execute("SELECT data FROM catalog WHERE barcode = ?", (barcode,)).fetchone()
+    return json.loads(row["data"]) if row else None
+
+
+def search_catalog(query: str, limit: int = 50) -> list:
+    """Case-insensitive substring search over name, barcode and category."""
+    pattern = f"%{query}%"
+    with _journal() as conn:
+        rows = conn.execute(
+            "SELECT data FROM catalog "
+            "WHERE name LIKE ? OR barcode LIKE ? OR category LIKE ? "
+            "ORDER BY name LIMIT ?",
+            (pattern, pattern, pattern, limit),
+        ).fetchall()
+    return [json.loads(r["data"]) for r in rows]
+
+
+# ── Sale journal ──────────────────────────────────────────────────────────────
+
+def journal_sale(idempotency_key: str, cashier_id: int, payload: dict) -> int:
+    """Append a confirmed cart to the journal. Returns its sequence number."""
+    created_at = datetime.utcnow().isoformat()
+    with _journal() as conn:
+        cur = conn.execute(
+            "INSERT INTO journal (idempotency_key, cashier_id, payload, created_at) "
+            "VALUES (?, ?, ?, ?) ON CONFLICT (idempotency_key) DO NOTHING",
+            (idempotency_key, cashier_id, json.dumps(payload), created_at),
+        )
+        if cur.rowcount:
+            return cur.lastrowid
+        row = conn.execute(
+            "SELECT seq FROM journal WHERE idempotency_key = ?", (idempotency_key,)
+        ).fetchone()
+        return row["seq"]
+
+
+def pending_count() -> int:
+    with _journal() as conn:
+        return conn.execute(
+            "SELECT COUNT(*) FROM journal j LEFT JOIN journal_acks a ON a.seq = j.seq "
+            "WHERE a.seq IS NULL"
+        ).fetchone()[0]
+
+
+def rejected_count() -> int:
+    with _journal() as conn:
+        return conn.execute(
+            "SELECT COUNT(*) FROM journal_acks WHERE status = 'rejected'"
+        ).fetchone()[0]
+
+
+def attention_count() -> int:
+    """Unsynced sales the server refused with a 4xx on the last attempt."""
+    with _journal() as conn:
+        return conn.execute(
+            "SELECT COUNT(*) FROM journal_attempts t LEFT JOIN journal_acks a ON a.seq = t.seq "
+            "WHERE a.seq IS NULL"
+        ).fetchone()[0]
+
+
+def problem_sales(limit: int = 50) -> list:
+    """Rejected sales and sales refused on their last attempt, with the server's error."""
+    with _journal() as conn:
+        rows = conn.execute(
+            "SELECT j.seq, j.idempotency_key, j.cashier_id, j.created_at, a.status, a.error "
+            "FROM journal_acks a JOIN journal j ON j.seq = a.seq WHERE a.status = 'rejected' "
+            "UNION ALL "
+            "SELECT j.seq, j.idempotency_key, j.cashier_id, j.created_at, "
+            "'refused (' || t.http_status || ')', t.error "
+            "FROM journal_attempts t JOIN journal j ON j.seq = t.seq "
+            "LEFT JOIN journal_acks a ON a.seq = t.seq WHERE a.seq IS NULL "
+            "ORDER BY 1 LIMIT ?",
+            (limit,),
+        ).fetchall()
+    return [dict(r) for r in rows]
+
+
+def _response_error(resp: requests.Response) -> str:
+    try:
+        detail = resp.json().get("detail")
+    except ValueError:
+        detail = None
+    return str(detail or resp.text[:200] or resp.reason)
+
+
+def _record_attempt(entries: list, http_status: int, error: str):
+    now = datetime.utcnow().isoformat()
+    with _journal() as conn:
+        conn.executemany(
+            "INSERT INTO journal_attempts (seq, http_status, error, attempted_at) "
+            "VALUES (?, ?, ?, ?) ON CONFLICT (seq) DO UPDATE SET "
+            "http_status = excluded.http_status, error = excluded.error, "
+            "attempted_at = excluded.attempted_at",
+            [(r["seq"], http_status, error, now) for r in entries],
+        )
+
+
+def _reject_unreadable(entries: list) -> list:
+    """Ack entries whose payload no longer parses as rejected; returns the rest, parsed."""
+    readable, unreadable = [], []
+    for r in entries:
+        try:
+            readable.append((r, json.loads(r["payload"])))
+        except ValueError as e:
+            logger.error(f"Journal entry #{r['seq']} is unreadable: {e}")
+            unreadable.append((r["seq"], "rejected", None, f"Unreadable journal entry: {e}",
+                               datetime.utcnow().isoformat()))
+    if unreadable:
+        with _journal() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO journal_acks (seq, status, sale_id, error, acked_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                unreadable,
+            )
+    return readable
+
+
+def replay_pending(api_base: str, token: str, cashier_id: int) -> int:
+    """
+    Push the cashier's unacknowledged sales to POST /sales/batch, oldest first,
+    with that cashier's token so they are attributed correctly. Returns the
+    number of sales acknowledged.
+
+    A network error or 5xx stops the pass and leaves the rest for the next
+    attempt. A 4xx (deactivated user, revoked token), or a 200 whose body is
+    not a batch result, is recorded in journal_attempts for the remaining
+    sales, which stay pending. Entries that cannot be read are acknowledged
+    as rejected so they neither block the others nor disappear.
+    """
+    with _journal() as conn:
+        rows = conn.execute(
+            "SELECT j.seq, j.idempotency_key, j.payload, j.created_at "
+            "FROM journal j LEFT JOIN journal_acks a ON a.seq = j.seq "
+            "WHERE a.seq IS NULL AND j.cashier_id = ? ORDER BY j.seq",
+            (cashier_id,),
+        ).fetchall()
+    entries = _reject_unreadable(rows)
+
+    acked = 0
+    for i in range(0, len(entries), REPLAY_BATCH):
+        batch = entries[i:i + REPLAY_BATCH]
+        body = {"sales": [
+            {**payload, "idempotency_key": r["idempotency_key"], "created_at": r["created_at"]}
+            for r, payload in batch
+        ]}
+        try:
+            resp = requests.post(
+                f"{api_base}/sales/batch", json=body, timeout=30,
+                headers={"Authorization": f"Bearer {token}"},
+            )
+        except requests.exceptions.RequestException:
+            return acked
+        if resp.status_code >= 500:
+            return acked
+        if resp.status_code != 200:
+            _record_attempt([r for r, _ in entries[i:]], resp.status_code, _response_error(resp))
+            return acked
+        try:
+            results = [(batch[result["index"]][0], result) for result in resp.json()["results"]]
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            logger.error(f"Unexpected /sales/batch response: {e}")
+            _record_attempt([r for r, _ in entries[i:]], resp.status_code, f"Unexpected response: {e}")
+            return acked
+
+        now = datetime.utcnow().isoformat()
+        acks = [
+            (entry["seq"], "rejected" if result["status"] == "failed" else "synced",
+             result.get("sale_id"), result.get("error"), now)
+            for entry, result in results
+        ]
+        with _journal() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO journal_acks (seq, status, sale_id, error, acked_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                acks,
+            )
+            conn.executemany("DELETE FROM journal_attempts WHERE seq = ?", [(a[0],) for a in acks])
+        acked += len(acks)
+    return acked
+
+
+# ── Background replayer ───────────────────────────────────────────────────────
+
+class LaneReplayer:
+    """Replays one session's cashier's journaled sales and refreshes the catalog."""
+
+    def __init__(self, api_base: str):
+        self.api_base = api_base
+        self._lock = threading.Lock()
+        self._token = None
+        self._cashier_id = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self, token: str, cashier_id: int):
+        """Start the thread if it is not running; later calls only update the cashier."""
+        if not token or cashier_id is None:
+            return
+        with self._lock:
+            self._token, self._cashier_id = token, int(cashier_id)
+            self._stop.clear()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="lane-replayer", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        """Stop after the current pass (on logout); the token is dropped."""
+        with self._lock:
+            self._token = None
+            self._stop.set()
+
+    def _run(self):
+        last_refresh = 0.0
+        while not self._stop.is_set():
+            with self._lock:
+                token, cashier_id = self._token, self._cashier_id
+            try:
+                replay_pending(self.api_base, token, cashier_id)
+                if time.monotonic() - last_refresh > CATALOG_REFRESH:
+                    refresh_catalog(self.api_base, token)
+                    last_refresh = time.monotonic()
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                logger.info(f"Lane replay: backend unreachable; retrying in {REPLAY_INTERVAL:g}s")
+            except requests.exceptions.HTTPError as e:
+                logger.warning(f"Lane replay: catalog refresh failed: {e}")
+            except Exception:
+                logger.exception("Lane replay failed; retrying on the next pass")
+            self._stop.wait(REPLAY_INTERVAL)
+
+
+def session_replayer(api_base: str) -> LaneReplayer:
+    """This session's replayer, started with its current cashier and token."""
+    replayer = st.session_state.get("lane_replayer")
+    if replayer is None:
+        replayer = st.session_state["lane_replayer"] = LaneReplayer(api_base)
+    replayer.start(st.session_state.get("token", ""), st.session_state.get("user_id"))
+    return replayer
@@ -0,0 +1,107 @@
+"""
+frontend/low_stock_feed.py — Live low-stock set for the inventory page.
+
+A background thread holds GET /inventory/low-stock/stream open and applies
+its server-sent events to an in-memory copy of the low-stock set, so the
+page renders from memory instead of polling the API. The thread reconnects
+(and receives a fresh snapshot) whenever the stream drops.
+
+Each browser session owns its feed (kept in st.session_state), so one
+cashier's token never authenticates another session's stream. A feed whose
+page has stopped reading it for IDLE_TIMEOUT seconds closes its stream; the
+next page render starts it again.
+"""
+import json
+import threading
+import time
+from datetime import datetime
+
+import requests
+import streamlit as st
+
+RECONNECT_DELAY = 5
+READ_TIMEOUT = 60      # server sends a keepalive every 15 s
+IDLE_TIMEOUT = 120     # the page reads the feed every few seconds while open
+
+
+class LowStockFeed:
+
+    def __init__(self, api_base: str):
+        self.api_base = api_base
+        self._lock = threading.Lock()
+        self._products = {}
+        self._token = None
+        self._connected = False
+        self._updated_at = None
+        self._read_at = time.monotonic()
+        self._listener = None
+
+    def start(self, token: str):
+        """Start the listener if it is not running; later calls only update the token."""
+        with self._lock:
+            self._token = token
+            self._read_at = time.monotonic()
+            if self._listener is None or not self._listener.is_alive():
+                self._listener = threading.Thread(target=self._listen, name="low-stock-feed", daemon=True)
+                self._listener.start()
+
+    def stop(self):
+        """Close the stream at its next line or keepalive (on logout)."""
+        with self._lock:
+            self._read_at = float("-inf")
+
+    def _idle(self) -> bool:
+        return time.monotonic() - self._read_at > IDLE_TIMEOUT
+
+    def _apply(self, event: dict):
+        kind = event.get("event")
+        with self._lock:
+            if kind == "snapshot":
+                self._products = {p["id"]: p for p in event["products"]}
+            elif kind == "low":
+                self._products[event["product"]["id"]] = event["product"]
+            elif kind in ("ok", "removed"):
+                self._products.pop(event["product"]["id"], None)
+            self._updated_at = datetime.now()
+
+    def _listen(self):
+        while not self._idle():
+            token = self._token
+            try:
+                with requests.get(
+                    f"{self.api_base}/inventory/low-stock/stream", stream=True,
+                    headers={"Authorization": f"Bearer {token}"}, timeout=(5, READ_TIMEOUT),
+                ) as resp:
+                    resp.raise_for_status()
+                    self._connected = True
+                    for line in resp.iter_lines():
+                        if line.startswith(b"data:"):
+                            event = json.loads(line[5:])
+                            if event.get("event") == "resync":
+                                break           # reconnect for a fresh snapshot
+                            self._apply(event)
+                        if self._token != token or self._idle():
+                            break               # cashier logged in again, or page closed
+            except Exception:
+                pass
+            self._connected = False
+            if not self._idle():
+                time.sleep(RECONNECT_DELAY)
+
+    def products(self) -> list:
+        """Current low-stock products, lowest stock first."""
+        with self._lock:
+            self._read_at = time.monotonic()
+            return sorted(self._products.values(), key=lambda p: p["stock_qty"])
+
+    def status(self) -> dict:
+        return {"connected": self._connected, "updated_at": self._updated_at}
+
+
+def session_feed(api_base: str) -> LowStockFeed:
+    """This session's feed, started with its current token."""
+    feed = st.session_state.get("low_stock_feed")
+    if feed is None:
+        feed = st.session_state["low_stock_feed"] = LowStockFeed(api_base)
+    feed.start(st.session_state.get("token", ""))
+    return feed
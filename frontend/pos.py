@@ -7,28 +7,57 @@ Features:
   - Weight reading from digital scale
   - Payment: Cash, UPI, Card (Pine Labs), Credit
   - POST /sales → triggers receipt print
+  - Offline mode: catalog snapshot + sale journal (see lane_journal.py)
 """
 import streamlit as st
 import requests
 import os
+import uuid
 from datetime import datetime
 
 from config import API_BASE
+import lane_journal
 
 
 def _headers():
     return {"Authorization": f"Bearer {st.session_state.get('token', '')}"}
 
 
-def _api(method, path, **kwargs):
+def _api(method, path, quiet=False, timeout=8, **kwargs):
     try:
-        resp = getattr(requests, method)(f"{API_BASE}{path}", headers=_headers(), timeout=8, **kwargs)
+        resp = getattr(requests, method)(f"{API_BASE}{path}", headers=_headers(), timeout=timeout, **kwargs)
         return resp
-    except requests.exceptions.ConnectionError:
-        st.error("⚠️ Cannot reach backend API.")
+    except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+        if not quiet:
+            st.error("⚠️ Cannot reach backend API.")
         return None
 
 
+SALE_TIMEOUT = float(os.getenv("POS_SALE_TIMEOUT", 3))
+SALE_RETRIES = int(os.getenv("POS_SALE_RETRIES", 4))
+PAYMENT_WAIT = float(os.getenv("POS_PAYMENT_WAIT", 90))    # seconds for the customer to tap / enter PIN
+
+
+def _post_sale(payload: dict):
+    """
+    POST /sales with a per-cart Idempotency-Key, retrying on timeouts.
+
+    The key lives in session state until the sale succeeds, so a retry (or a
+    second click) can never create a duplicate sale — the backend simply
+    replays the original one.
+    """
+    if "checkout_key" not in st.session_state:
+        st.session_state.checkout_key = str(uuid.uuid4())
+    headers = {**_headers(), "Idempotency-Key": st.session_state.checkout_key}
+
+    for attempt in range(SALE_RETRIES):
+        try:
+            return requests.post(f"{API_BASE}/sales", json=payload, headers=headers, timeout=SALE_TIMEOUT)
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError):
+            continue
+    return None
+
+
 def show_pos():
     st.markdown("""
     <style>
@@ -45,6 +74,22 @@ def show_pos():
 
     st.markdown('<div class="pos-header">🛒 POS — Billing Counter</div>', unsafe_allow_html=True)
 
+    # Offline journal: keep the catalog snapshot fresh and replay queued sales
+    lane_journal.session_replayer(API_BASE)
+    pending = lane_journal.pending_count()
+    if pending:
+        st.warning(f"📴 {pending} offline sale(s) waiting to sync with the server.")
+    rejected = lane_journal.rejected_count()
+    if rejected:
+        st.error(f"⚠️ {rejected} offline sale(s) were rejected by the server — check the lane journal.")
+    attention = lane_journal.attention_count()
+    if attention:
+        st.error(f"⚠️ {attention} offline sale(s) were refused on their last sync attempt — "
+                 "the cashier must log in again on this lane, or check the lane journal.")
+    if rejected or attention:
+        with st.expander("Offline sales that need attention"):
+            st.dataframe(lane_journal.problem_sales(), use_container_width=True, hide_index=True)
+
     # Init cart in session state
     if "cart" not in st.session_state:
         st.session_state.cart = []
@@ -70,9 +115,14 @@ def show_pos():
         with tab_search:
             search_q = st.text_input("Search by name/category:", key="search_q")
             if search_q and len(search_q) >= 2:
-                resp = _api("get", f"/products/search?q={search_q}")
-                if resp and resp.status_code == 200:
+                resp = _api("get", "/products/suggest", quiet=True, params={"q": search_q, "limit": 8})
+                products = None
+                if resp is None:
+                    products = lane_journal.search_catalog(search_q)
+                    st.caption("📴 Offline — searching the local catalog snapshot.")
+                elif resp.status_code == 200:
                     products = resp.json()
+                if products is not None:
                     if products:
                         for p in products[:8]:
                             c1, c2, c3 = st.columns([4, 2, 1])
@@ -173,14 +223,21 @@ def show_pos():
 
         if st.button("🗑️ Clear Cart", use_container_width=True):
             st.session_state.cart = []
+            st.session_state.pop("checkout_key", None)
             st.rerun()
 
 
 def _add_by_barcode(barcode: str):
-    resp = _api("get", f"/products/barcode/{barcode}")
-    if resp and resp.status_code == 200:
+    resp = _api("get", f"/products/barcode/{barcode}", quiet=True)
+    if resp is None:
+        product = lane_journal.lookup_barcode(barcode)
+        if product:
+            _add_to_cart(product)
+        else:
+            st.warning(f"📴 Offline — barcode '{barcode}' not in the local catalog.")
+    elif resp.status_code == 200:
         _add_to_cart(resp.json())
-    elif resp:
+    else:
         st.warning(f"Product with barcode '{barcode}' not found.")
 
 
@@ -216,7 +273,8 @@ def _confirm_sale(cart_discount: float, payment_mode: str, customer_id, total: f
         "customer_id": customer_id,
     }
 
-    # For card payments: initiate Pine Labs first
+    # For card payments: initiate Pine Labs first, then wait for the result
+    card_ref = None
     if payment_mode == "card":
         with st.spinner("Initiating card payment…"):
             pay_resp = _api("post", "/hardware/payment/initiate",
@@ -226,17 +284,44 @@ def _confirm_sale(cart_discount: float, payment_mode: str, customer_id, total: f
                 if not pay_data.get("success"):
                     st.error(f"POS: {pay_data.get('message')}")
                     return
-                st.info(f"✅ Payment initiated on terminal. Transaction ID: {pay_data.get('transaction_id')}")
+                txn = pay_data.get("transaction_id")
+                st.info(f"✅ Payment initiated on terminal. Transaction ID: {txn}")
             else:
+                txn = None
                 st.warning("POS terminal not reachable. Proceeding with manual verification.")
+        if txn:
+            with st.spinner("Waiting for the customer to complete payment on the terminal…"):
+                # One long-poll request; the backend polls the terminal
+                wait_resp = _api("get", f"/hardware/payment/wait/{txn}", timeout=PAYMENT_WAIT + 10,
+                                 params={"timeout": PAYMENT_WAIT})
+            result = wait_resp.json() if wait_resp is not None and wait_resp.status_code == 200 else {}
+            if result.get("status") == "failed":
+                st.error(f"❌ Card payment declined: {result.get('message', '')}")
+                return
+            if result.get("status") == "success":
+                card_ref = txn
+                st.info(f"💳 Card approved ({result.get('card_type', '')} {result.get('approval_code', '')})")
+            else:
+                st.warning("Payment not confirmed by the terminal yet. Proceeding with manual verification.")
 
     with st.spinner("Processing sale…"):
-        resp = _api("post", "/sales", json=payload)
+        resp = _post_sale(payload)
         if resp is None:
+            # Backend unreachable: journal the cart, the replayer syncs it later
+            seq = lane_journal.journal_sale(
+                st.session_state.checkout_key, st.session_state.get("user_id"), payload
+            )
+            st.warning(f"📴 Server unreachable — sale saved offline (journal #{seq}) and will sync automatically.")
+            st.session_state.cart = []
+            st.session_state.pop("checkout_key", None)
             return
         if resp.status_code == 201:
             sale = resp.json()
             st.success(f"✅ Sale #{sale['id']} completed! Total: ₹{sale['total']:.2f}")
+            if card_ref:
+                _api("patch", f"/sales/{sale['id']}/payment-status", quiet=True,
+                     params={"status": "success", "ref": card_ref})
+                sale["transaction_ref"] = card_ref
 
             # Print receipt
             receipt_payload = {
@@ -260,12 +345,13 @@ def _confirm_sale(cart_discount: float, payment_mode: str, customer_id, total: f
                 "total": sale["total"],
             }
             print_resp = _api("post", "/hardware/print", json=receipt_payload)
-            if print_resp and print_resp.status_code == 200:
-                st.info("🖨️ Receipt printed.")
+            if print_resp and print_resp.status_code == 202:
+                st.info("🖨️ Receipt sent to printer.")
             else:
                 st.warning("🖨️ Receipt print failed (is printer connected?)")
 
             st.session_state.cart = []
+            st.session_state.pop("checkout_key", None)
             st.rerun()
         else:
             try:
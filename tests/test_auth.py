@@ -0,0 +1,98 @@
+"""
+tests/test_auth.py — Login on the bounded hashing executor, and the Principal cache.
+
+bcrypt runs on its own executor with a hard queue cap: a login that finds
+the queue full is refused at once with 503 + Retry-After. A password stored
+with an outdated bcrypt cost is rehashed by verify_and_update on the next
+successful login. The cached Principal of a user is dropped when an admin
+changes their role or deactivates them.
+"""
+import threading
+
+from passlib.hash import bcrypt
+
+import backend.services.auth_service as auth_service
+from backend.database import SessionLocal
+from backend.executors import BoundedExecutor
+from backend.models import User
+from backend.models.user import UserRole
+
+PASSWORD = "counter-7"
+
+
+def _login(client, user):
+    return client.post("/auth/login", data={"username": user.username, "password": PASSWORD})
+
+
+def _stored_hash(user_id: int) -> str:
+    db = SessionLocal()
+    try:
+        return db.query(User.hashed_password).filter(User.id == user_id).scalar()
+    finally:
+        db.close()
+
+
+def test_login_is_refused_with_retry_after_when_the_hashing_queue_is_full(client, make_user, monkeypatch):
+    user = make_user(hashed_password=auth_service.pwd_context.hash(PASSWORD))
+    executor = BoundedExecutor("test-hashing", workers=1, max_queue=1)
+    monkeypatch.setattr(auth_service, "hashing_executor", executor)
+    running, release = threading.Event(), threading.Event()
+
+    def _hold():
+        running.set()
+        release.wait(10)
+
+    executor.submit(_hold)
+    running.wait(10)
+    executor.submit(release.wait, 10)       # fills the one queue slot
+    try:
+        resp = _login(client, user)
+    finally:
+        release.set()
+        executor.shutdown()
+
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "1"
+    assert executor.stats()["rejected"] == 1
+
+
+def test_login_rehashes_a_password_stored_with_an_outdated_cost(client, make_user, monkeypatch):
+    outdated = bcrypt.using(rounds=auth_service.BCRYPT_ROUNDS + 1).hash(PASSWORD)
+    user = make_user(hashed_password=outdated)
+    calls = []
+    verify_and_update = auth_service.pwd_context.verify_and_update
+
+    def _spy(*args, **kwargs):
+        result = verify_and_update(*args, **kwargs)
+        calls.append(result)
+        return result
+
+    monkeypatch.setattr(auth_service.pwd_context, "verify_and_update", _spy)
+
+    assert _login(client, user).status_code == 200
+    rehashed = _stored_hash(user.id)
+    assert calls == [(True, rehashed)]
+    assert rehashed.startswith(f"$2b${auth_service.BCRYPT_ROUNDS:02d}$")
+    assert auth_service.pwd_context.verify(PASSWORD, rehashed)
+
+    # The current-cost hash is kept on the next login
+    assert _login(client, user).status_code == 200
+    assert _stored_hash(user.id) == rehashed
+    assert calls[-1] == (True, None)
+
+
+def test_role_change_and_deactivation_invalidate_the_cached_principal(client, make_user, auth_headers):
+    admin, manager = make_user(role=UserRole.admin), make_user(role=UserRole.admin)
+    headers = auth_headers(admin)
+    assert client.get("/auth/cache-stats", headers=headers).status_code == 200     # now cached
+
+    resp = client.patch(f"/auth/users/{admin.id}", json={"role": "staff"}, headers=auth_headers(manager))
+    assert resp.status_code == 200
+    assert client.get("/auth/cache-stats", headers=headers).status_code == 403
+    assert client.get("/products/", params={"limit": 1}, headers=headers).status_code == 200
+
+    resp = client.patch(f"/auth/users/{admin.id}", json={"is_active": 0}, headers=auth_headers(manager))
+    assert resp.status_code == 200
+    resp = client.get("/products/", params={"limit": 1}, headers=headers)
+    assert resp.status_code == 400
+    assert resp.json()["detail"] == "User is deactivated"
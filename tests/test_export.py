@@ -0,0 +1,99 @@
+"""
+tests/test_export.py — GET /sales/export streams every sale line in the range.
+
+CSV has one row per line item, NDJSON one object per sale; both must match
+the database exactly, across chunk boundaries. The gzip stream decompresses
+to the same bytes as the plain one, and an empty range is just the CSV
+header (or nothing at all for NDJSON).
+"""
+import csv
+import gzip
+import io
+import json
+from datetime import date, datetime
+
+import pytest
+
+from backend.database import SessionLocal
+from backend.models import Product, SaleItem
+from backend.models.user import UserRole
+from backend.schemas.sale import SaleCreate, SaleItemIn
+from backend.services import export_service
+from backend.services.export_service import ExportService
+from backend.services.sales_service import SalesService
+
+DAY = date(2025, 2, 10)
+EMPTY_DAY = date(2025, 2, 20)
+SALES = 12
+
+
+@pytest.fixture(scope="module")
+def exported_day(engine, cashier):
+    """SALES sales on DAY with one to three lines each; returns {sale_id: lines}."""
+    db = SessionLocal()
+    try:
+        products = [Product(name=f"Export item {i}", barcode=f"export-{i}", price=5.0 + i, stock_qty=1000)
+                    for i in range(3)]
+        db.add_all(products)
+        db.commit()
+        lines = {}
+        for n in range(SALES):
+            cart = products[:1 + n % 3]
+            sale = SalesService.create_sale(
+                db, SaleCreate(items=[SaleItemIn(product_id=p.id, qty=1, unit_price=p.price) for p in cart]),
+                cashier.id, created_at=datetime.combine(DAY, datetime.min.time()).replace(hour=8, minute=n),
+            )
+            lines[sale.id] = len(cart)
+        return lines
+    finally:
+        db.close()
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(export_service, "CHUNK_BYTES", 256)
+
+
+def _export(db, fmt: str, day: date = DAY, gzip: bool = False) -> bytes:
+    return b"".join(ExportService.export_sales(db, day, day, fmt, gzip))
+
+
+def test_csv_has_one_row_per_sale_line(db, exported_day):
+    rows = list(csv.DictReader(io.StringIO(_export(db, "csv").decode())))
+
+    assert len(rows) == sum(exported_day.values())
+    assert {int(r["sale_id"]) for r in rows} == set(exported_day)
+    item_ids = {i for (i,) in db.query(SaleItem.id).filter(SaleItem.sale_id.in_(exported_day))}
+    assert {int(r["item_id"]) for r in rows} == item_ids
+
+
+def test_ndjson_has_one_object_per_sale_with_its_lines(db, exported_day):
+    records = [json.loads(line) for line in _export(db, "ndjson").decode().splitlines()]
+
+    assert {r["sale_id"]: len(r["items"]) for r in records} == exported_day
+    assert [r["created_at"] for r in records] == sorted(r["created_at"] for r in records)
+
+
+@pytest.mark.parametrize("fmt", ["csv", "ndjson"])
+def test_gzip_stream_decompresses_to_the_plain_export(db, exported_day, fmt):
+    assert gzip.decompress(_export(db, fmt, gzip=True)) == _export(db, fmt)
+
+
+def test_empty_range_is_only_the_csv_header_or_nothing(db, exported_day):
+    header = ",".join(export_service.SALE_COLUMNS + export_service.ITEM_COLUMNS) + "\r\n"
+
+    assert _export(db, "csv", EMPTY_DAY).decode() == header
+    assert _export(db, "ndjson", EMPTY_DAY) == b""
+    assert gzip.decompress(_export(db, "ndjson", EMPTY_DAY, gzip=True)) == b""
+
+
+def test_export_endpoint_streams_gzip_to_admins(client, db, exported_day, make_user, auth_headers):
+    admin = make_user(role=UserRole.admin)
+    params = {"date_from": DAY.isoformat(), "date_to": DAY.isoformat(), "format": "csv"}
+
+    resp = client.get("/sales/export", params=params,
+                      headers={**auth_headers(admin), "Accept-Encoding": "gzip"})
+
+    assert resp.status_code == 200
+    assert resp.headers["content-encoding"] == "gzip"
+    assert resp.content == _export(db, "csv")           # httpx undoes the gzip
@@ -0,0 +1,80 @@
+"""
+tests/test_idempotency.py — An Idempotency-Key makes POST /sales safe to retry.
+
+The key is claimed in the same transaction as the sale: a retry, or a
+duplicate racing the first request, gets the original sale back and stock is
+deducted once. Reusing a key for a different cart is refused with 422.
+"""
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import HTTPException
+
+from backend.database import SessionLocal
+from backend.models import Product, SaleItem
+from backend.schemas.sale import SaleCreate, SaleItemIn
+from backend.services.sales_service import SalesService
+
+DUPLICATES = 8
+
+
+def _cart(product: Product, qty: float = 2) -> SaleCreate:
+    return SaleCreate(items=[SaleItemIn(product_id=product.id, qty=qty, unit_price=product.price)])
+
+
+def _sell(data: SaleCreate, cashier_id: int, key: str, start: threading.Barrier = None) -> int:
+    db = SessionLocal()
+    try:
+        if start is not None:
+            start.wait()
+        return SalesService.create_sale(db, data, cashier_id, idempotency_key=key).id
+    finally:
+        db.close()
+
+
+def _stock(db, product_id: int) -> float:
+    return db.get(Product, product_id).stock_qty
+
+
+def _sales_of(db, product_id: int) -> int:
+    return db.query(SaleItem).filter(SaleItem.product_id == product_id).count()
+
+
+def test_replay_returns_the_original_sale_without_touching_stock(db, make_product, cashier):
+    product = make_product(stock_qty=10)
+    key = str(uuid.uuid4())
+
+    first = _sell(_cart(product), cashier.id, key)
+    replay = _sell(_cart(product), cashier.id, key)
+
+    assert replay == first
+    assert _stock(db, product.id) == 8
+    assert _sales_of(db, product.id) == 1
+
+
+def test_concurrent_duplicates_create_one_sale(db, make_product, cashier):
+    product = make_product(stock_qty=10)
+    key = str(uuid.uuid4())
+    start = threading.Barrier(DUPLICATES)
+
+    with ThreadPoolExecutor(max_workers=DUPLICATES) as pool:
+        sale_ids = list(pool.map(lambda _: _sell(_cart(product), cashier.id, key, start), range(DUPLICATES)))
+
+    assert len(set(sale_ids)) == 1
+    assert _sales_of(db, product.id) == 1
+    assert _stock(db, product.id) == 8
+
+
+def test_same_key_with_a_different_cart_is_refused(db, make_product, cashier):
+    product = make_product(stock_qty=10)
+    key = str(uuid.uuid4())
+    _sell(_cart(product, qty=2), cashier.id, key)
+
+    with pytest.raises(HTTPException) as refused:
+        _sell(_cart(product, qty=3), cashier.id, key)
+
+    assert refused.value.status_code == 422
+    assert _sales_of(db, product.id) == 1
+    assert _stock(db, product.id) == 8
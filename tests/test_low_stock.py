@@ -0,0 +1,87 @@
+"""
+tests/test_low_stock.py — The low-stock tracker keeps writes that land during a load.
+
+load() reads the products table and then swaps the result in. A sale or
+restock committed between the read and the swap is missing from the
+snapshot, so its hook is recorded while the load runs and replayed before
+the swap.
+"""
+import pytest
+
+import backend.services.product_service as product_service
+from backend.database import SessionLocal
+from backend.schemas.inventory import InventoryRestockRequest
+from backend.schemas.sale import SaleCreate, SaleItemIn
+from backend.services.inventory_service import InventoryService
+from backend.services.low_stock import LowStockTracker
+from backend.services.sales_service import SalesService
+
+
+class _WriteAfterSnapshot:
+    """Session stand-in: reads the products snapshot, then commits `write` before returning it."""
+
+    def __init__(self, db, write):
+        self._db, self._write = db, write
+
+    def query(self, *columns):
+        rows = self._db.query(*columns).all()
+        self._write()
+        return _Rows(rows)
+
+
+class _Rows:
+
+    def __init__(self, rows):
+        self._rows = rows
+
+    def yield_per(self, count):
+        return iter(self._rows)
+
+
+@pytest.fixture
+def tracker(monkeypatch):
+    tracker = LowStockTracker()
+    monkeypatch.setattr(product_service, "low_stock_tracker", tracker)
+    return tracker
+
+
+def _sell(product, qty, cashier_id):
+    db = SessionLocal()
+    try:
+        data = SaleCreate(items=[SaleItemIn(product_id=product.id, qty=qty, unit_price=product.price)])
+        SalesService.create_sale(db, data, cashier_id)
+    finally:
+        db.close()
+
+
+def _restock(product, qty, user_id):
+    db = SessionLocal()
+    try:
+        InventoryService.restock(db, InventoryRestockRequest(product_id=product.id, qty=qty), user_id)
+    finally:
+        db.close()
+
+
+def test_first_load_keeps_a_sale_committed_during_the_read(db, tracker, make_product, cashier):
+    product = make_product(stock_qty=12, min_stock_alert=10)
+
+    tracker.load(_WriteAfterSnapshot(db, lambda: _sell(product, 5, cashier.id)))
+
+    assert product.id in tracker.low_ids()
+    assert {p["id"]: p["stock_qty"] for p in tracker.snapshot()}[product.id] == 7
+
+
+def test_reload_keeps_stock_writes_committed_during_the_read(db, tracker, make_product, cashier):
+    selling = make_product(stock_qty=12, min_stock_alert=10)
+    restocked = make_product(stock_qty=3, min_stock_alert=10)
+    tracker.load(db)
+    assert restocked.id in tracker.low_ids() and selling.id not in tracker.low_ids()
+
+    def writes():
+        _sell(selling, 4, cashier.id)
+        _restock(restocked, 20, cashier.id)
+
+    tracker.load(_WriteAfterSnapshot(db, writes))
+
+    assert selling.id in tracker.low_ids()
+    assert restocked.id not in tracker.low_ids()
@@ -0,0 +1,78 @@
+"""
+tests/test_pagination.py — Keyset pagination through X-Next-Cursor.
+
+Following the cursor from page to page visits every row exactly once, in
+order, even when many rows share a created_at. A cursor that does not
+decode is refused with 400.
+"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import insert
+
+from backend.database import SessionLocal
+from backend.models import Product, Sale
+
+SAME_TIME = 7
+
+
+def _pages(client, path: str, headers: dict, limit: int) -> list:
+    """Every page of `path`, following X-Next-Cursor to the end."""
+    pages, params = [], {"limit": limit}
+    while True:
+        resp = client.get(path, params=params, headers=headers)
+        assert resp.status_code == 200, resp.text
+        pages.append(resp.json())
+        cursor = resp.headers.get("X-Next-Cursor")
+        if not cursor:
+            return pages
+        assert len(pages[-1]) == limit
+        params = {"limit": limit, "cursor": cursor}
+
+
+@pytest.fixture
+def tied_sales(engine, cashier):
+    """SAME_TIME sales with one created_at, between older and newer sales."""
+    stamp = datetime(2026, 1, 15, 12, 0, 0)
+    rows = [{"user_id": cashier.id, "subtotal": 1.0, "total": 1.0, "created_at": created_at}
+            for created_at in [stamp.replace(hour=9)] + [stamp] * SAME_TIME + [stamp.replace(hour=18)]]
+    db = SessionLocal()
+    try:
+        db.execute(insert(Sale), rows)
+        db.commit()
+    finally:
+        db.close()
+    return stamp
+
+
+def test_sales_pages_visit_every_sale_once_in_order(client, db, cashier, auth_headers, tied_sales):
+    expected = [
+        sale_id for (sale_id,) in
+        db.query(Sale.id).order_by(Sale.created_at.desc(), Sale.id.desc()).all()
+    ]
+
+    pages = _pages(client, "/sales/", auth_headers(cashier), limit=3)
+
+    ids = [sale["id"] for page in pages for sale in page]
+    assert ids == expected
+    tied = db.query(Sale.id).filter(Sale.created_at == tied_sales).count()
+    assert tied == SAME_TIME                # pages of 3 split the tie across cursors
+
+
+def test_product_pages_visit_every_product_once_in_order(client, db, cashier, auth_headers, make_product):
+    for _ in range(5):
+        make_product()
+    expected = [product_id for (product_id,) in db.query(Product.id).order_by(Product.id).all()]
+
+    pages = _pages(client, "/products/", auth_headers(cashier), limit=4)
+
+    assert [p["id"] for page in pages for p in page] == expected
+
+
+@pytest.mark.parametrize("path", ["/sales/", "/products/"])
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "eyJ4IjoxfQ", "eyJpZCI6"])
+def test_malformed_cursor_is_refused(client, cashier, auth_headers, path, cursor):
+    resp = client.get(path, params={"cursor": cursor}, headers=auth_headers(cashier))
+
+    assert resp.status_code == 400
+    assert resp.json()["detail"] == "Invalid cursor"
@@ -0,0 +1,99 @@
+"""
+tests/test_payment.py — wait_for_payment against the fake Pine Labs terminal.
+
+The terminal runs in-process on a free port (hardware/fake_terminal.py) and
+counts requests and TCP connections, so the tests see how often the backend
+polled and whether it kept its keep-alive connection.
+"""
+import asyncio
+import threading
+
+import pytest
+
+from backend.hardware import pos_machine
+from backend.hardware.fake_terminal import FakeTerminal
+
+
+@pytest.fixture
+def terminal(monkeypatch):
+    """Factory for a served fake terminal that pos_machine points at."""
+    servers = []
+
+    def _make(approve_after: float = 0.2, decline: bool = False) -> FakeTerminal:
+        server = FakeTerminal(0, approve_after, decline)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        monkeypatch.setattr(pos_machine, "BASE_URL", f"http://127.0.0.1:{server.server_address[1]}")
+        return server
+
+    monkeypatch.setattr(pos_machine, "_async_client", None)
+    monkeypatch.setattr(pos_machine, "POLL_FIRST", 0.05)
+    monkeypatch.setattr(pos_machine, "POLL_MAX", 0.2)
+    yield _make
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def _run(coro):
+    """Run on a fresh loop, closing the pooled client before the loop goes away."""
+    async def _main():
+        try:
+            return await coro
+        finally:
+            await pos_machine.aclose()
+    return asyncio.run(_main())
+
+
+async def _pay(amount: float = 149.5, timeout: float = 5) -> dict:
+    started = await pos_machine.initiate_payment(amount, "card", "SALE-1")
+    assert started["success"], started
+    return await pos_machine.wait_for_payment(started["transaction_id"], timeout)
+
+
+def test_approved_payment_returns_once_the_terminal_approves(terminal):
+    server = terminal(approve_after=0.2)
+    result = _run(_pay())
+
+    assert result["status"] == "success" and not result["timed_out"]
+    assert result["approval_code"] == "A1B2C3"
+    assert 1 < result["polls"] == server.counts["status"]
+
+
+def test_declined_payment_returns_failed(terminal):
+    terminal(approve_after=0.1, decline=True)
+    result = _run(_pay())
+
+    assert result["status"] == "failed" and not result["timed_out"]
+    assert result["response_code"] == "05" and result["message"] == "DECLINED"
+
+
+def test_pending_payment_times_out_after_backing_off(terminal):
+    server = terminal(approve_after=60)
+    result = _run(_pay(timeout=1.0))
+
+    assert result["status"] == "pending" and result["timed_out"]
+    assert result["polls"] == server.counts["status"]
+    # 0.05 s apart at first, 0.2 s once backed off: about 8 polls in a second, not 20
+    assert 4 <= result["polls"] <= 9
+
+
+def test_unreachable_terminal_times_out_with_the_error(terminal, monkeypatch):
+    monkeypatch.setattr(pos_machine, "BASE_URL", "http://127.0.0.1:9")
+    result = _run(pos_machine.wait_for_payment("ABC123", timeout=0.3))
+
+    assert result["status"] == "error" and result["timed_out"]
+    assert result["polls"] >= 2
+
+
+def test_payments_reuse_one_terminal_connection(terminal):
+    server = terminal(approve_after=0.1)
+
+    async def _three_payments():
+        return [await _pay(amount) for amount in (10, 20, 30)]
+
+    results = _run(_three_payments())
+
+    assert [r["status"] for r in results] == ["success"] * 3
+    assert server.counts["initiate"] == 3
+    assert server.counts["connections"] == 1
@@ -0,0 +1,92 @@
+"""
+tests/test_printer.py — Receipts render to one ESC/POS buffer and go out in one write.
+
+The store header and footer are rendered once and reused for every receipt;
+only the body is rendered per sale. print_receipt sends the whole buffer in
+a single write over a handle that stays open across receipts.
+"""
+import pytest
+
+from backend.hardware import printer
+
+SALE = {
+    "sale_id": 7, "created_at": "2026-10-17 09:30", "cashier": "asha", "payment_mode": "upi",
+    "items": [
+        {"name": "Amul Butter 500 g", "qty": 2, "unit_price": 275.0, "subtotal": 550.0},
+        {"name": "Tata Salt 1 kg", "qty": 1, "unit_price": 28.0, "subtotal": 28.0},
+    ],
+    "subtotal": 578.0, "discount": 0.0, "tax": 28.9, "total": 606.9,
+}
+
+
+class _FakeDevice:
+
+    def __init__(self, writes: list):
+        self._writes = writes
+
+    def _raw(self, data: bytes):
+        self._writes.append(data)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def static_renders(monkeypatch):
+    """Count header/footer renders, starting from an empty cache."""
+    counts = {"header": 0, "footer": 0}
+    header_lines, footer_lines = printer._header_lines, printer._footer_lines
+
+    def _header():
+        counts["header"] += 1
+        return header_lines()
+
+    def _footer():
+        counts["footer"] += 1
+        return footer_lines()
+
+    monkeypatch.setattr(printer, "_header_lines", _header)
+    monkeypatch.setattr(printer, "_footer_lines", _footer)
+    printer._static_segments.cache_clear()
+    yield counts
+    printer._static_segments.cache_clear()
+
+
+def test_receipt_is_one_buffer_of_header_body_and_footer(static_renders):
+    receipt = printer.render_receipt(SALE)
+
+    assert isinstance(receipt, bytes)
+    header, footer = printer._static_segments()
+    assert header.startswith(printer.INIT)
+    assert receipt ==header + printer.render(printer._body_lines(SALE)) + footer
+    assert receipt.endswith(printer.FEED_AND_CUT)
+    text = receipt.decode(printer.ENCODING)
+    assert printer.STORE_NAME in text
+    assert "Amul Butter 500 g" in text and "606.90" in text and "Payment  : UPI" in text
+
+
+def test_header_and_footer_are_rendered_once_and_reused(static_renders):
+    receipts = [printer.render_receipt({**SALE, "sale_id": n}) for n in range(5)]
+
+    assert static_renders == {"header": 1, "footer": 1}
+    header, footer = printer._static_segments()
+    assert all(r.startswith(header) and r.endswith(footer) for r in receipts)
+    assert len(set(receipts)) == 5
+
+
+def test_print_receipt_sends_one_write_over_a_kept_handle(monkeypatch):
+    writes, connects = [], []
+
+    def _connect():
+        connects.append(1)
+        return _FakeDevice(writes)
+
+    connection = printer.PrinterConnection()
+    monkeypatch.setattr(printer, "_get_printer", _connect)
+    monkeypatch.setattr(printer, "printer_connection", connection)
+
+    for n in range(3):
+        assert printer.print_receipt({**SALE, "sale_id": n})["success"]
+
+    assert len(connects) == 1
+    assert writes == [printer.render_receipt({**SALE, "sale_id": n}) for n in range(3)]
@@ -0,0 +1,70 @@
+"""
+tests/test_product_cache.py — The product cache follows writes.
+
+A sale writes the new stock levels into cached products, a product update
+drops the cached row and barcode, and a lookup that read the row before a
+write landed cannot put that old row back into the cache.
+"""
+import pytest
+from fastapi import HTTPException
+
+from backend.database import SessionLocal
+from backend.schemas.product import ProductUpdate
+from backend.schemas.sale import SaleCreate, SaleItemIn
+from backend.services import product_service
+from backend.services.product_service import ProductService
+from backend.services.sales_service import SalesService
+
+
+def _update(product_id: int, **fields):
+    db = SessionLocal()
+    try:
+        ProductService.update(db, product_id, ProductUpdate(**fields))
+    finally:
+        db.close()
+
+
+def test_sale_updates_the_cached_stock_level(db, make_product, cashier):
+    product = make_product(stock_qty=10)
+    assert ProductService.get_by_barcode(db, product.barcode).stock_qty == 10
+
+    SalesService.create_sale(
+        db, SaleCreate(items=[SaleItemIn(product_id=product.id, qty=3, unit_price=product.price)]), cashier.id
+    )
+    hits = product_service._products.hits
+
+    assert ProductService.get_by_barcode(db, product.barcode).stock_qty == 7
+    assert product_service._products.hits == hits + 1     # served from the cache, already current
+
+
+def test_product_update_invalidates_the_cached_row_and_barcode(db, make_product):
+    product = make_product(price=10.0)
+    old_barcode = product.barcode
+    ProductService.get_by_barcode(db, old_barcode)
+
+    _update(product.id, price=12.5, barcode=f"{old_barcode}-new")
+
+    assert ProductService.get_by_id(db, product.id).price == 12.5
+    assert ProductService.get_by_barcode(db, f"{old_barcode}-new").id == product.id
+    with pytest.raises(HTTPException) as missing:
+        ProductService.get_by_barcode(db, old_barcode)
+    assert missing.value.status_code == 404
+
+
+def test_fill_that_raced_an_update_is_not_cached(db, make_product, monkeypatch):
+    product = make_product(price=10.0)
+    load = ProductService._get
+
+    def _load_then_update(session, product_id):
+        row = load(session, product_id)                 # the old row …
+        monkeypatch.undo()
+        _update(product_id, price=11.0)                 # … and a write commits before it is cached
+        return row
+
+    monkeypatch.setattr(ProductService, "_get", staticmethod(_load_then_update))
+    stale_fills = product_service._products.stale_fills
+    assert ProductService.get_by_id(db, product.id).price == 10.0
+
+    assert product_service._products.stale_fills == stale_fills + 1
+    db.expire_all()
+    assert ProductService.get_by_id(db, product.id).price == 11.0
@@ -0,0 +1,42 @@
+"""
+tests/test_query_plans.py — Dashboard, search and list queries must use indexes.
+
+Runs the same check as `python -m backend.migrations --check-plans`: every
+query in HOT_QUERIES is EXPLAINed and a sequential / full table scan fails
+the test. On PostgreSQL sequential scans are disabled for the check, so the
+near-empty test tables do not hide a missing index.
+"""
+import pytest
+from sqlalchemy import create_engine, text
+
+from backend.database import Base
+from backend.migrations import HOT_QUERIES, check_plans, run_migrations
+
+
+def _full_scans(results) -> dict:
+    return {r["query"]: r["plan"] for r in results if not r["ok"]}
+
+
+def test_hot_queries_use_indexes_on_postgresql(pg_engine):
+    results = check_plans(pg_engine)
+
+    assert {r["query"] for r in results} == set(HOT_QUERIES)
+    assert _full_scans(results) == {}
+
+
+def test_hot_queries_use_indexes_on_sqlite(engine):
+    if engine.dialect.name != "sqlite":
+        pytest.skip("suite is running on PostgreSQL")
+
+    assert _full_scans(check_plans(engine)) == {}
+
+
+def test_check_plans_flags_a_missing_index(tmp_path):
+    scratch = create_engine(f"sqlite:///{tmp_path}/plans.db")
+    Base.metadata.create_all(bind=scratch)
+    run_migrations(scratch)
+    with scratch.begin() as conn:
+        conn.execute(text("DROP INDEX ix_sale_items_product_id"))
+
+    assert list(_full_scans(check_plans(scratch))) == ["sale items of a product"]
+    scratch.dispose()
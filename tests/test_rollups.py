@@ -0,0 +1,86 @@
+"""
+tests/test_rollups.py — Incremental rollups agree with a rebuild from raw sales.
+
+Every write adds a signed delta to the daily rollups. After each step of a
+sale's life (created, marked failed, marked paid again), the rollup rows for
+the day must equal what RollupService.rebuild() computes from the sales
+table. A row whose counts went back to zero is the same as no row.
+"""
+from datetime import date, datetime
+
+import pytest
+
+from backend.models import Product, ProductDailyRollup, SalesDailyRollup
+from backend.schemas.sale import SaleBatchCreate, SaleBatchEntry, SaleCreate, SaleItemIn
+from backend.services.rollup_service import RollupService
+from backend.services.sales_service import SalesService
+
+DAY = date(2025, 3, 14)
+
+
+def _rollups(db, day: date) -> dict:
+    """Non-zero rollup rows of `day`, rounded to the cent."""
+    db.expire_all()
+    sales = {
+        (r.payment_mode.value, round(r.revenue, 2), r.transactions)
+        for r in db.query(SalesDailyRollup).filter(SalesDailyRollup.day == day)
+        if r.transactions
+    }
+    products = {
+        (r.product_id, r.product_name, round(r.qty, 3), round(r.revenue, 2))
+        for r in db.query(ProductDailyRollup).filter(ProductDailyRollup.day == day)
+        if r.qty
+    }
+    return {"sales": sales, "products": products}
+
+
+def _assert_matches_rebuild(db, day: date):
+    incremental = _rollups(db, day)
+    RollupService.rebuild(db, day, day)
+    assert _rollups(db, day) == incremental
+
+
+@pytest.fixture
+def at():
+    """at(hour) → a time on DAY."""
+    return lambda hour: datetime.combine(DAY, datetime.min.time()).replace(hour=hour)
+
+
+def _cart(*lines) -> list:
+    return [SaleItemIn(product_id=p.id, qty=qty, unit_price=p.price) for p, qty in lines]
+
+
+def test_rollups_match_rebuild_through_a_sale_lifecycle(db, make_product, cashier, at):
+    milk, bread = make_product(price=30.0), make_product(price=45.5)
+
+    card = SalesService.create_sale(
+        db, SaleCreate(items=_cart((milk, 2), (bread, 1)), payment_mode="card"), cashier.id, created_at=at(9)
+    )
+    SalesService.create_sale(db, SaleCreate(items=_cart((milk, 1.5))), cashier.id, created_at=at(10))
+    _assert_matches_rebuild(db, DAY)
+    assert ("card", round(card.total, 2), 1) in _rollups(db, DAY)["sales"]
+
+    SalesService.update_payment_status(db, card.id, "failed")
+    _assert_matches_rebuild(db, DAY)
+    assert not any(mode == "card" for mode, _, _ in _rollups(db, DAY)["sales"])
+
+    SalesService.update_payment_status(db, card.id, "failed")      # no change, no delta
+    _assert_matches_rebuild(db, DAY)
+
+    SalesService.update_payment_status(db, card.id, "success")
+    _assert_matches_rebuild(db, DAY)
+    assert ("card", round(card.total, 2), 1) in _rollups(db, DAY)["sales"]
+
+
+def test_batch_rollups_match_rebuild(db, make_product, cashier, at):
+    oil = make_product(price=120.0)
+    entries = [
+        SaleBatchEntry(items=_cart((oil, n)), payment_mode=mode, created_at=at(11 + n))
+        for n, mode in [(1, "cash"), (2, "upi"), (3, "cash")]
+    ]
+
+    result = SalesService.create_sales_batch(db, SaleBatchCreate(sales=entries), cashier.id)
+
+    assert result.created == 3
+    _assert_matches_rebuild(db, DAY)
+    assert db.get(Product, oil.id).stock_qty == 100 - 6
@@ -0,0 +1,43 @@
+"""
+tests/test_sale_query_count.py — create_sale issues a fixed number of statements.
+
+Cart products are loaded with one keyed query and the sale rows are written
+with multi-row INSERTs, so the statement count must not grow with the
+number of cart lines. A per-line query sneaking back in fails this test.
+"""
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from backend.schemas.sale import SaleCreate, SaleItemIn
+from backend.services.sales_service import SalesService
+
+
+@contextmanager
+def _count_statements(engine):
+    statements = []
+
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _before)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", _before)
+
+
+def _statements_for_cart(engine, db, make_product, cashier, lines: int) -> int:
+    products = [make_product(stock_qty=100, price=5.0 + i) for i in range(lines)]
+    data = SaleCreate(items=[SaleItemIn(product_id=p.id, qty=1, unit_price=p.price) for p in products])
+    with _count_statements(engine) as statements:
+        SalesService.create_sale(db, data, cashier.id)
+    return len(statements)
+
+
+@pytest.mark.parametrize("lines", [5, 20, 50])
+def test_create_sale_statement_count_is_independent_of_cart_size(engine, db, make_product, cashier, lines):
+    baseline = _statements_for_cart(engine, db, make_product, cashier, 1)
+
+    assert _statements_for_cart(engine, db, make_product, cashier, lines) == baseline
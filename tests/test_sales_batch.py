@@ -0,0 +1,88 @@
+"""
+tests/test_sales_batch.py — POST /sales/batch ingests many sales per transaction.
+
+A sale that fails validation is reported on its own and the rest of its
+chunk still goes through. A sale whose Idempotency-Key was already used for
+the same cart is reported as a duplicate of the original sale, and stock is
+deducted once per created sale, summed per product across the chunk.
+"""
+import uuid
+
+from backend.models import Product
+from backend.schemas.sale import SaleBatchCreate, SaleBatchEntry, SaleCreate, SaleItemIn
+from backend.services.sales_service import SalesService
+
+
+def _entry(product: Product, qty: float = 1, key: str = None, **fields) -> SaleBatchEntry:
+    return SaleBatchEntry(
+        items=[SaleItemIn(product_id=product.id, qty=qty, unit_price=product.price)],
+        idempotency_key=key, **fields,
+    )
+
+
+def _ingest(db, cashier, entries, chunk_size: int = 200):
+    return SalesService.create_sales_batch(db, SaleBatchCreate(sales=entries, chunk_size=chunk_size), cashier.id)
+
+
+def _stock(db, product_id: int) -> float:
+    db.expire_all()
+    return db.get(Product, product_id).stock_qty
+
+
+def test_failed_entries_fail_alone(db, make_product, cashier):
+    product = make_product(stock_qty=10)
+    scarce = make_product(stock_qty=1)
+    missing = Product(id=10**9, price=1.0)
+
+    result = _ingest(db, cashier, [
+        _entry(product, 2),
+        _entry(scarce, 5),                          # more than in stock
+        _entry(missing),                            # unknown product
+        _entry(product, 1, payment_mode="credit"),  # no customer
+        _entry(product, 1, payment_mode="barter"),  # unknown payment mode
+        _entry(scarce, 1),
+    ])
+
+    assert [r.status for r in result.results] == ["created", "failed", "failed", "failed", "failed", "created"]
+    assert "Insufficient stock" in result.results[1].error
+    assert "not found" in result.results[2].error
+    assert (result.created, result.duplicates, result.failed) == (2, 0, 4)
+    assert _stock(db, product.id) == 8
+    assert _stock(db, scarce.id) == 0
+
+
+def test_stock_is_deducted_by_the_summed_quantities(db, make_product, cashier):
+    product = make_product(stock_qty=20)
+
+    result = _ingest(db, cashier, [_entry(product, q) for q in (1, 2.5, 3, 4)], chunk_size=3)
+
+    assert result.created == 4 and result.sales_per_sec > 0
+    assert _stock(db, product.id) == 20 - 10.5
+
+
+def test_reused_key_is_reported_as_a_duplicate(db, make_product, cashier):
+    product = make_product(stock_qty=10)
+    key = str(uuid.uuid4())
+    original = SalesService.create_sale(
+        db, SaleCreate(items=[SaleItemIn(product_id=product.id, qty=2, unit_price=product.price)]),
+        cashier.id, idempotency_key=key,
+    )
+
+    result = _ingest(db, cashier, [_entry(product, 2, key=key), _entry(product, 1)])
+
+    assert result.results[0].status == "duplicate"
+    assert result.results[0].sale_id == original.id
+    assert result.results[1].status == "created"
+    assert (result.created, result.duplicates, result.failed) == (1, 1, 0)
+    assert _stock(db, product.id) == 7
+
+
+def test_key_repeated_within_the_batch_fails_the_repeat(db, make_product, cashier):
+    product = make_product(stock_qty=10)
+    key = str(uuid.uuid4())
+
+    result = _ingest(db, cashier, [_entry(product, 1, key=key), _entry(product, 1, key=key)])
+
+    assert [r.status for r in result.results] == ["created", "failed"]
+    assert result.results[1].error == "Idempotency-Key repeated within the batch"
+    assert _stock(db, product.id) == 9
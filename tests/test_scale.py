@@ -0,0 +1,113 @@
+"""
+tests/test_scale.py — ScaleSession against the pty scale in hardware/fake_scale.py.
+
+The session polls a real serial port here (the slave side of a pty), so
+stability detection, the ST / US flags and the reconnect loop all run
+exactly as they do against a scale on COM3.
+"""
+import os
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("serial")
+
+from backend.hardware import scale
+from backend.hardware.fake_scale import FakeScale
+
+
+def _wait_for(predicate, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out waiting for the scale session")
+        time.sleep(0.01)
+
+
+@pytest.fixture(autouse=True)
+def fast_polling(monkeypatch):
+    monkeypatch.setattr(scale, "POLL_INTERVAL", 0.01)
+    monkeypatch.setattr(scale, "TIMEOUT", 0.5)
+    monkeypatch.setattr(scale, "MAX_AGE", 1.5)
+    monkeypatch.setattr(scale, "RECONNECT_DELAY", 0.05)
+
+
+@pytest.fixture
+def fake_scale():
+    """Factory for served fake scales; every one is unplugged at teardown."""
+    scales = []
+
+    def _make(weights, flags=False) -> FakeScale:
+        fake = FakeScale(weights, flags)
+        threading.Thread(target=fake.serve_forever, daemon=True).start()
+        scales.append(fake)
+        return fake
+
+    yield _make
+    for fake in scales:
+        fake.close()
+
+
+@pytest.fixture
+def session():
+    """Factory for started sessions that record every published reading."""
+    sessions = []
+
+    def _make(port: str):
+        s = scale.ScaleSession(port=port)
+        s.published = []
+        s._publish = s.published.append
+        sessions.append(s)
+        s.start()
+        return s
+
+    yield _make
+    for s in sessions:
+        s.stop()
+
+
+def test_weight_is_stable_once_the_last_samples_agree(fake_scale, session):
+    fake = fake_scale([0.0, 0.8, 1.31, 1.248, 1.25])
+    s = session(fake.path)
+
+    assert s.read()["weight"] is None
+    _wait_for(lambda: s.current()["stable"])
+
+    weights = [r["weight"] for r in s.published]
+    first_stable = next(i for i, r in enumerate(s.published) if r["stable"])
+    assert weights[:first_stable] == [0.0, 0.8, 1.31, 1.248, 1.25]
+    assert s.published[first_stable]["weight"] == 1.25
+    assert s.read() == {"weight": 1.25, "unit": "kg", "raw": "1.250 kg", "stable": True}
+    assert s.stats()["connected"] and s.stats()["reconnects"] == 0
+
+
+def test_scale_flags_decide_stability(fake_scale, session):
+    fake = fake_scale([0.7] * 5, flags=True)
+    s = session(fake.path)
+    _wait_for(lambda: s.current()["stable"])
+
+    # Samples agreed from the third reading on, but the scale said US until the fifth
+    assert s.samples >= 5
+    assert [r["stable"] for r in s.published] == [False, True]
+    assert s.current()["raw"].startswith("ST,GS,")
+    assert s.read()["weight"] == 0.7
+
+
+def test_session_reconnects_after_the_port_drops(fake_scale, session, tmp_path):
+    port = tmp_path / "scale"
+    first = fake_scale([1.25])
+    os.symlink(first.path, port)
+    s = session(str(port))
+    _wait_for(lambda: s.current()["stable"])
+
+    first.close()
+    _wait_for(lambda: not s.connected)
+    assert s.current()["weight"] is None
+    assert s.published[-1] == {"weight": None, "stable": False, "error": s.current()["error"]}
+
+    second = fake_scale([0.5])
+    port.unlink()
+    os.symlink(second.path, port)
+    _wait_for(lambda: s.read()["weight"] == 0.5)
+    assert s.connected and s.reconnects >= 1
@@ -0,0 +1,67 @@
+"""
+tests/test_stock_concurrency.py — Concurrent checkouts must never oversell.
+
+Many lanes sell the last units of one product at the same moment. Stock is
+decremented with a conditional UPDATE … RETURNING, so exactly the available
+quantity is sold and every other checkout is refused with 400 / 409.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException
+
+from backend.database import SessionLocal
+from backend.models import Product
+from backend.schemas.sale import SaleCreate, SaleItemIn
+from backend.services.sales_service import SalesService
+
+LANES = 24
+STOCK = 10
+
+
+def _checkout(product: Product, qty: float, cashier_id: int, start: threading.Barrier) -> float:
+    """Sell `qty` units; returns the quantity sold (0 when refused)."""
+    data = SaleCreate(items=[SaleItemIn(product_id=product.id, qty=qty, unit_price=product.price)])
+    db = SessionLocal()
+    try:
+        start.wait()
+        SalesService.create_sale(db, data, cashier_id)
+        return qty
+    except HTTPException as e:
+        assert e.status_code in (400, 409), e.detail
+        return 0
+    finally:
+        db.close()
+
+
+def _run_lanes(product: Product, quantities, cashier_id: int):
+    start = threading.Barrier(len(quantities))
+    with ThreadPoolExecutor(max_workers=len(quantities)) as pool:
+        return list(pool.map(lambda q: _checkout(product, q, cashier_id, start), quantities))
+
+
+def _stock(db, product_id: int) -> float:
+    return db.get(Product, product_id).stock_qty
+
+
+def test_concurrent_single_unit_checkouts_sell_exactly_the_stock(db, make_product, cashier):
+    product = make_product(stock_qty=STOCK)
+
+    sold = _run_lanes(product, [1] * LANES, cashier.id)
+
+    assert sum(sold) == STOCK
+    assert sold.count(1) == STOCK
+    assert _stock(db, product.id) == 0
+
+
+def test_concurrent_mixed_quantities_never_go_negative(db, make_product, cashier):
+    product = make_product(stock_qty=STOCK)
+    quantities = [3, 2, 4, 1, 5, 2, 3, 1] * 3
+
+    sold = _run_lanes(product, quantities, cashier.id)
+
+    final = _stock(db, product.id)
+    assert final >= 0
+    assert sum(sold) == STOCK - final
+    # Whatever is left is smaller than every refused request
+    assert all(final < q for q, s in zip(quantities, sold) if s == 0)